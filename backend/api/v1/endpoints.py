@@ -1,16 +1,29 @@
-from fastapi import APIRouter, HTTPException, Body, Depends, Response, status
+import hashlib
+import orjson
+from fastapi import APIRouter, HTTPException, Body, Depends, Header, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from typing import List, Dict
-from datetime import timedelta
+from typing import Any, List, Dict, Optional, Union
+from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from models.event import EventInput, EventPublic, Reminder, ConflictCheckResponse, SharePayload, StatusUpdate
-from models.user import User, UserCreate, Token, UserPublic
-from services import event_service, auth_service
+from models.event import EventInput, EventBatchInput, EventPublic, EventTombstone, Reminder, ConflictCheckResponse, SharePayload, StatusUpdate, CategoryUpdate, OccurrenceUpdate, BulkSelection, BulkStatusUpdate, BulkActionResponse, IcsImportSummary, EventExtractionResponse
+from models.user import User, UserCreate, Token, UserPublic, UserPreferences
+from models.job import JobAccepted, JobPublic
+from services import event_service, auth_service, job_service, notification_service
 from core.config import settings
 from core.database import get_database # Updated import
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+def _event_response(event_doc: Dict[str, Any]) -> ORJSONResponse:
+    # Returning a Response skips response_model revalidation; the mapper already produces the EventPublic shape
+    return ORJSONResponse(event_service.event_document_to_public(event_doc))
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
 
 @router.post("/users/signup", response_model=UserPublic, status_code=201, tags=["Users"])
 async def signup(user_in: UserCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
@@ -20,7 +33,7 @@ async def signup(user_in: UserCreate, db: AsyncIOMotorDatabase = Depends(get_dat
 @router.post("/users/login", response_model=Token, tags=["Users"])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncIOMotorDatabase = Depends(get_database)):
     user = await auth_service.get_user_by_email(db, form_data.username)
-    if not user or not auth_service.verify_password(form_data.password, user.hashed_password):
+    if not user or not await auth_service.verify_password(form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth_service.create_access_token(data={"sub": user.email}, expires_delta=access_token_expires)
@@ -30,22 +43,128 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncIOMot
 async def read_users_me(current_user: User = Depends(auth_service.get_current_user)):
     return UserPublic(id=str(current_user.id), email=current_user.email, preferences=current_user.preferences)
 
-@router.post("/events", response_model=ConflictCheckResponse, status_code=201, tags=["Events"])
-async def create_new_event(event_input: EventInput, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+@router.put("/users/me/preferences", response_model=UserPublic, tags=["Users"])
+async def update_my_preferences(preferences: UserPreferences, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Replace the signed-in user's preferences, e.g. the default reminder for each category."""
+    user = await auth_service.update_preferences(db, current_user, preferences)
+    return UserPublic(id=str(user.id), email=user.email, preferences=user.preferences)
+
+@router.post("/events", response_model=ConflictCheckResponse, status_code=201, responses={202: {"model": JobAccepted}}, tags=["Events"])
+async def create_new_event(
+    event_input: EventInput,
+    run_async: bool = Query(False, alias="async", description="Return 202 with a job id at once and create the event in the background."),
+    current_user: User = Depends(auth_service.get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_database),
+):
     """Parse text to create a new event."""
-    return await event_service.create_event(db, event_input.text, current_user=current_user)
+    if run_async:
+        job = await job_service.submit_create_event(db, event_input.text, owner_id=current_user.id)
+        return ORJSONResponse(
+            {"job_id": str(job["_id"]), "status": job["status"]},
+            status_code=status.HTTP_202_ACCEPTED,
+            headers={"Location": f"/api/v1/jobs/{job['_id']}"},
+        )
+    result = await event_service.create_event(db, event_input.text, current_user=current_user)
+    return ORJSONResponse(result, status_code=201)
+
+@router.post("/events/batch", response_model=List[ConflictCheckResponse], status_code=201, tags=["Events"])
+async def create_events_in_batch(batch_input: EventBatchInput, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Parse several texts at once and create all of the resulting events in one write."""
+    results = await event_service.create_events_batch(db, batch_input.texts, current_user=current_user)
+    return ORJSONResponse(results, status_code=201)
+
+@router.post("/events/extract", response_model=EventExtractionResponse, status_code=201, tags=["Events"])
+async def extract_events_from_text(event_input: EventInput, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Create every event found in a long text, such as a newsletter or a team schedule, from one LLM call per chunk."""
+    result = await event_service.create_events_from_text(db, event_input.text, current_user=current_user)
+    return ORJSONResponse(result, status_code=201)
+
+@router.post("/events/bulk/status", response_model=BulkActionResponse, tags=["Events"])
+async def update_events_status_in_bulk(bulk_update: BulkStatusUpdate, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Update the status of every event listed by id, or matching a category and/or start time range, in one write."""
+    return await event_service.bulk_update_status(db, bulk_update, bulk_update.status, owner_id=current_user.id)
+
+@router.post("/events/bulk/delete", response_model=BulkActionResponse, tags=["Events"])
+async def delete_events_in_bulk(selection: BulkSelection, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Delete every event listed by id, or matching a category and/or start time range, in one write."""
+    return await event_service.bulk_delete_events(db, selection, owner_id=current_user.id)
 
-@router.get("/events", response_model=List[EventPublic], tags=["Events"])
-async def list_all_events(current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
-    events = await event_service.get_all_events(db, owner_id=current_user.id)
-    return [EventPublic(id=str(e.id), owner_id=str(e.owner_id), **e.model_dump(exclude={'id', 'owner_id'})) for e in events]
+@router.post("/events/import", response_model=IcsImportSummary, status_code=201, tags=["Events"])
+async def import_events_from_ics(request: Request, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """
+    Import an iCalendar (.ics) file sent as the raw request body, e.g. with
+    Content-Type: text/calendar. Events are read as the upload arrives; no LLM is involved.
+    """
+    summary = await event_service.import_ics_events(db, request.stream(), current_user=current_user)
+    return ORJSONResponse(summary, status_code=201)
+
+@router.get("/events/export", tags=["Events"])
+async def export_events_to_ics(current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Download every event as an iCalendar (.ics) file, streamed as it is read."""
+    return StreamingResponse(
+        event_service.export_ics_events(db, owner_id=current_user.id),
+        media_type="text/calendar",
+        headers={"Content-Disposition": 'attachment; filename="events.ics"'},
+    )
+
+@router.get("/events", response_model=List[Union[EventPublic, EventTombstone]], tags=["Events"])
+async def list_all_events(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit to get every event."),
+    cursor: Optional[str] = Query(None, description="The X-Next-Cursor header of the previous page."),
+    since: Optional[str] = Query(None, description="The X-Sync-Token header of an earlier response: only events changed since then, and tombstones for deleted ones."),
+    start: Optional[datetime] = Query(None, description="Only events starting at or after this time."),
+    end: Optional[datetime] = Query(None, description="Only events starting before this time."),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title,start_time."),
+    stream: bool = Query(False, description="Stream the events as NDJSON as they are read."),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(auth_service.get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_database),
+):
+    """
+    List events ordered by start time, optionally paginated, filtered, projected or streamed.
+    With `since`, only what changed is returned. Responses carry an ETag; sending it back in
+    If-None-Match gets a 304 while none of the user's events have changed.
+    """
+    selected_fields = None
+    if fields:
+        selected_fields = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown_fields = set(selected_fields) - set(event_service.PUBLIC_EVENT_FIELDS)
+        if unknown_fields:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown_fields))}")
+
+    if since and (cursor or stream):
+        raise HTTPException(status_code=400, detail="since can't be combined with cursor or stream")
+
+    if stream:
+        events = event_service.stream_events(db, owner_id=current_user.id, start=start, end=end, after=cursor, fields=selected_fields)
+        return StreamingResponse((orjson.dumps(event) + b"\n" async for event in events), media_type="application/x-ndjson")
+
+    # The ETag covers the user's calendar version and this exact query
+    version = await event_service.get_events_version(db, current_user.id)
+    etag = f'W/"{hashlib.sha1(f"{version}|{request.url.query}".encode()).hexdigest()}"'
+    if _etag_matches(etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    if since:
+        events, sync_token = await event_service.list_event_changes(db, owner_id=current_user.id, since=since, fields=selected_fields)
+        return ORJSONResponse(content=events, headers={"ETag": etag, "X-Sync-Token": sync_token})
+
+    sync_token = event_service.new_sync_token()
+    events, next_cursor = await event_service.list_events_page(
+        db, owner_id=current_user.id, limit=limit, start=start, end=end, after=cursor, fields=selected_fields
+    )
+    headers = {"ETag": etag, "X-Sync-Token": sync_token}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return ORJSONResponse(content=events, headers=headers)
 
 
 @router.get("/events/{event_id}", response_model=EventPublic, tags=["Events"])
 async def get_single_event(event_id: str, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
-    event = await event_service.get_event_by_id(db, event_id, owner_id=current_user.id)
+    event = await event_service.get_event_document(db, event_id, owner_id=current_user.id)
     if not event: raise HTTPException(status_code=404, detail="Event not found")
-    return EventPublic(id=str(event.id), owner_id=str(event.owner_id), **event.model_dump(exclude={'id', 'owner_id'}))
+    return _event_response(event)
 
 @router.delete("/events/{event_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Events"])
 async def delete_an_event(event_id: str, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
@@ -60,7 +179,7 @@ async def delete_an_event(event_id: str, current_user: User = Depends(auth_servi
 async def confirm_an_event(event_id: str, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
     event = await event_service.confirm_event(db, event_id, owner_id=current_user.id)
     if not event: raise HTTPException(status_code=404, detail="Event not found or not updated")
-    return EventPublic(id=str(event.id), owner_id=str(event.owner_id), **event.model_dump(exclude={'id', 'owner_id'}))
+    return _event_response(event)
 
 @router.put("/events/{event_id}/reschedule", response_model=EventPublic, tags=["Event Actions"])
 async def reschedule_an_event(event_id: str, event_input: EventInput, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
@@ -69,15 +188,14 @@ async def reschedule_an_event(event_id: str, event_input: EventInput, current_us
     if not event:
         raise HTTPException(status_code=404, detail="Event not found or not updated")
     
-    public_event = EventPublic(id=str(event.id), owner_id=str(event.owner_id), **event.model_dump(exclude={'id', 'owner_id'}))
-    return public_event
+    return _event_response(event)
 
 
 @router.post("/events/{event_id}/reminders", response_model=EventPublic, tags=["Event Actions"])
 async def add_a_reminder(event_id: str, reminder: Reminder, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
     event = await event_service.add_reminder_to_event(db, event_id, reminder, owner_id=current_user.id)
     if not event: raise HTTPException(status_code=404, detail="Event not found or not updated")
-    return EventPublic(id=str(event.id), owner_id=str(event.owner_id), **event.model_dump(exclude={'id', 'owner_id'}))
+    return _event_response(event)
 
 @router.post("/events/{event_id}/share", response_model=SharePayload, tags=["Event Actions"])
 async def share_an_event(event_id: str, share_with: List[str] = Body(..., embed=True), current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
@@ -86,12 +204,20 @@ async def share_an_event(event_id: str, share_with: List[str] = Body(..., embed=
     return payload
 
 @router.get("/events/{event_id}/timeline", response_model=List[Dict], tags=["Event Actions"])
-async def get_event_timeline(event_id: str, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+async def get_event_timeline(
+    event_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit to get the whole timeline."),
+    cursor: Optional[str] = Query(None, description="The X-Next-Cursor header of the previous page."),
+    current_user: User = Depends(auth_service.get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_database),
+):
     """Retrieve the timeline of actions for a specific event."""
-    timeline = await event_service.get_event_timeline(db, event_id, owner_id=current_user.id)
-    if timeline is None:
+    page = await event_service.get_event_timeline(db, event_id, owner_id=current_user.id, limit=limit, after=cursor)
+    if page is None:
         raise HTTPException(status_code=404, detail="Event not found")
-    return timeline
+    timeline, next_cursor = page
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return ORJSONResponse(content=timeline, headers=headers)
 
 @router.put("/events/{event_id}/status", response_model=EventPublic, tags=["Event Actions"])
 async def update_event_status(event_id: str, status_update: StatusUpdate, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
@@ -99,4 +225,81 @@ async def update_event_status(event_id: str, status_update: StatusUpdate, curren
     event = await event_service.update_event_status(db, event_id, status_update, owner_id=current_user.id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found or not updated")
-    return EventPublic(id=str(event.id), owner_id=str(event.owner_id), **event.model_dump(exclude={'id', 'owner_id'}))
+    return _event_response(event)
+
+@router.put("/events/{event_id}/category", response_model=EventPublic, tags=["Event Actions"])
+async def correct_event_category(event_id: str, category_update: CategoryUpdate, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Correct the category of an event; the assistant learns from the correction."""
+    event = await event_service.update_event_category(db, event_id, category_update.category, owner_id=current_user.id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found or not updated")
+    return _event_response(event)
+
+@router.get("/events/{event_id}/occurrences", response_model=List[EventPublic], tags=["Event Actions"])
+async def list_event_occurrences(
+    event_id: str,
+    start: datetime = Query(..., description="Only occurrences ending after this time."),
+    end: datetime = Query(..., description="Only occurrences starting before this time."),
+    current_user: User = Depends(auth_service.get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_database),
+):
+    """Expand a recurring event into its occurrences within a time window."""
+    occurrences = await event_service.list_occurrences(db, event_id, owner_id=current_user.id, start=start, end=end)
+    if occurrences is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return ORJSONResponse(content=occurrences)
+
+@router.put("/events/{event_id}/occurrences/{original_start}", response_model=EventPublic, tags=["Event Actions"])
+async def update_an_occurrence(event_id: str, original_start: datetime, occurrence_update: OccurrenceUpdate, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Edit one occurrence of a recurring event, identified by the start the series gave it."""
+    event = await event_service.update_occurrence(db, event_id, original_start, occurrence_update, owner_id=current_user.id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found or not updated")
+    return _event_response(event)
+
+@router.delete("/events/{event_id}/occurrences/{original_start}", status_code=status.HTTP_204_NO_CONTENT, tags=["Event Actions"])
+async def cancel_an_occurrence(event_id: str, original_start: datetime, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Cancel one occurrence of a recurring event."""
+    event = await event_service.cancel_occurrence(db, event_id, original_start, owner_id=current_user.id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/notifications", tags=["Events"])
+async def stream_notifications(current_user: User = Depends(auth_service.get_current_user_from_header_or_query)):
+    """
+    Server-sent events for the user's calendar: `created`, `updated` and `deleted`
+    carry the event (or its tombstone). `resync` means notifications were dropped
+    for a slow reader and the client should catch up with GET /events?since=.
+    """
+    # Subscribe before the response starts so the connection limit is still a 429
+    subscription = notification_service.subscribe(current_user.id)
+
+    async def server_sent_events():
+        try:
+            async for notification in notification_service.listen(subscription):
+                if notification is None:
+                    yield b": keep-alive\n\n"
+                else:
+                    yield b"event: " + notification["type"].encode() + b"\ndata: " + orjson.dumps(notification) + b"\n\n"
+        finally:
+            notification_service.unsubscribe(subscription)
+
+    return StreamingResponse(
+        server_sent_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/jobs/metrics", response_model=Dict[str, Any], tags=["Jobs"])
+async def get_job_metrics(current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Job throughput, queue depth and latency for this worker process."""
+    return await job_service.get_job_stats(db)
+
+@router.get("/jobs/{job_id}", response_model=JobPublic, tags=["Jobs"])
+async def get_job(job_id: str, current_user: User = Depends(auth_service.get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """The status of a background job and, once it succeeded, the created event."""
+    job = await job_service.get_job(db, job_id, owner_id=current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return ORJSONResponse(job_service.job_to_public(job))
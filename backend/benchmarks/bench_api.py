@@ -0,0 +1,431 @@
+"""
+End-to-end throughput and latency for every route in api/v1/endpoints.py.
+
+The app runs in-process behind httpx's ASGI transport, against mongomock-motor
+instead of MongoDB and with nlp_service.parse_event_from_text and the LLM
+client replaced by deterministic stubs (optionally with a simulated LLM delay), so results only
+move when the application code does. The stand-in has no indexes and scans
+collections in Python: compare numbers between commits, not with production.
+
+Needs `pip install mongomock-motor httpx`.
+"""
+import asyncio
+import itertools
+import json
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from benchmarks.common import configure_environment, latency_summary
+
+configure_environment()
+
+import httpx
+import mongomock.collection
+from mongomock_motor import AsyncMongoMockClient
+from bson import ObjectId
+from api.v1 import endpoints
+from core.database import create_indexes, db
+from models.event import ParsedEventDetails, RecurrenceFrequency, RecurrenceRule
+from services import auth_service, event_service, job_service, llm_client, nlp_service, notification_service
+from core.config import settings
+from benchmarks.bench_calendar import make_calendar
+from benchmarks.bench_components import make_ics
+import main
+
+API = "/api/v1"
+
+# mongomock predates the `sort` argument newer pymongo passes for bulk updates
+_add_update = mongomock.collection.BulkOperationBuilder.add_update
+mongomock.collection.BulkOperationBuilder.add_update = lambda self, *args, sort=None, **kwargs: _add_update(self, *args, **kwargs)
+# Request = (method, url, httpx keyword arguments)
+Request = Tuple[str, str, Dict[str, Any]]
+
+
+class StubParser:
+    """
+    Stands in for the LLM parser: every text maps to a stable one-hour slot
+    between 8am and 10pm over the next two weeks, so some creates conflict.
+    Texts starting with "every" repeat weekly.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.first_day = (datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.calls = 0
+
+    async def __call__(self, text: str, db=None) -> ParsedEventDetails:
+        self.calls += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self.details(text)
+
+    def details(self, text: str) -> ParsedEventDetails:
+        day, slot = divmod(zlib.crc32(text.encode()) % (14 * 56), 56)
+        start = self.first_day + timedelta(days=day, hours=8, minutes=15 * slot)
+        return ParsedEventDetails(
+            title=text[:80],
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            is_reschedule=text.lower().startswith("move"),
+            recurrence=RecurrenceRule(frequency=RecurrenceFrequency.WEEKLY) if text.lower().startswith("every") else None,
+        )
+
+
+class StubExtractionLLM:
+    """
+    Stands in for llm_client.create_chat_completion in multi-event extraction:
+    every non-empty line of the text in the prompt is one event, placed like StubParser would.
+    """
+
+    def __init__(self, parser: StubParser):
+        self.parser = parser
+        self.calls = 0
+
+    async def __call__(self, dedupe_key=None, **request) -> SimpleNamespace:
+        self.calls += 1
+        if self.parser.latency_seconds:
+            await asyncio.sleep(self.parser.latency_seconds)
+        text = request["messages"][0]["content"].split('"""')[1]
+        events = [self.parser.details(line.strip()).model_dump(mode="json") for line in text.splitlines() if line.strip()]
+        tool_call = SimpleNamespace(function=SimpleNamespace(arguments=json.dumps({"events": events})))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(tool_calls=[tool_call]))])
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    headers: Dict[str, str]
+    owner_id: ObjectId
+    email: str
+    password: str
+    event_ids: List[str]
+    job_ids: List[str]
+    # Events created up front for routes that consume them
+    disposable_ids: List[str]
+    # (id, first start) of weekly recurring events
+    series: List[Tuple[str, datetime]]
+    # Owned by a second user, so they don't grow the history every other route reads
+    bulk_disposable_ids: List[str]
+    bulk_headers: Optional[Dict[str, str]] = None
+
+
+@dataclass
+class Scenario:
+    method: str
+    path: str
+    build: Callable[[Context, int], Request]
+    expected_status: int = 200
+    # bcrypt dominates these, so fewer requests give the same precision
+    max_requests: Optional[int] = None
+
+
+def _event(ctx: Context, i: int) -> str:
+    return ctx.event_ids[i % len(ctx.event_ids)]
+
+def _occurrence(ctx: Context, i: int) -> str:
+    # Spread edits over the series' first year of weeks
+    series_id, first_start = ctx.series[i % len(ctx.series)]
+    return f"{API}/events/{series_id}/occurrences/{(first_start + timedelta(weeks=i % 52)).isoformat()}"
+
+BULK_SIZE = 20
+
+def _bulk_ids(ctx: Context, i: int) -> List[str]:
+    return [_event(ctx, i * BULK_SIZE + n) for n in range(BULK_SIZE)]
+
+ICS_EVENTS = 50
+
+def _newsletter(name: str, events: int) -> str:
+    # One dated item per line, as a pasted school newsletter or season schedule reads
+    return "\n".join(f"{name} item {n}: Friday at 6pm in the gym" for n in range(events))
+
+def _ics_upload(ctx: Context, i: int) -> Request:
+    # make_ics gives every event a fresh UID, so none are skipped as already imported
+    return ("POST", f"{API}/events/import", {"headers": {**ctx.bulk_headers, "Content-Type": "text/calendar"}, "content": make_ics(ICS_EVENTS)})
+
+SCENARIOS = [
+    Scenario("POST", "/users/signup", lambda ctx, i: ("POST", f"{API}/users/signup", {"json": {"email": f"bench-{ObjectId()}@example.com", "password": "benchmark"}}), 201, max_requests=32),
+    Scenario("POST", "/users/login", lambda ctx, i: ("POST", f"{API}/users/login", {"data": {"username": ctx.email, "password": ctx.password}}), max_requests=32),
+    Scenario("GET", "/users/me", lambda ctx, i: ("GET", f"{API}/users/me", {"headers": ctx.headers})),
+    Scenario("PUT", "/users/me/preferences", lambda ctx, i: ("PUT", f"{API}/users/me/preferences", {"headers": ctx.headers, "json": {"default_reminders": {"SPORTS": 30 + i % 30}}})),
+    Scenario("POST", "/events", lambda ctx, i: ("POST", f"{API}/events", {"headers": ctx.headers, "json": {"text": f"Benchmark event {i}"}}), 201),
+    Scenario("POST", "/events/batch", lambda ctx, i: ("POST", f"{API}/events/batch", {"headers": ctx.headers, "json": {"texts": [f"Batch {i} item {n}" for n in range(10)]}}), 201),
+    Scenario("POST", "/events/extract", lambda ctx, i: ("POST", f"{API}/events/extract", {"headers": ctx.headers, "json": {"text": _newsletter(f"Newsletter {i}", 10)}}), 201),
+    Scenario("POST", "/events/bulk/status", lambda ctx, i: ("POST", f"{API}/events/bulk/status", {"headers": ctx.headers, "json": {"ids": _bulk_ids(ctx, i), "status": {"is_confirmed": i % 2 == 0}}})),
+    Scenario("POST", "/events/bulk/delete", lambda ctx, i: ("POST", f"{API}/events/bulk/delete", {"headers": ctx.bulk_headers, "json": {"ids": [ctx.bulk_disposable_ids.pop() for _ in range(BULK_SIZE)]}})),
+    Scenario("GET", "/events/export", lambda ctx, i: ("GET", f"{API}/events/export", {"headers": ctx.headers}), max_requests=20),
+    Scenario("GET", "/events", lambda ctx, i: ("GET", f"{API}/events", {"headers": ctx.headers, "params": {"limit": 50}})),
+    Scenario("GET", "/events/{event_id}", lambda ctx, i: ("GET", f"{API}/events/{_event(ctx, i)}", {"headers": ctx.headers})),
+    Scenario("DELETE", "/events/{event_id}", lambda ctx, i: ("DELETE", f"{API}/events/{ctx.disposable_ids.pop()}", {"headers": ctx.headers}), 204),
+    Scenario("POST", "/events/{event_id}/confirm", lambda ctx, i: ("POST", f"{API}/events/{_event(ctx, i)}/confirm", {"headers": ctx.headers})),
+    Scenario("PUT", "/events/{event_id}/reschedule", lambda ctx, i: ("PUT", f"{API}/events/{_event(ctx, i)}/reschedule", {"headers": ctx.headers, "json": {"text": f"move to slot {i}"}})),
+    Scenario("POST", "/events/{event_id}/reminders", lambda ctx, i: ("POST", f"{API}/events/{_event(ctx, i)}/reminders", {"headers": ctx.headers, "json": {"minutes_before": 30}})),
+    Scenario("POST", "/events/{event_id}/share", lambda ctx, i: ("POST", f"{API}/events/{_event(ctx, i)}/share", {"headers": ctx.headers, "json": {"share_with": ["family@example.com"]}})),
+    Scenario("GET", "/events/{event_id}/timeline", lambda ctx, i: ("GET", f"{API}/events/{_event(ctx, i)}/timeline", {"headers": ctx.headers})),
+    Scenario("PUT", "/events/{event_id}/status", lambda ctx, i: ("PUT", f"{API}/events/{_event(ctx, i)}/status", {"headers": ctx.headers, "json": {"is_confirmed": True}})),
+    Scenario("PUT", "/events/{event_id}/category", lambda ctx, i: ("PUT", f"{API}/events/{_event(ctx, i)}/category", {"headers": ctx.headers, "json": {"category": "SOCIAL"}})),
+    Scenario("GET", "/events/{event_id}/occurrences", lambda ctx, i: ("GET", f"{API}/events/{ctx.series[i % len(ctx.series)][0]}/occurrences", {"headers": ctx.headers, "params": {"start": ctx.series[0][1].isoformat(), "end": (ctx.series[0][1] + timedelta(weeks=8)).isoformat()}})),
+    Scenario("PUT", "/events/{event_id}/occurrences/{original_start}", lambda ctx, i: ("PUT", _occurrence(ctx, i), {"headers": ctx.headers, "json": {"title": f"Moved occurrence {i}"}})),
+    Scenario("DELETE", "/events/{event_id}/occurrences/{original_start}", lambda ctx, i: ("DELETE", _occurrence(ctx, i), {"headers": ctx.headers}), 204),
+    Scenario("GET", "/jobs/metrics", lambda ctx, i: ("GET", f"{API}/jobs/metrics", {"headers": ctx.headers})),
+    Scenario("GET", "/jobs/{job_id}", lambda ctx, i: ("GET", f"{API}/jobs/{ctx.job_ids[i % len(ctx.job_ids)]}", {"headers": ctx.headers})),
+    # Last, and as the bulk-delete user, since every import grows the calendar
+    Scenario("POST", "/events/import", _ics_upload, 201, max_requests=20),
+]
+# httpx's ASGI transport buffers whole responses, so server-sent events are measured by bench_notifications
+MEASURED_ELSEWHERE = {("GET", "/notifications")}
+# Variants of routes that are already covered, reported under their own names
+VARIANTS = {
+    "POST /events?async=true": Scenario("POST", "/events", lambda ctx, i: ("POST", f"{API}/events", {"headers": ctx.headers, "params": {"async": "true"}, "json": {"text": f"Async event {i}"}}), 202),
+    "GET /events (all)": Scenario("GET", "/events", lambda ctx, i: ("GET", f"{API}/events", {"headers": ctx.headers}), max_requests=50),
+    "GET /events (stream)": Scenario("GET", "/events", lambda ctx, i: ("GET", f"{API}/events", {"headers": ctx.headers, "params": {"stream": "true"}}), max_requests=50),
+}
+
+
+async def measure(ctx: Context, scenario: Scenario, requests: int, concurrency: int) -> Dict[str, float]:
+    total = min(requests, scenario.max_requests or requests)
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            if i >= total:
+                return
+            method, url, kwargs = scenario.build(ctx, i)
+            started = time.perf_counter()
+            response = await ctx.client.request(method, url, **kwargs)
+            if response.status_code == scenario.expected_status:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latency_summary(latencies, time.perf_counter() - started, errors)
+
+async def _create_user(client: httpx.AsyncClient, history: int) -> Context:
+    email, password = f"bench-{ObjectId()}@example.com", "benchmark"
+    await client.post(f"{API}/users/signup", json={"email": email, "password": password})
+    token = (await client.post(f"{API}/users/login", data={"username": email, "password": password})).json()["access_token"]
+    user = await auth_service.get_user_by_email(db.db, email)
+    if history:
+        await db.db.events.insert_many([event.model_dump(by_alias=True) for event in make_calendar(history, owner_id=user.id)])
+    return Context(client, {"Authorization": f"Bearer {token}"}, user.id, email, password, [], [], [], [], [])
+
+async def _prepare(ctx: Context, requests: int):
+    headers = ctx.headers
+    for i in range(50):
+        response = await ctx.client.post(f"{API}/events", headers=headers, json={"text": f"Seed event {i}"})
+        ctx.event_ids.append(response.json()["created_event"]["id"])
+    for i in range(requests):
+        response = await ctx.client.post(f"{API}/events", headers=headers, json={"text": f"Disposable event {i}"})
+        ctx.disposable_ids.append(response.json()["created_event"]["id"])
+    bulk_owner = await _create_user(ctx.client, history=0)
+    bulk_disposable = make_calendar(requests * BULK_SIZE, seed=7, owner_id=bulk_owner.owner_id)
+    await db.db.events.insert_many([event.model_dump(by_alias=True) for event in bulk_disposable])
+    ctx.bulk_headers = bulk_owner.headers
+    ctx.bulk_disposable_ids.extend(str(event.id) for event in bulk_disposable)
+    for i in range(10):
+        response = await ctx.client.post(f"{API}/events", headers=headers, json={"text": f"Every week seed {i}"})
+        created = response.json()["created_event"]
+        ctx.series.append((created["id"], datetime.fromisoformat(created["start_time"])))
+    for i in range(20):
+        response = await ctx.client.post(f"{API}/events", headers=headers, params={"async": "true"}, json={"text": f"Seed job {i}"})
+        ctx.job_ids.append(response.json()["job_id"])
+
+def unbenchmarked_routes() -> List[str]:
+    covered = {(scenario.method, scenario.path) for scenario in SCENARIOS} | MEASURED_ELSEWHERE
+    return sorted(
+        f"{method} {route.path}"
+        for route in endpoints.router.routes
+        for method in getattr(route, "methods", ())
+        if (method, route.path) not in covered
+    )
+
+async def bench_routes(ctx: Context, requests: int, concurrency: int) -> Dict[str, Any]:
+    results = {}
+    for scenario in SCENARIOS:
+        results[f"{scenario.method} {scenario.path}"] = await measure(ctx, scenario, requests, concurrency)
+    for name, scenario in VARIANTS.items():
+        results[name] = await measure(ctx, scenario, requests, concurrency)
+    return results
+
+async def bench_create_vs_history(client: httpx.AsyncClient, sizes: List[int], requests: int) -> Dict[str, Any]:
+    """POST /events latency one request at a time as the user's history grows."""
+    create = next(scenario for scenario in SCENARIOS if scenario.method == "POST" and scenario.path == "/events")
+    results = {}
+    for size in sizes:
+        ctx = await _create_user(client, history=size)
+        results[str(size)] = await measure(ctx, create, requests, concurrency=1)
+    return results
+
+async def bench_delta_sync(client: httpx.AsyncClient, history: int, requests: int, concurrency: int) -> Dict[str, Any]:
+    """Polling an idle calendar: a full GET /events against a since= delta and a conditional GET."""
+    ctx = await _create_user(client, history=history)
+    etag = (await client.get(f"{API}/events", headers=ctx.headers)).headers["ETag"]
+    # What a client holds after its last poll, once nothing has changed for a while
+    sync_token = event_service.encode_sync_token(datetime.utcnow())
+    polls = {
+        "full": Scenario("GET", "/events", lambda ctx, i: ("GET", f"{API}/events", {"headers": ctx.headers}), max_requests=50),
+        "since": Scenario("GET", "/events", lambda ctx, i: ("GET", f"{API}/events", {"headers": ctx.headers, "params": {"since": sync_token}})),
+        "if_none_match": Scenario("GET", "/events", lambda ctx, i: ("GET", f"{API}/events", {"headers": {**ctx.headers, "If-None-Match": etag}}), 304),
+    }
+    results = {}
+    for name, poll in polls.items():
+        method, url, kwargs = poll.build(ctx, 0)
+        response_bytes = len((await client.request(method, url, **kwargs)).content)
+        results[name] = {**await measure(ctx, poll, requests, concurrency), "response_bytes": response_bytes}
+    return results
+
+async def bench_notifications(client: httpx.AsyncClient, history: int, requests: int, subscriber_counts: Tuple[int, ...] = (1, 10, 100)) -> Dict[str, Any]:
+    """
+    How long a POST /events takes to reach a subscriber's queue through the
+    in-process hook, and what publishing one change costs as subscribers grow.
+    """
+    ctx = await _create_user(client, history=history)
+    subscription = notification_service.subscribe(ctx.owner_id)
+    latencies = []
+    try:
+        started = time.perf_counter()
+        for i in range(requests):
+            request_started = time.perf_counter()
+            await ctx.client.post(f"{API}/events", headers=ctx.headers, json={"text": f"Notified event {i}"})
+            await subscription.queue.get()
+            latencies.append(time.perf_counter() - request_started)
+        create_to_notify = latency_summary(latencies, time.perf_counter() - started, 0)
+    finally:
+        notification_service.unsubscribe(subscription)
+
+    notification = {"type": "updated", "event": {"id": str(ObjectId()), "title": "Fanout"}}
+    publish_us = {}
+    for count in subscriber_counts:
+        # Registered directly: the per-user connection limit would stop subscribe() early
+        owner_id = ObjectId()
+        subscriptions = [notification_service.Subscription(owner_id) for _ in range(count)]
+        notification_service.subscriptions[owner_id].update(subscriptions)
+        calls = 1000
+        started = time.perf_counter()
+        for _ in range(calls):
+            notification_service.publish(owner_id, notification)
+            for subscription in subscriptions:
+                subscription.queue.get_nowait()
+        publish_us[str(count)] = (time.perf_counter() - started) / calls * 1e6
+        del notification_service.subscriptions[owner_id]
+    return {"create_to_notify": create_to_notify, "publish_us_by_subscribers": publish_us}
+
+async def bench_ics_import(client: httpx.AsyncClient, size: int) -> Dict[str, Any]:
+    """A whole calendar imported by a new user in one POST /events/import."""
+    ctx = await _create_user(client, history=0)
+    ics = make_ics(size)
+    started = time.perf_counter()
+    response = await client.post(f"{API}/events/import", headers={**ctx.headers, "Content-Type": "text/calendar"}, content=ics)
+    elapsed = time.perf_counter() - started
+    return {"events": response.json()["imported"], "seconds": elapsed, "events_per_second": response.json()["imported"] / elapsed}
+
+async def bench_newsletter_import(client: httpx.AsyncClient, parser: StubParser, extraction_llm: StubExtractionLLM,
+                                  events: int = 12, llm_latency_seconds: float = 0.5) -> Dict[str, Any]:
+    """
+    One newsletter's events created through POST /events/batch, one LLM call
+    per event, and through POST /events/extract, one call per chunk, with a
+    simulated LLM round trip so the number of calls shows in the latency.
+    """
+    ctx = await _create_user(client, history=0)
+    latency_seconds, parser.latency_seconds = parser.latency_seconds, llm_latency_seconds
+    # A fresh name so neither route is answered from the parse cache
+    lines = _newsletter(f"Newsletter {ObjectId()}", events).splitlines()
+    routes = {
+        "batch": (parser, f"{API}/events/batch", {"texts": lines}),
+        "extract": (extraction_llm, f"{API}/events/extract", {"text": "\n".join(lines)}),
+    }
+    results = {}
+    try:
+        for name, (llm, url, body) in routes.items():
+            calls = llm.calls
+            started = time.perf_counter()
+            response = await client.post(url, headers=ctx.headers, json=body)
+            elapsed = time.perf_counter() - started
+            created = response.json()
+            results[name] = {
+                "seconds": elapsed,
+                "llm_calls": llm.calls - calls,
+                "events": len(created if name == "batch" else created["results"]),
+            }
+    finally:
+        parser.latency_seconds = latency_seconds
+    return {"llm_latency_ms": llm_latency_seconds * 1000, **results}
+
+async def bench_auth_overhead(ctx: Context, calls: int = 2000) -> Dict[str, float]:
+    """What get_current_user costs per request with the caches warm and cold."""
+    token = ctx.headers["Authorization"].split()[1]
+
+    async def per_call(clear_caches: bool) -> float:
+        started = time.perf_counter()
+        for _ in range(calls):
+            if clear_caches:
+                auth_service.user_cache.clear()
+                auth_service.token_cache.clear()
+            await auth_service.get_current_user(token=token, db=db.db)
+        return (time.perf_counter() - started) / calls * 1e6
+
+    return {"warm_us": await per_call(False), "cold_us": await per_call(True)}
+
+async def bench_reads_during_logins(ctx: Context, requests: int, concurrency: int) -> Dict[str, Any]:
+    """GET /events tail latency alone and while a burst of logins hashes passwords."""
+    read = next(scenario for scenario in SCENARIOS if scenario.method == "GET" and scenario.path == "/events")
+    login = next(scenario for scenario in SCENARIOS if scenario.path == "/users/login")
+    alone = await measure(ctx, read, requests, concurrency)
+    during, _ = await asyncio.gather(
+        measure(ctx, read, requests, concurrency),
+        measure(ctx, Scenario(login.method, login.path, login.build), 64, 16),
+    )
+    return {"reads_alone": alone, "reads_during_logins": during}
+
+async def run_async(requests: int = 200, concurrency: int = 16, history: int = 1000,
+                    history_sizes: Tuple[int, ...] = (100, 1_000, 10_000), llm_latency_ms: float = 0.0) -> Dict[str, Any]:
+    db.client = AsyncMongoMockClient()
+    db.db = db.client.get_database("family_assistant")
+    await create_indexes(db.db)
+    parser = StubParser(llm_latency_ms / 1000)
+    extraction_llm = StubExtractionLLM(parser)
+    nlp_service.parse_event_from_text = parser
+    llm_client.create_chat_completion = extraction_llm
+    await job_service.start_workers()
+    # mongomock has no change streams, so notifications come from the in-process hook
+    settings.NOTIFY_SOURCE = "local"
+    await notification_service.start_watcher()
+
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            ctx = await _create_user(client, history=history)
+            await _prepare(ctx, requests)
+            return {
+                "config": {
+                    "requests_per_route": requests,
+                    "concurrency": concurrency,
+                    "history": history,
+                    "llm_latency_ms": llm_latency_ms,
+                },
+                "routes": await bench_routes(ctx, requests, concurrency),
+                "create_vs_history": await bench_create_vs_history(client, list(history_sizes), min(requests, 50)),
+                "delta_sync": await bench_delta_sync(client, history, requests, concurrency),
+                "notifications": await bench_notifications(client, history, min(requests, 50)),
+                "ics_import": await bench_ics_import(client, size=max(history_sizes)),
+                "newsletter_import": await bench_newsletter_import(client, parser, extraction_llm),
+                "auth_overhead": await bench_auth_overhead(ctx),
+                "reads_during_logins": await bench_reads_during_logins(ctx, requests, concurrency),
+                "unbenchmarked_routes": unbenchmarked_routes(),
+            }
+    finally:
+        await notification_service.stop_watcher()
+        await job_service.stop_workers()
+
+def run(**kwargs) -> Dict[str, Any]:
+    return asyncio.run(run_async(**kwargs))
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
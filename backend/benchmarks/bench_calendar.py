@@ -0,0 +1,130 @@
+"""
+Microbenchmarks for calendar_service.check_conflict and find_next_available_slots
+on synthetic calendars of 1k, 10k and 100k events, their free/busy bitset
+counterparts, and recurring series of growing age.
+"""
+import asyncio
+import random
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+from benchmarks.common import configure_environment, time_function
+
+configure_environment()
+
+from bson import ObjectId
+from models.event import Event, RecurrenceFrequency, RecurrenceRule
+from services import calendar_service, freebusy_service
+
+SIZES = (1_000, 10_000, 100_000)
+SERIES_AGES_YEARS = (1, 10, 100)
+
+def make_calendar(size: int, seed: int = 42, owner_id: Optional[ObjectId] = None) -> List[Event]:
+    """
+    About eight 30-120 minute events a day between 8am and 10pm, starting
+    tomorrow, sorted by start time as the window queries return them.
+    """
+    rng = random.Random(seed)
+    owner_id = owner_id or ObjectId()
+    first_day = (datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    events = []
+    for index in range(size):
+        start = first_day + timedelta(days=index // 8, hours=rng.randint(8, 20), minutes=rng.choice((0, 15, 30, 45)))
+        events.append(Event(
+            owner_id=owner_id,
+            title=f"Event {index}",
+            start_time=start,
+            end_time=start + timedelta(minutes=rng.choice((30, 45, 60, 90, 120))),
+        ))
+    events.sort(key=lambda event: event.start_time)
+    return events
+
+def busy_days_of(events: List[Event]) -> Dict[date, int]:
+    """The free/busy bitsets freebusy_service would hold for these events."""
+    busy_days: Dict[date, int] = {}
+    for event in events:
+        for day, first_slot, end_slot in calendar_service.day_slot_ranges(event.start_time, event.end_time):
+            busy_days[day] = busy_days.get(day, 0) | calendar_service.slot_mask(first_slot, end_slot)
+    return busy_days
+
+def bench_get_busy_days(events: List[Event], days: int = 14) -> Dict[str, float]:
+    """get_busy_days over a multi-day range with the owner's days already cached."""
+    owner_id = events[0].owner_id
+    cached_days: Dict[date, Dict[ObjectId, int]] = {}
+    for event in events:
+        for day, first_slot, end_slot in calendar_service.day_slot_ranges(event.start_time, event.end_time):
+            cached_days.setdefault(day, {})[event.id] = calendar_service.slot_mask(first_slot, end_slot)
+    freebusy_service.day_cache.set(owner_id, cached_days)
+    freebusy_service.series_cache.set(owner_id, (datetime.min, []))
+    start = events[0].start_time
+    loop = asyncio.new_event_loop()
+    try:
+        # A warm cache never touches the database, so none is passed
+        return time_function(lambda: loop.run_until_complete(
+            freebusy_service.get_busy_days(None, [owner_id], start, start + timedelta(days=days))
+        ))
+    finally:
+        loop.close()
+
+def bench_size(size: int) -> Dict[str, Any]:
+    events = make_calendar(size)
+    owner_id = events[0].owner_id
+    last_end = max(event.end_time for event in events)
+    free_event = Event(owner_id=owner_id, title="Free", start_time=last_end + timedelta(days=1), end_time=last_end + timedelta(days=1, hours=1))
+    middle = events[len(events) // 2]
+    clashing_event = Event(owner_id=owner_id, title="Clash", start_time=middle.start_time, end_time=middle.end_time)
+    first_start = events[0].start_time
+    busy_days = busy_days_of(events)
+
+    return {
+        "events": size,
+        # No conflict is the worst case: every event is scanned
+        "check_conflict_free": time_function(lambda: calendar_service.check_conflict(free_event, events)),
+        "check_conflict_clash_midway": time_function(lambda: calendar_service.check_conflict(clashing_event, events)),
+        "find_next_available_slots_3": time_function(
+            lambda: calendar_service.find_next_available_slots(first_start, timedelta(hours=1), events, count=3)
+        ),
+        "find_next_available_slots_3_two_hours": time_function(
+            lambda: calendar_service.find_next_available_slots(first_start, timedelta(hours=2), events, count=3)
+        ),
+        # The same questions answered from free/busy bitsets
+        "overlaps_busy_free": time_function(lambda: calendar_service.overlaps_busy(busy_days, free_event)),
+        "overlaps_busy_clash": time_function(lambda: calendar_service.overlaps_busy(busy_days, clashing_event)),
+        "find_free_slots_3": time_function(lambda: calendar_service.find_free_slots(busy_days, first_start, timedelta(hours=1), count=3)),
+        "get_busy_days_14_days_cached": bench_get_busy_days(events),
+    }
+
+def bench_series_age(years: int, series_count: int = 50) -> Dict[str, Any]:
+    """
+    Conflict checks and slot search against weekly series that started `years`
+    ago. Expansion is limited to the window, so the cost should not grow with age.
+    """
+    rng = random.Random(years)
+    owner_id = ObjectId()
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    series = []
+    for index in range(series_count):
+        start = today - timedelta(days=365 * years + rng.randint(0, 6), hours=-rng.randint(8, 20))
+        series.append(Event(
+            owner_id=owner_id,
+            title=f"Series {index}",
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            recurrence=RecurrenceRule(frequency=RecurrenceFrequency.WEEKLY, by_weekday=[rng.randint(0, 6)]),
+        ))
+    new_event = Event(owner_id=owner_id, title="New", start_time=today + timedelta(days=3, hours=12), end_time=today + timedelta(days=3, hours=13))
+    return {
+        "series": series_count,
+        "check_conflict": time_function(lambda: calendar_service.check_conflict(new_event, series)),
+        "find_next_available_slots_3": time_function(
+            lambda: calendar_service.find_next_available_slots(today, timedelta(hours=1), series, count=3)
+        ),
+    }
+
+def run(sizes: Sequence[int] = SIZES) -> Dict[str, Any]:
+    results: Dict[str, Any] = {str(size): bench_size(size) for size in sizes}
+    results["series_age_years"] = {str(years): bench_series_age(years) for years in SERIES_AGES_YEARS}
+    return results
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(run(), indent=2))
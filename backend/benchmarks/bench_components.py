@@ -0,0 +1,134 @@
+"""
+Microbenchmarks for the pieces on the request path that don't need a database:
+event serialization, the rule-based fast parser, the category classifier and
+the iCalendar reader.
+"""
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict
+from benchmarks.common import configure_environment, time_function
+
+configure_environment()
+
+import orjson
+from models.event import EventCategory, EventPublic
+from services import event_service, ical_service, rule_parser
+from services.assistant_service import CategoryClassifier
+from data.build_category_model import TRAINING_PATH
+from benchmarks.bench_calendar import make_calendar
+
+# Phrasings users actually send; the fast parser should take the simple ones and leave the rest to the LLM
+PARSE_CORPUS = [
+    "Soccer practice Tuesday 5pm at Sunset Field",
+    "Dentist appointment Friday at 9am",
+    "Team meeting tomorrow 10:30am",
+    "Piano lesson today 4pm",
+    "Parent teacher conference 3/14 at 6pm",
+    "Birthday party Saturday 2-5pm at the park",
+    "Call with Grandma Sunday at noon",
+    "Doctor checkup on 2025-11-03 at 8:15am",
+    "Book club next Thursday 7pm @ Library",
+    "Reschedule the dentist to Monday 11am",
+    "Swim meet June 7th at 9am",
+    "Flight to Denver tomorrow 6:45am for 3 hours",
+    "Pick up the kids after school",
+    "Lunch with Sam sometime next week",
+    "Dinner at 7 with the Johnsons",
+    "Gym every Monday and Wednesday morning",
+    "Move the meeting to later this afternoon",
+    "Coffee with Alex at 3 or 4pm",
+    "Vet appointment for Max in the evening",
+    "Soccer game this weekend",
+]
+
+def bench_serialization() -> Dict[str, Any]:
+    docs = [event.model_dump(by_alias=True) for event in make_calendar(1_000)]
+    return {
+        "events": len(docs),
+        # The path GET /events takes: raw documents mapped to dicts, serialized by orjson
+        "documents_to_json": time_function(lambda: orjson.dumps([event_service.event_document_to_public(doc) for doc in docs])),
+        # What a pydantic response_model would cost for the same page, for comparison
+        "pydantic_models_to_json": time_function(
+            lambda: json.dumps([EventPublic(**event_service.event_document_to_public(doc)).model_dump(mode="json") for doc in docs])
+        ),
+    }
+
+def bench_fast_parser() -> Dict[str, Any]:
+    now = datetime.now()
+    results = [rule_parser.parse_event(text, now=now) for text in PARSE_CORPUS]
+    accepted = [text for text, (details, confidence) in zip(PARSE_CORPUS, results) if details and confidence >= 0.8]
+    return {
+        "corpus_size": len(PARSE_CORPUS),
+        "hit_rate": len(accepted) / len(PARSE_CORPUS),
+        "accepted": accepted,
+        "per_corpus": time_function(lambda: [rule_parser.parse_event(text, now=now) for text in PARSE_CORPUS]),
+    }
+
+def bench_categorizer() -> Dict[str, Any]:
+    examples = [(item["title"], EventCategory(item["category"])) for item in json.loads(TRAINING_PATH.read_text())]
+    random.Random(7).shuffle(examples)
+    split = int(len(examples) * 0.8)
+    train, holdout = examples[:split], examples[split:]
+
+    classifier = CategoryClassifier()
+    classifier.learn_many(train)
+    correct = sum(classifier.predict(title) == category for title, category in holdout)
+    titles = [title for title, _ in examples]
+    return {
+        "train_size": len(train),
+        "holdout_size": len(holdout),
+        "holdout_accuracy": correct / len(holdout),
+        "predict_per_title": time_function(lambda: classifier.predict(titles[0])),
+        "predict_many_all_titles": time_function(lambda: classifier.predict_many(titles)),
+    }
+
+def make_ics(size: int) -> bytes:
+    """A calendar of `size` events as an .ics file, as the exporter writes it."""
+    docs = [event.model_dump(by_alias=True) for event in make_calendar(size)]
+    return (ical_service.CALENDAR_HEADER + "".join(map(ical_service.to_vevent, docs)) + ical_service.CALENDAR_FOOTER).encode()
+
+async def _upload(ics: bytes, chunk_size: int = 64 * 1024):
+    for start in range(0, len(ics), chunk_size):
+        yield ics[start:start + chunk_size]
+
+async def _read_ics(ics: bytes) -> int:
+    events = 0
+    async for vevent in ical_service.parse_vevents(_upload(ics)):
+        events += ical_service.vevent_to_event(vevent) is not None
+    return events
+
+def bench_ics_reader(sizes=(5_000, 50_000)) -> Dict[str, Any]:
+    """Parsing and mapping uploads of growing size in 64 KiB chunks; peak memory should stay flat."""
+    results = {}
+    for size in sizes:
+        ics = make_ics(size)
+        started = time.perf_counter()
+        events = asyncio.run(_read_ics(ics))
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        asyncio.run(_read_ics(ics))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[str(size)] = {
+            "file_mb": len(ics) / 1e6,
+            "events": events,
+            "seconds": elapsed,
+            "events_per_second": events / elapsed,
+            "peak_traced_kb": peak / 1024,
+        }
+    return results
+
+def run() -> Dict[str, Any]:
+    return {
+        "serialization_1k": bench_serialization(),
+        "fast_parser": bench_fast_parser(),
+        "categorizer": bench_categorizer(),
+        "ics_reader": bench_ics_reader(),
+    }
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,110 @@
+"""
+Measures how throughput scales with the number of server workers.
+
+For each worker count it starts `serve.py` with that WEB_CONCURRENCY, waits for
+/health/ready, then drives it from several client processes so the load
+generator isn't the bottleneck. MongoDB must be reachable through the usual .env.
+
+    python -m benchmarks.load_test --workers 1,2,4,8 --duration 15
+    python -m benchmarks.load_test --path /api/v1/events?limit=50 --token <jwt>
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, List, Optional
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+async def _drive(url: str, concurrency: int, duration: float, token: Optional[str]) -> Dict:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30) as client:
+        async def user():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code >= 400:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+    return {"latencies": latencies, "errors": errors}
+
+def _client_process(args) -> Dict:
+    return asyncio.run(_drive(*args))
+
+def _wait_until_ready(base_url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health/ready", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not become ready")
+
+def run_level(workers: int, args) -> Dict:
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "SERVER_PORT": str(args.port), "REMINDER_DISPATCH_ENABLED": "false"}
+    server = subprocess.Popen([sys.executable, "serve.py"], cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        _wait_until_ready(base_url)
+        per_client = max(1, args.concurrency // args.clients)
+        with Pool(args.clients) as pool:
+            results = pool.map(_client_process, [(base_url + args.path, per_client, args.duration, args.token)] * args.clients)
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(latency for result in results for latency in result["latencies"])
+    if not latencies:
+        raise RuntimeError("No successful requests; is the path right and the token valid?")
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": sum(result["errors"] for result in results),
+        "throughput_rps": len(latencies) / args.duration,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts to compare.")
+    parser.add_argument("--path", default="/health/live")
+    parser.add_argument("--token", help="Bearer token for authenticated paths.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count.")
+    parser.add_argument("--concurrency", type=int, default=128, help="Concurrent requests in flight.")
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Load generator processes.")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    levels = [run_level(int(workers), args) for workers in args.workers.split(",")]
+    baseline = levels[0]["throughput_rps"]
+    for level in levels:
+        level["speedup"] = level["throughput_rps"] / baseline
+        print(f"{level['workers']:>3} workers: {level['throughput_rps']:>9.0f} req/s  "
+              f"p50 {level['p50_ms']:.1f} ms  p99 {level['p99_ms']:.1f} ms  x{level['speedup']:.2f}")
+    print(json.dumps(levels, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Runs the benchmark suites and writes one JSON file per run. Run from the backend directory:
+
+    python -m benchmarks.run                       # everything -> benchmarks/results/<commit>.json
+    python -m benchmarks.run --suite calendar --quick
+    python -m benchmarks.run --compare benchmarks/results/abc1234.json
+
+--compare prints every latency and throughput figure that moved by more than
+--threshold against a previous run.
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+from benchmarks.common import RESULTS_DIR, configure_environment, environment, write_results
+
+configure_environment()
+
+SUITES = ("calendar", "components", "api")
+# Larger is better for these keys; smaller is better for every other compared figure
+HIGHER_IS_BETTER = ("throughput_rps", "hit_rate", "holdout_accuracy")
+COMPARED_KEYS = HIGHER_IS_BETTER + ("p50_ms", "p95_ms", "p99_ms", "median_us", "warm_us", "cold_us")
+
+def _flatten(results: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, float]]:
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _flatten(value, path)
+        elif key in COMPARED_KEYS and isinstance(value, (int, float)):
+            yield path, value
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float):
+    before = dict(_flatten(baseline.get("results", {})))
+    print(f"Compared with {baseline.get('environment', {}).get('commit')} (changes over {threshold:.0%}):")
+    for path, value in _flatten(current["results"]):
+        old = before.get(path)
+        if not old:
+            continue
+        change = (value - old) / old
+        if abs(change) < threshold:
+            continue
+        better = change > 0 if path.rsplit(".", 1)[-1] in HIGHER_IS_BETTER else change < 0
+        print(f"  {'better' if better else 'WORSE '} {change:+7.1%}  {path}: {old:.4g} -> {value:.4g}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", action="append", choices=SUITES, help="Suites to run (repeatable); all by default.")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes and request counts, for a fast smoke run.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per API route.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent API requests.")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Delay added to every stubbed parse.")
+    parser.add_argument("--output", type=Path, help="Where to write the JSON results.")
+    parser.add_argument("--compare", type=Path, help="A previous results file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.05, help="Smallest relative change --compare reports.")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    for suite in args.suite or SUITES:
+        print(f"Running the {suite} benchmarks...")
+        if suite == "calendar":
+            from benchmarks import bench_calendar
+            results["calendar"] = bench_calendar.run((1_000, 10_000) if args.quick else bench_calendar.SIZES)
+        elif suite == "components":
+            from benchmarks import bench_components
+            results["components"] = bench_components.run()
+        else:
+            from benchmarks import bench_api
+            results["api"] = bench_api.run(
+                requests=40 if args.quick else args.requests,
+                concurrency=args.concurrency,
+                history=200 if args.quick else 1_000,
+                history_sizes=(100, 1_000) if args.quick else (100, 1_000, 10_000),
+                llm_latency_ms=args.llm_latency_ms,
+            )
+
+    report = {"environment": environment(), "results": results}
+    output = args.output or RESULTS_DIR / f"{report['environment']['commit'] or 'results'}.json"
+    print(f"Wrote {write_results(report, output)}")
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), report, args.threshold)
+
+if __name__ == "__main__":
+    main()
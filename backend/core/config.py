@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +7,75 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     OPENAI_API_KEY: str
     MONGO_CONNECTION_STRING: str
+    # Pools are per process: a deployment opens up to workers x MONGO_MAX_POOL_SIZE connections
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_MAX_IDLE_TIME_MS: int = 60000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_SOCKET_TIMEOUT_MS: Optional[int] = None
+    MONGO_PING_TIMEOUT_SECONDS: float = 2.0
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    # Defaults to one worker per core; each worker is a single-threaded event loop
+    WEB_CONCURRENCY: Optional[int] = None
+    # Lets a request carrying `X-Profile: 1` be stack-sampled; keep it off on public deployments
+    PROFILE_HEADER_ENABLED: bool = False
+    PROFILE_SAMPLE_INTERVAL_SECONDS: float = 0.005
+    PROFILE_OUTPUT_DIR: str = "profiles"
+    SLOT_SEARCH_HORIZON_DAYS: int = 14
+    OCCURRENCE_WINDOW_MAX_DAYS: int = 366
+    # Event times are stored as naive wall-clock times in this zone; timezone-aware input is converted into it,
+    # and reminders, slot searches and relative dates in parsed text go by the current time here
+    CALENDAR_TIMEZONE: str = "UTC"
+    PARSE_CACHE_MAX_ENTRIES: int = 2048
+    PARSE_CACHE_TTL_SECONDS: int = 86400
+    FAST_PARSE_ENABLED: bool = True
+    FAST_PARSE_MIN_CONFIDENCE: float = 0.8
+    BATCH_PARSE_CONCURRENCY: int = 5
+    # Each text in POST /events/batch can cost an LLM call
+    BATCH_MAX_TEXTS: int = 50
+    # Multi-event extraction sends long texts in pieces of at most this many characters
+    EXTRACT_CHUNK_CHARS: int = 8000
+    EXTRACT_MAX_CHUNKS: int = 10
+    # Per-user category corrections kept; the oldest is dropped past this
+    CATEGORY_CORRECTIONS_MAX_PER_USER: int = 500
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    FREEBUSY_CACHE_MAX_OWNERS: int = 10000
+    FREEBUSY_CACHE_TTL_SECONDS: int = 30
+    SYNC_TOMBSTONE_TTL_DAYS: int = 30
+    SYNC_SAFETY_WINDOW_SECONDS: int = 5
+    NOTIFY_SOURCE: str = "change_stream"  # "change_stream" or "local" (this process's writes only)
+    NOTIFY_QUEUE_SIZE: int = 100
+    NOTIFY_HEARTBEAT_SECONDS: float = 15.0
+    NOTIFY_MAX_CONNECTIONS_PER_USER: int = 5
+    BULK_MAX_EVENTS: int = 1000
+    ICS_IMPORT_CHUNK_SIZE: int = 1000
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    REMINDER_DISPATCH_ENABLED: bool = True
+    REMINDER_LOAD_INTERVAL_SECONDS: int = 30
+    REMINDER_LOAD_BATCH_SIZE: int = 5000
+    # Point at a local fake server to exercise the admission controls without OpenAI
+    OPENAI_BASE_URL: Optional[str] = None
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_TIMEOUT_SECONDS: float = 15.0
+    LLM_DEADLINE_SECONDS: float = 30.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_BACKOFF_BASE_SECONDS: float = 0.5
+    LLM_BACKOFF_MAX_SECONDS: float = 8.0
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+    # "mongo" persists jobs in one queue shared by every worker process; "memory" is for a single process only
+    JOB_QUEUE_BACKEND: str = "mongo"
+    JOB_WORKERS: int = 4
+    JOB_MAX_QUEUED: int = 1000
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_LEASE_SECONDS: int = 120
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_RESULT_MAX_ENTRIES: int = 10000
+    JOB_RESULT_TTL_SECONDS: int = 3600
 
     class Config:
         env_file = ".env"
@@ -1,5 +1,8 @@
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING
 from core.config import settings
+from core import metrics
 
 class DataBase:
     client: AsyncIOMotorClient = None
@@ -12,10 +15,78 @@ async def get_database() -> AsyncIOMotorDatabase:
 
 async def connect_to_mongo():
     print("Connecting to MongoDB...")
-    db.client = AsyncIOMotorClient(settings.MONGO_CONNECTION_STRING)
+    db.client = AsyncIOMotorClient(
+        settings.MONGO_CONNECTION_STRING,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+        connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS,
+        event_listeners=[metrics.mongo_listener],
+    )
     db.db = db.client.get_database("family_assistant")
+    # Fail startup here rather than on the first request if MongoDB is unreachable
+    await db.client.admin.command("ping")
+    await create_indexes(db.db)
     print("Connected to MongoDB.")
 
+async def ping_mongo() -> bool:
+    """Whether MongoDB answers a ping within MONGO_PING_TIMEOUT_SECONDS."""
+    if db.client is None:
+        return False
+    try:
+        await asyncio.wait_for(db.client.admin.command("ping"), timeout=settings.MONGO_PING_TIMEOUT_SECONDS)
+        return True
+    except Exception:
+        return False
+
+async def create_indexes(database: AsyncIOMotorDatabase):
+    # Conflict and free-slot lookups only read one owner's events inside a time window
+    await database.events.create_index(
+        [("owner_id", ASCENDING), ("start_time", ASCENDING), ("end_time", ASCENDING)],
+        name="owner_start_end",
+    )
+    # Keyset pagination of GET /events walks (start_time, _id) in index order
+    await database.events.create_index(
+        [("owner_id", ASCENDING), ("start_time", ASCENDING), ("_id", ASCENDING)],
+        name="owner_start_id",
+    )
+    # The other half of the window queries' $or: recurring events still running after the window starts
+    await database.events.create_index([("owner_id", ASCENDING), ("series_end", ASCENDING)], name="owner_series_end")
+    # The reminder dispatcher only ever loads events whose next reminder is due soon
+    await database.events.create_index("next_reminder_at", name="next_reminder")
+    # Delta sync: events changed, and tombstones of events deleted, after a sync token
+    await database.events.create_index([("owner_id", ASCENDING), ("updated_at", ASCENDING)], name="owner_updated")
+    await database.event_tombstones.create_index([("owner_id", ASCENDING), ("deleted_at", ASCENDING)], name="owner_deleted")
+    await database.event_tombstones.create_index(
+        "deleted_at", expireAfterSeconds=settings.SYNC_TOMBSTONE_TTL_DAYS * 86400, name="tombstones_ttl"
+    )
+    # iCalendar imports skip UIDs the owner already has
+    await database.events.create_index(
+        [("owner_id", ASCENDING), ("ical_uid", ASCENDING)],
+        name="owner_ical_uid",
+        partialFilterExpression={"ical_uid": {"$type": "string"}},
+    )
+    # One free/busy document per owner and day; events are pulled from them by id
+    await database.freebusy.create_index([("owner_id", ASCENDING), ("day", ASCENDING)], name="owner_day", unique=True)
+    await database.freebusy.create_index([("owner_id", ASCENDING), ("entries.event_id", ASCENDING)], name="owner_entry_event")
+    # Timelines are append-only and always read per event in time order
+    await database.event_timeline.create_index(
+        [("event_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)],
+        name="event_timestamp",
+    )
+    # Cached LLM parses are keyed by date, so MongoDB can expire them on its own
+    await database.parse_cache.create_index(
+        "created_at", expireAfterSeconds=settings.PARSE_CACHE_TTL_SECONDS, name="parse_cache_ttl"
+    )
+
+    # Workers claim the oldest queued job; finished jobs expire once their result has been kept long enough
+    await database.jobs.create_index([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created")
+    await database.jobs.create_index(
+        "finished_at", expireAfterSeconds=settings.JOB_RESULT_TTL_SECONDS, name="jobs_ttl"
+    )
+
 async def close_mongo_connection():
     print("Closing MongoDB connection...")
     db.client.close()
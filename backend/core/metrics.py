@@ -0,0 +1,194 @@
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Union
+from pymongo import monitoring
+
+# Seconds; spans sub-millisecond in-process work up to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        # pymongo reports command events from its own threads
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        lines.extend(f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items)
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(series[0]), series[1], series[2]) for key, series in self._series.items()]
+        for key, bucket_counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+http_request_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+service_call_seconds = Histogram(
+    "service_call_duration_seconds", "Latency of service functions.", ("function", "outcome")
+)
+stage_seconds = Histogram(
+    "event_stage_duration_seconds", "Latency of each stage of event creation.", ("operation", "stage")
+)
+mongo_command_seconds = Histogram(
+    "mongo_command_duration_seconds", "MongoDB round trips by command.", ("command", "outcome")
+)
+llm_tokens = Counter("llm_tokens_total", "OpenAI tokens used.", ("model", "kind"))
+
+# name -> callable returning a (possibly nested) dict of numbers, e.g. a module's stats dict
+StatsSource = Callable[[], Union[Dict[str, Any], Awaitable[Dict[str, Any]]]]
+stats_sources: Dict[str, StatsSource] = {}
+
+def register_stats(prefix: str, source: StatsSource):
+    """Exposes each numeric value of source() as the gauge `<prefix>_<key>`."""
+    stats_sources[prefix] = source
+
+@contextmanager
+def stage(operation: str, name: str):
+    with stage_seconds.time(operation=operation, stage=name):
+        yield
+
+def timed(func):
+    """Records every call of a sync, async or async-generator function in service_call_seconds."""
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+    if inspect.isasyncgenfunction(func):
+        @functools.wraps(func)
+        async def async_gen_wrapper(*args, **kwargs):
+            started, outcome = time.perf_counter(), "error"
+            try:
+                async for item in func(*args, **kwargs):
+                    yield item
+                outcome = "ok"
+            finally:
+                service_call_seconds.observe(time.perf_counter() - started, function=name, outcome=outcome)
+        return async_gen_wrapper
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started, outcome = time.perf_counter(), "error"
+            try:
+                result = await func(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                service_call_seconds.observe(time.perf_counter() - started, function=name, outcome=outcome)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started, outcome = time.perf_counter(), "error"
+        try:
+            result = func(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            service_call_seconds.observe(time.perf_counter() - started, function=name, outcome=outcome)
+    return wrapper
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Counts and times every command the driver sends, i.e. every MongoDB round trip."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_command_seconds.observe(event.duration_micros / 1e6, command=event.command_name, outcome="ok")
+
+    def failed(self, event):
+        mongo_command_seconds.observe(event.duration_micros / 1e6, command=event.command_name, outcome="error")
+
+
+mongo_listener = MongoCommandListener()
+
+def _render_gauges(prefix: str, stats: Dict[str, Any]) -> List[str]:
+    lines = []
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            lines.extend(_render_gauges(name, value))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines.extend([f"# TYPE {name} gauge", f"{name} {value}"])
+    return lines
+
+async def render() -> str:
+    """The Prometheus text exposition of every metric in this process."""
+    lines: List[str] = []
+    for metric in (http_request_seconds, service_call_seconds, stage_seconds, mongo_command_seconds, llm_tokens):
+        lines.extend(metric.render())
+    for prefix, source in stats_sources.items():
+        stats = source()
+        if inspect.isawaitable(stats):
+            stats = await stats
+        lines.extend(_render_gauges(prefix, stats))
+    return "\n".join(lines) + "\n"
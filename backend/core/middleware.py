@@ -0,0 +1,58 @@
+import threading
+import time
+from pathlib import Path
+from uuid import uuid4
+from core import metrics
+from core.config import settings
+from core.profiler import StackSampler
+
+class RequestMetricsMiddleware:
+    """
+    Times every HTTP request by route template and status.
+    With PROFILE_HEADER_ENABLED, a request sent with `X-Profile: 1` is also
+    stack-sampled; the response carries an X-Profile-Id header naming the
+    collapsed-stack file written to PROFILE_OUTPUT_DIR when it finishes.
+
+    A plain ASGI middleware rather than @app.middleware("http"), so streamed
+    responses are timed to their last chunk and no extra task runs per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sampler = profile_id = None
+        if settings.PROFILE_HEADER_ENABLED and (b"x-profile", b"1") in scope["headers"]:
+            profile_id = uuid4().hex
+            sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL_SECONDS, thread_id=threading.get_ident())
+            sampler.start()
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if profile_id:
+                    message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            # The router records the matched route in the scope; label by its template to keep cardinality bounded
+            route = scope.get("route")
+            metrics.http_request_seconds.observe(
+                elapsed, method=scope["method"], route=getattr(route, "path", "unmatched"), status=status_code
+            )
+            if sampler:
+                sampler.stop()
+                output_dir = Path(settings.PROFILE_OUTPUT_DIR)
+                output_dir.mkdir(parents=True, exist_ok=True)
+                (output_dir / f"{profile_id}.folded").write_text(sampler.collapsed())
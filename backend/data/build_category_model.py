@@ -0,0 +1,22 @@
+"""
+Rebuilds data/category_model.json from the labelled titles in
+data/category_training.json. Run from the backend directory:
+
+    python -m data.build_category_model
+"""
+import json
+from pathlib import Path
+from models.event import EventCategory
+from services.assistant_service import MODEL_PATH, CategoryClassifier
+
+TRAINING_PATH = Path(__file__).resolve().parent / "category_training.json"
+
+def main():
+    examples = [(item["title"], EventCategory(item["category"])) for item in json.loads(TRAINING_PATH.read_text())]
+    classifier = CategoryClassifier()
+    classifier.learn_many(examples)
+    classifier.save(MODEL_PATH)
+    print(f"Trained on {len(examples)} titles, {len(classifier.token_counts)} tokens -> {MODEL_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware  # ✅ Import CORS middleware
 from api.v1 import endpoints
-from core.database import close_mongo_connection, connect_to_mongo
+from core import metrics
+from core.database import close_mongo_connection, connect_to_mongo, db, ping_mongo
+from core.middleware import RequestMetricsMiddleware
+from services import auth_service, freebusy_service, job_service, llm_client, nlp_service, notification_service, reminder_service
 
 # Create a FastAPI app instance
 app = FastAPI(
@@ -18,11 +22,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Sync-Token"],
 )
 
+app.add_middleware(RequestMetricsMiddleware)
+
+# Module stats exposed as gauges on /metrics
+metrics.register_stats("llm", llm_client.get_llm_stats)
+metrics.register_stats("parse", nlp_service.get_parse_stats)
+metrics.register_stats("password_hash", auth_service.get_hash_pool_stats)
+metrics.register_stats("auth_cache", lambda: {"users": auth_service.user_cache.stats(), "tokens": auth_service.token_cache.stats()})
+metrics.register_stats("reminders", lambda: reminder_service.dispatcher.stats)
+metrics.register_stats("jobs", lambda: job_service.get_job_stats(db.db))
+metrics.register_stats("freebusy_cache", freebusy_service.get_freebusy_stats)
+metrics.register_stats("notifications", notification_service.get_notification_stats)
+
 # Add startup and shutdown event handlers
 app.add_event_handler("startup", connect_to_mongo)
+app.add_event_handler("startup", reminder_service.start_dispatcher)
+app.add_event_handler("startup", job_service.start_workers)
+app.add_event_handler("startup", notification_service.start_watcher)
+app.add_event_handler("shutdown", notification_service.stop_watcher)
+app.add_event_handler("shutdown", job_service.stop_workers)
+app.add_event_handler("shutdown", reminder_service.stop_dispatcher)
 app.add_event_handler("shutdown", close_mongo_connection)
+app.add_event_handler("shutdown", auth_service.shutdown_hash_pool)
 
 # Include the router from the endpoints module
 app.include_router(endpoints.router, prefix="/api/v1")
@@ -34,6 +58,26 @@ async def read_root():
     """
     return {"message": "Welcome to the Family Event Assistant API. Go to /docs for documentation."}
 
-# It's good practice to allow running the app directly for development
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Health"])
+async def prometheus_metrics():
+    """Prometheus metrics for this worker process."""
+    return PlainTextResponse(await metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/health/live", tags=["Health"])
+async def liveness():
+    """
+    The process is up and its event loop is serving requests.
+    MongoDB is reported but never fails liveness, so an outage doesn't restart every worker.
+    """
+    return {"status": "alive", "mongo": await ping_mongo()}
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness():
+    """Ready to take traffic only while MongoDB answers a ping."""
+    if not await ping_mongo():
+        return JSONResponse({"status": "unavailable", "mongo": False}, status_code=503)
+    return {"status": "ready", "mongo": True}
+
+# It's good practice to allow running the app directly for development; use serve.py in production
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
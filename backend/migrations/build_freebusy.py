@@ -0,0 +1,43 @@
+"""
+Builds the freebusy collection from the events that were created before it
+existed. Recurring events are expanded at query time and are skipped here.
+
+Safe to re-run: marking a slot busy again is a no-op.
+Run from the backend directory:
+
+    python -m migrations.build_freebusy
+"""
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from models.event import EventState
+from services import freebusy_service
+from core.database import db, connect_to_mongo, close_mongo_connection
+
+BATCH_SIZE = 500
+
+async def build_freebusy(database: AsyncIOMotorDatabase) -> int:
+    tracked_events = 0
+    batch = []
+    query = {"end_time": {"$ne": None}, "series_end": None, "state": {"$ne": EventState.CANCELLED}}
+    async for doc in database.events.find(query, {"owner_id": 1, "start_time": 1, "end_time": 1, "state": 1}):
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            await freebusy_service.track_events(database, batch)
+            tracked_events += len(batch)
+            batch = []
+
+    if batch:
+        await freebusy_service.track_events(database, batch)
+        tracked_events += len(batch)
+    return tracked_events
+
+async def main():
+    await connect_to_mongo()
+    try:
+        tracked_events = await build_freebusy(db.db)
+        print(f"Marked the slots of {tracked_events} events busy.")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Moves the timeline arrays embedded in event documents into the append-only
+event_timeline collection, then removes them from the events.
+
+Safe to re-run: entries it wrote for an event are replaced rather than duplicated.
+Run from the backend directory:
+
+    python -m migrations.move_event_timelines
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List
+from pymongo import UpdateOne
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from core.database import db, connect_to_mongo, close_mongo_connection
+
+BATCH_SIZE = 500
+
+def _parse_timestamp(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return datetime.utcnow()
+
+async def _flush(database: AsyncIOMotorDatabase, event_ids: List, entries: List[Dict[str, Any]]):
+    await database.event_timeline.delete_many({"event_id": {"$in": event_ids}, "migrated": True})
+    if entries:
+        await database.event_timeline.insert_many(entries, ordered=False)
+    await database.events.bulk_write(
+        [UpdateOne({"_id": event_id}, {"$unset": {"timeline": ""}}) for event_id in event_ids], ordered=False
+    )
+
+async def move_event_timelines(database: AsyncIOMotorDatabase) -> int:
+    moved_events = 0
+    event_ids, entries = [], []
+    async for doc in database.events.find({"timeline": {"$exists": True}}, {"owner_id": 1, "timeline": 1}):
+        event_ids.append(doc["_id"])
+        for item in doc.get("timeline") or []:
+            entry = {
+                "event_id": doc["_id"],
+                "owner_id": doc["owner_id"],
+                "timestamp": _parse_timestamp(item.get("timestamp")),
+                "action": item.get("action", ""),
+                "migrated": True,
+            }
+            if item.get("details"):
+                entry["details"] = item["details"]
+            entries.append(entry)
+
+        if len(event_ids) >= BATCH_SIZE:
+            await _flush(database, event_ids, entries)
+            moved_events += len(event_ids)
+            event_ids, entries = [], []
+
+    if event_ids:
+        await _flush(database, event_ids, entries)
+        moved_events += len(event_ids)
+    return moved_events
+
+async def main():
+    await connect_to_mongo()
+    try:
+        moved_events = await move_event_timelines(db.db)
+        print(f"Moved the timelines of {moved_events} events.")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
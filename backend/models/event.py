@@ -1,8 +1,9 @@
 from pydantic import BaseModel, Field
 from pydantic_mongo import ObjectIdField
-from typing import List, Optional, Dict
+from typing import Annotated, List, Optional
 from datetime import datetime, timedelta
 from enum import Enum
+from core.config import settings
 
 class EventState(str, Enum):
     DRAFT = "DRAFT"
@@ -24,6 +25,57 @@ class EventCategory(str, Enum):
 class EventInput(BaseModel):
     text: str = Field(..., example="reschedule Chuck’s soccer game to Thursday at 3:30pm at Sunset Field")
 
+class EventBatchInput(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=settings.BATCH_MAX_TEXTS, example=["Soccer practice Tuesday 5pm", "Dentist appointment Friday at 9am"])
+
+class RecurrenceFrequency(str, Enum):
+    DAILY = "DAILY"
+    WEEKLY = "WEEKLY"
+    MONTHLY = "MONTHLY"
+
+class RecurrenceRule(BaseModel):
+    """
+    When an event repeats, e.g. every other Tuesday and Thursday until June.
+    The event's own start and end times are the first occurrence.
+    """
+    frequency: RecurrenceFrequency
+    interval: int = Field(default=1, ge=1, description="Repeat every `interval` days, weeks or months.")
+    by_weekday: Optional[List[Annotated[int, Field(ge=0, le=6)]]] = Field(default=None, description="WEEKLY only: weekdays to repeat on, 0 = Monday. Defaults to the first occurrence's weekday.")
+    until: Optional[datetime] = Field(default=None, description="No occurrence starts after this time.")
+    count: Optional[int] = Field(default=None, ge=1, le=5000, description="Total number of occurrences.")
+
+class OccurrenceException(BaseModel):
+    """Overrides or cancels the single occurrence the rule would start at `original_start`."""
+    original_start: datetime
+    cancelled: bool = False
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    title: Optional[str] = None
+    location: Optional[str] = None
+    notes: Optional[str] = None
+
+class OccurrenceUpdate(BaseModel):
+    """Model for editing one occurrence of a recurring event."""
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    title: Optional[str] = None
+    location: Optional[str] = None
+    notes: Optional[str] = None
+
+class ParsedEventDetails(BaseModel):
+    """A model for the LLM to populate."""
+    title: str
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    location: Optional[str] = None
+    notes: Optional[str] = None
+    is_reschedule: bool = Field(default=False, description="Set to true if the text mentions 'reschedule', 'move', 'change', or similar terms.")
+    recurrence: Optional[RecurrenceRule] = Field(default=None, description="Only for repeating events, e.g. 'every Tuesday' or 'daily until Friday'.")
+
+class ExtractedEvents(BaseModel):
+    """A model for the LLM to populate with every event in a longer text."""
+    events: List[ParsedEventDetails] = Field(default_factory=list, description="Every distinct dated event in the text, in the order they appear.")
+
 class Reminder(BaseModel):
     minutes_before: int = Field(..., example=30)
     message: Optional[str] = Field(None, example="Time to leave for soccer!")
@@ -39,10 +91,21 @@ class Event(BaseModel):
     category: EventCategory = EventCategory.UNCATEGORIZED
     state: EventState = Field(default=EventState.DRAFT)
     reminders: List[Reminder] = []
-    timeline: List[Dict] = Field(default_factory=list)
+    next_reminder_at: Optional[datetime] = None
+    last_reminder_at: Optional[datetime] = None
     is_confirmed: bool = False
     was_shared: bool = False
     is_reminded: bool = False
+    recurrence: Optional[RecurrenceRule] = None
+    exceptions: List[OccurrenceException] = []
+    # End of the last occurrence (far future for open-ended series); window queries match series on it
+    series_end: Optional[datetime] = None
+    # Only set on occurrences expanded in memory, never stored
+    occurrence_start: Optional[datetime] = Field(default=None, exclude=True)
+    # The UID of the iCalendar event this was imported from; importing it again is a no-op
+    ical_uid: Optional[str] = None
+    # Bumped by every write; GET /events?since= returns events changed after a sync token
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class EventPublic(BaseModel):
     id: str
@@ -55,7 +118,17 @@ class EventPublic(BaseModel):
     category: EventCategory
     state: EventState
     reminders: List[Reminder]
-    timeline: List[Dict]
+    recurrence: Optional[RecurrenceRule] = None
+    exceptions: List[OccurrenceException] = []
+    # Set on expanded occurrences of a recurring event: the start the rule gave this occurrence
+    occurrence_start: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class EventTombstone(BaseModel):
+    """Stands in for a deleted event in GET /events?since= results."""
+    id: str
+    deleted: bool = True
+    deleted_at: datetime
 
 
 class ConflictCheckResponse(BaseModel):
@@ -64,15 +137,63 @@ class ConflictCheckResponse(BaseModel):
     created_event: EventPublic
     suggested_times: Optional[List[datetime]] = None # New field for suggestions
 
+class EventExtractionResponse(BaseModel):
+    results: List[ConflictCheckResponse]
+    # The text is sent to the LLM in this many pieces, one call each
+    chunks: int
+    # Pieces the LLM couldn't be asked about or answered unusably; their events are missing
+    failed_chunks: int
+
 class SharePayload(BaseModel):
     summary: str
     start: datetime
     location: Optional[str]
     notes: Optional[str]
 
+class CategoryUpdate(BaseModel):
+    """Model for correcting the category the assistant picked."""
+    category: EventCategory
+
 class StatusUpdate(BaseModel):
     """Model for updating the status of an event."""
     state: Optional[EventState] = None
     is_confirmed: Optional[bool] = None
     is_reminded: Optional[bool] = None
-    was_shared: Optional[bool] = None
\ No newline at end of file
+    was_shared: Optional[bool] = None
+
+class BulkEventFilter(BaseModel):
+    """Selects events by category and/or start time; unset fields match everything, but at least one must be set."""
+    category: Optional[EventCategory] = None
+    start: Optional[datetime] = Field(None, description="Only events starting at or after this time.")
+    end: Optional[datetime] = Field(None, description="Only events starting before this time.")
+
+class BulkSelection(BaseModel):
+    """The events a bulk action applies to: either explicit ids or a filter."""
+    ids: Optional[List[str]] = Field(None, min_length=1, example=["665f1c2e9b1e8a3d4c5b6a7f"])
+    filter: Optional[BulkEventFilter] = None
+
+class BulkStatusUpdate(BulkSelection):
+    status: StatusUpdate
+
+class BulkItemResult(BaseModel):
+    id: str
+    # "updated", "unchanged", "deleted" or "not_found"
+    result: str
+
+class BulkActionResponse(BaseModel):
+    matched: int
+    modified: int
+    results: List[BulkItemResult]
+    elapsed_ms: float
+
+class IcsImportSummary(BaseModel):
+    imported: int
+    # Events whose UID was already imported
+    duplicates: int
+    # VEVENTs without a usable start time
+    invalid: int
+    # Edited or cancelled occurrences applied to their series
+    overrides: int
+    # Series whose RRULE couldn't be represented; only their first occurrence was imported
+    unsupported_recurrences: int
+    elapsed_ms: float
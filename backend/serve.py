@@ -0,0 +1,39 @@
+"""
+Production entrypoint: `python serve.py`.
+
+Runs WEB_CONCURRENCY uvicorn worker processes (one per core by default) without
+reload, on uvloop and httptools when they are installed
+(`pip install uvloop httptools`, both ship with `uvicorn[standard]`).
+"""
+import importlib.util
+import os
+import uvicorn
+from core.config import settings
+
+def worker_count() -> int:
+    return settings.WEB_CONCURRENCY or os.cpu_count() or 1
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def main():
+    workers = worker_count()
+    if workers > 1 and settings.JOB_QUEUE_BACKEND == "memory":
+        # Each worker would keep its own jobs, so polling GET /jobs/{id} would 404 on the others
+        raise SystemExit("JOB_QUEUE_BACKEND=memory only works with one worker; use mongo or set WEB_CONCURRENCY=1")
+    loop = "uvloop" if _installed("uvloop") else "asyncio"
+    http = "httptools" if _installed("httptools") else "h11"
+    print(f"Starting {workers} workers on {settings.SERVER_HOST}:{settings.SERVER_PORT} (loop={loop}, http={http})")
+    uvicorn.run(
+        "main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop=loop,
+        http=http,
+        proxy_headers=True,
+        access_log=False,
+    )
+
+if __name__ == "__main__":
+    main()
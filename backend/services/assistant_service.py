@@ -1,21 +1,205 @@
+import json
+import math
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from models.event import EventCategory
+from core.cache import TTLCache
+from core.config import settings
+from core import metrics
 
-def categorize_event(title: str) -> EventCategory:
+MODEL_PATH = Path(__file__).resolve().parent.parent / "data" / "category_model.json"
+CATEGORIES = list(EventCategory)
+STOPWORDS = {"the", "a", "an", "and", "or", "with", "for", "to", "at", "on", "in", "of", "my", "our", "from", "by"}
+TOKEN_RE = re.compile(r"[a-z]+(?:-[a-z]+)*")
+
+def tokenize(title: str) -> List[str]:
+    # Whole words only, so "recall" is never mistaken for "call"
+    return [token for token in TOKEN_RE.findall(title.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+class CategoryClassifier:
+    """
+    A multinomial naive Bayes classifier over title tokens.
+    Scores every category in one pass and learns incrementally from corrections.
+    Titles with no known tokens stay UNCATEGORIZED.
+    """
+
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.doc_counts = [0] * len(CATEGORIES)
+        self.token_totals = [0] * len(CATEGORIES)
+        # token -> per-category counts, in CATEGORIES order
+        self.token_counts: Dict[str, List[int]] = {}
+        self._refresh()
+
+    def _refresh(self):
+        self._set_scores(self.doc_counts, self.token_totals, len(self.token_counts))
+
+    def _set_scores(self, doc_counts: List[int], token_totals: List[int], vocabulary_size: int):
+        vocabulary_size = max(vocabulary_size, 1)
+        total_docs = sum(doc_counts)
+        self._log_priors = [math.log((count + 1) / (total_docs + len(CATEGORIES))) for count in doc_counts]
+        self._log_denominators = [math.log(total + self.alpha * vocabulary_size) for total in token_totals]
+
+    def _counts(self, token: str) -> Optional[List[int]]:
+        return self.token_counts.get(token)
+
+    def learn(self, title: str, category: EventCategory, refresh: bool = True):
+        index = CATEGORIES.index(category)
+        self.doc_counts[index] += 1
+        for token in tokenize(title):
+            counts = self.token_counts.setdefault(token, [0] * len(CATEGORIES))
+            counts[index] += 1
+            self.token_totals[index] += 1
+        if refresh:
+            self._refresh()
+
+    def learn_many(self, examples: Iterable[Tuple[str, EventCategory]]):
+        for title, category in examples:
+            self.learn(title, category, refresh=False)
+        self._refresh()
+
+    def predict(self, title: str) -> EventCategory:
+        known_counts = [counts for counts in map(self._counts, tokenize(title)) if counts]
+        if not known_counts:
+            return EventCategory.UNCATEGORIZED
+
+        scores = list(self._log_priors)
+        for counts in known_counts:
+            for index in range(len(CATEGORIES)):
+                scores[index] += math.log(counts[index] + self.alpha) - self._log_denominators[index]
+        return CATEGORIES[max(range(len(CATEGORIES)), key=scores.__getitem__)]
+
+    def predict_many(self, titles: Iterable[str]) -> List[EventCategory]:
+        return [self.predict(title) for title in titles]
+
+    def to_dict(self) -> Dict:
+        return {
+            "alpha": self.alpha,
+            "categories": [category.value for category in CATEGORIES],
+            "doc_counts": self.doc_counts,
+            "token_counts": self.token_counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CategoryClassifier":
+        classifier = cls(alpha=data.get("alpha", 1.0))
+        # Map by name so adding a category to the enum doesn't invalidate saved models
+        positions = [CATEGORIES.index(EventCategory(name)) for name in data["categories"]]
+        for position, count in zip(positions, data["doc_counts"]):
+            classifier.doc_counts[position] = count
+        for token, saved_counts in data["token_counts"].items():
+            counts = [0] * len(CATEGORIES)
+            for position, count in zip(positions, saved_counts):
+                counts[position] = count
+                classifier.token_totals[position] += count
+            classifier.token_counts[token] = counts
+        classifier._refresh()
+        return classifier
+
+    def save(self, path: Path = MODEL_PATH):
+        path.write_text(json.dumps(self.to_dict(), sort_keys=True))
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH) -> "CategoryClassifier":
+        return cls.from_dict(json.loads(path.read_text()))
+
+
+def correction_key(title: str) -> str:
+    """Titles match a correction by their tokens, so case and punctuation don't matter."""
+    return " ".join(tokenize(title))
+
+
+class UserCategoryClassifier(CategoryClassifier):
+    """
+    The shared model plus what one user's corrections taught it. Only the
+    corrections' counts live here; the shared counts are read through, so
+    a user's model costs no more than their corrections. A title the user
+    corrected keeps the category they chose, whatever the counts say.
+    """
+
+    def __init__(self, shared: CategoryClassifier, corrections: Dict[str, EventCategory]):
+        self.shared = shared
+        self.corrections = corrections
+        super().__init__(alpha=shared.alpha)
+        # Correction keys are the title's tokens joined by spaces, so they tokenize back the same
+        self.learn_many(corrections.items())
+
+    def _refresh(self):
+        new_tokens = sum(token not in self.shared.token_counts for token in self.token_counts)
+        self._set_scores(
+            [shared + own for shared, own in zip(self.shared.doc_counts, self.doc_counts)],
+            [shared + own for shared, own in zip(self.shared.token_totals, self.token_totals)],
+            len(self.shared.token_counts) + new_tokens,
+        )
+
+    def _counts(self, token: str) -> Optional[List[int]]:
+        shared, own = self.shared.token_counts.get(token), self.token_counts.get(token)
+        if shared and own:
+            return [a + b for a, b in zip(shared, own)]
+        return shared or own
+
+    def predict(self, title: str) -> EventCategory:
+        return self.corrections.get(correction_key(title)) or super().predict(title)
+
+
+classifier = CategoryClassifier.load() if MODEL_PATH.exists() else CategoryClassifier()
+
+# owner_id -> UserCategoryClassifier, or None for users without corrections. Sized and expired
+# like the user cache, so other workers pick up a correction within AUTH_CACHE_TTL_SECONDS.
+user_classifier_cache = TTLCache(max_entries=settings.AUTH_CACHE_MAX_ENTRIES, ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS)
+
+async def get_user_classifier(db: AsyncIOMotorDatabase, owner_id: ObjectId) -> Optional[UserCategoryClassifier]:
+    """The model that categorizes this user's events, or None while they have no corrections."""
+    cached = user_classifier_cache.get(owner_id)
+    if cached is None:
+        doc = await db.category_feedback.find_one({"_id": owner_id}, {"corrections": 1})
+        corrections = {item["title"]: EventCategory(item["category"]) for item in (doc or {}).get("corrections", [])}
+        # False marks "no corrections", since the cache can't hold None
+        cached = UserCategoryClassifier(classifier, corrections) if corrections else False
+        user_classifier_cache.set(owner_id, cached)
+    return cached or None
+
+@metrics.timed
+def categorize_event(title: str, user_classifier: Optional[UserCategoryClassifier] = None) -> EventCategory:
     """
     A simple agentic function to categorize an event.
     This demonstrates the system's ability to enrich data beyond simple parsing.
-    A more advanced version would use another LLM call for more nuanced classification.
-    """
-    title_lower = title.lower()
-    if any(keyword in title_lower for keyword in ["soccer", "practice", "game", "match"]):
-        return EventCategory.SPORTS
-    if any(keyword in title_lower for keyword in ["doctor", "dentist", "appointment"]):
-        return EventCategory.APPOINTMENT
-    if any(keyword in title_lower for keyword in ["school", "pta", "parent-teacher"]):
-        return EventCategory.SCHOOL
-    if any(keyword in title_lower for keyword in ["meeting", "work", "call"]):
-        return EventCategory.WORK
-    if any(keyword in title_lower for keyword in ["party", "dinner", "get-together"]):
-        return EventCategory.SOCIAL
-    return EventCategory.UNCATEGORIZED
+    With a user's classifier, their corrections count too.
+    """
+    return (user_classifier or classifier).predict(title)
+
+@metrics.timed
+def categorize_events(titles: List[str], user_classifier: Optional[UserCategoryClassifier] = None) -> List[EventCategory]:
+    """Categorizes a batch of titles, e.g. for bulk event creation."""
+    return (user_classifier or classifier).predict_many(titles)
 
+@metrics.timed
+async def learn_category(db: AsyncIOMotorDatabase, owner_id: ObjectId, title: str, category: EventCategory):
+    """
+    Teaches the user's model a correction: the title keeps its category from
+    now on, and its words count towards that category for similar titles.
+    Each user's corrections live in one document capped at
+    CATEGORY_CORRECTIONS_MAX_PER_USER, dropping the oldest, so they stay cheap
+    to read. One pipeline update replaces an earlier correction of the same
+    title, so concurrent corrections can't leave duplicates.
+    """
+    key = correction_key(title)
+    if not key:
+        return
+    await db.category_feedback.update_one(
+        {"_id": owner_id},
+        [
+            {"$set": {"corrections": {"$concatArrays": [
+                {"$filter": {"input": {"$ifNull": ["$corrections", []]}, "cond": {"$ne": ["$$this.title", key]}}},
+                # Keys are lowercase words only, so nothing here reads as a field path
+                [{"title": key, "category": category.value}],
+            ]}}},
+            {"$set": {"corrections": {"$slice": ["$corrections", -settings.CATEGORY_CORRECTIONS_MAX_PER_USER]}}},
+        ],
+        upsert=True
+    )
+    user_classifier_cache.invalidate(owner_id)
@@ -1,25 +1,91 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict
+from bson import ObjectId
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
 
 
 from core.config import settings
-from models.user import User, UserCreate, TokenData
+from models.user import User, UserCreate, UserPreferences, TokenData
 from core.database import get_database # Updated import
+from core.cache import TTLCache
+from core import metrics
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/users/login")
+# EventSource can't set headers, so streaming endpoints also accept the token as ?access_token=
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/users/login", auto_error=False)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+# Per-process caches that keep get_current_user off MongoDB for repeat requests.
+# Every write to a user calls invalidate_user_cache; other workers see it within AUTH_CACHE_TTL_SECONDS.
+user_cache = TTLCache(max_entries=settings.AUTH_CACHE_MAX_ENTRIES, ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS)
+token_cache = TTLCache(max_entries=settings.AUTH_CACHE_MAX_ENTRIES, ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+# bcrypt takes ~100-300 ms of CPU per call, so it runs in a bounded pool instead of on the event loop
+hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+hash_pool_stats = {"pending": 0, "completed": 0, "failed": 0, "rejected": 0}
 
+def get_hash_pool_stats() -> Dict[str, int]:
+    pending = hash_pool_stats["pending"]
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "queue_depth": max(0, pending - settings.PASSWORD_HASH_WORKERS),
+        **hash_pool_stats,
+    }
+
+def shutdown_hash_pool():
+    hash_executor.shutdown(wait=False, cancel_futures=True)
+
+async def _run_in_hash_pool(func, *args):
+    if hash_pool_stats["pending"] >= settings.PASSWORD_HASH_MAX_PENDING:
+        # Shed load rather than queueing logins behind a burst that would time out anyway
+        hash_pool_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login requests, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    loop = asyncio.get_running_loop()
+    hash_pool_stats["pending"] += 1
+    future = hash_executor.submit(func, *args)
+    # Counted when the thread is done with it, not when the request stops waiting (e.g. on a disconnect)
+    future.add_done_callback(lambda done: _call_soon_in_loop(loop, _record_hash_done, done))
+    return await asyncio.wrap_future(future)
+
+def _call_soon_in_loop(loop: asyncio.AbstractEventLoop, callback, *args):
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        # The loop closed first, at shutdown
+        pass
+
+def _record_hash_done(future):
+    hash_pool_stats["pending"] -= 1
+    if future.cancelled():
+        # Dropped from the queue before a thread picked it up
+        return
+    hash_pool_stats["failed" if future.exception() else "completed"] += 1
+
+def invalidate_user_cache(email: str):
+    """Drops this process's cached copy of a user whose data or preferences changed."""
+    user_cache.invalidate(email)
+
+@metrics.timed
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(pwd_context.verify, plain_password, hashed_password)
+
+@metrics.timed
+async def get_password_hash(password: str) -> str:
+    return await _run_in_hash_pool(pwd_context.hash, password)
+
+@metrics.timed
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -30,26 +96,58 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def decode_access_token(token: str) -> Dict:
+    """Verifies a JWT once and reuses the result until the token expires."""
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        expires_at = payload.get("exp")
+        token_cache.set(token, payload, ttl_seconds=expires_at - time.time() if expires_at else None)
+    return payload
+
+@metrics.timed
 async def get_user_by_email(db: AsyncIOMotorDatabase, email: str) -> Optional[User]:
     user_doc = await db.users.find_one({"email": email})
     if user_doc:
         return User(**user_doc)
     return None
 
+@metrics.timed
+async def get_user_by_id(db: AsyncIOMotorDatabase, user_id: ObjectId) -> Optional[User]:
+    user_doc = await db.users.find_one({"_id": user_id})
+    if user_doc:
+        return User(**user_doc)
+    return None
+
+@metrics.timed
 async def create_user(db: AsyncIOMotorDatabase, user_data: UserCreate) -> User:
     if await get_user_by_email(db, user_data.email):
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     
     # Create a User instance, Pydantic-Mongo handles the _id
     new_user = User(email=user_data.email, hashed_password=hashed_password)
     
     # Insert the user document into the database
     await db.users.insert_one(new_user.model_dump(by_alias=True))
+    invalidate_user_cache(new_user.email)
     
     return new_user
 
+@metrics.timed
+async def update_preferences(db: AsyncIOMotorDatabase, user: User, preferences: UserPreferences) -> User:
+    user_doc = await db.users.find_one_and_update(
+        {"_id": user.id},
+        {"$set": {"preferences": preferences.model_dump(mode="json")}},
+        return_document=ReturnDocument.AFTER
+    )
+    invalidate_user_cache(user.email)
+    if not user_doc:
+        raise HTTPException(status_code=404, detail="User not found")
+    return User(**user_doc)
+
+@metrics.timed
 async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncIOMotorDatabase = Depends(get_database)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -57,13 +155,24 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncIOMotor
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_access_token(token)
         email: str = payload.get("sub")
         if email is None: raise credentials_exception
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
     
-    user = await get_user_by_email(db=db, email=token_data.email)
-    if user is None: raise credentials_exception
-    return user
\ No newline at end of file
+    user = user_cache.get(token_data.email)
+    if user is None:
+        user = await get_user_by_email(db=db, email=token_data.email)
+        if user is None: raise credentials_exception
+        user_cache.set(token_data.email, user)
+    return user
+
+async def get_current_user_from_header_or_query(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None, description="The bearer token, for clients that can't set an Authorization header."),
+    db: AsyncIOMotorDatabase = Depends(get_database),
+) -> User:
+    """get_current_user for streaming endpoints, taking the same JWT from either place."""
+    return await get_current_user(token=token or access_token or "", db=db)
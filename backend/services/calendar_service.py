@@ -1,33 +1,226 @@
-from typing import List, Optional
-from datetime import datetime, timedelta
-from models.event import Event
+import calendar
+from bisect import bisect_right
+from collections import deque
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+from models.event import Event, OccurrenceException, RecurrenceFrequency, RecurrenceRule
+from core.config import settings
+from core import metrics
 
-def check_conflict(new_event: Event, existing_events: List[Event]) -> Optional[Event]:
+# Stored as series_end for series with neither `until` nor `count`, so window queries still match them
+OPEN_ENDED_SERIES_END = datetime(9999, 12, 31)
+# Free/busy bitsets have one bit per slot of the day, bit 0 being midnight
+SLOT = timedelta(minutes=15)
+SLOTS_PER_DAY = timedelta(days=1) // SLOT
+
+def now() -> datetime:
+    """The current CALENDAR_TIMEZONE wall-clock time, comparable with stored event times."""
+    return datetime.now(ZoneInfo(settings.CALENDAR_TIMEZONE)).replace(tzinfo=None)
+
+def to_calendar_time(moment: datetime) -> datetime:
+    """A timezone-aware datetime as the naive CALENDAR_TIMEZONE wall-clock time events are stored in."""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(ZoneInfo(settings.CALENDAR_TIMEZONE)).replace(tzinfo=None)
+
+def _add_months(start: datetime, months: int) -> datetime:
+    # A series on the 31st falls on the last day of shorter months
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    return start.replace(year=year, month=month, day=min(start.day, calendar.monthrange(year, month)[1]))
+
+def _rule_starts(start: datetime, rule: RecurrenceRule, not_before: datetime) -> Iterator[datetime]:
+    """
+    Yields the occurrence starts the rule generates, in order, beginning with
+    the first one at or after not_before. It jumps straight there rather than
+    walking the series, so the cost depends on how many starts are consumed.
+    """
+    until = to_calendar_time(rule.until) if rule.until else None
+    if rule.frequency == RecurrenceFrequency.WEEKLY:
+        weekdays = sorted(set(rule.by_weekday or [start.weekday()]))
+        first_week = start - timedelta(days=start.weekday())
+        period = timedelta(weeks=rule.interval)
+        week_index = max(0, (not_before - first_week) // period)
+        # Occurrences already generated before week_index: whole weeks, less the first week's days before the start
+        generated = 0
+        if week_index:
+            generated = week_index * len(weekdays) - sum(1 for day in weekdays if first_week + timedelta(days=day) < start)
+        while True:
+            week = first_week + week_index * period
+            for day in weekdays:
+                occurrence = week + timedelta(days=day)
+                if occurrence < start:
+                    continue
+                if (rule.count and generated >= rule.count) or (until and occurrence > until):
+                    return
+                generated += 1
+                if occurrence >= not_before:
+                    yield occurrence
+            week_index += 1
+
+    if rule.frequency == RecurrenceFrequency.MONTHLY:
+        months = (not_before.year - start.year) * 12 + not_before.month - start.month
+        index = max(0, months // rule.interval - 1)
+        next_start = lambda i: _add_months(start, i * rule.interval)
+    else:
+        period = timedelta(days=rule.interval)
+        index = max(0, (not_before - start) // period)
+        next_start = lambda i: start + i * period
+
+    while True:
+        occurrence = next_start(index)
+        if (rule.count and index >= rule.count) or (until and occurrence > until):
+            return
+        if occurrence >= not_before:
+            yield occurrence
+        index += 1
+
+def _occurrence(event: Event, original_start: datetime, duration: timedelta, exception: Optional[OccurrenceException] = None) -> Event:
+    update = {
+        "start_time": original_start,
+        "end_time": original_start + duration,
+        "occurrence_start": original_start,
+        "recurrence": None,
+        "exceptions": [],
+    }
+    if exception:
+        update.update({
+            field: value
+            for field, value in exception.model_dump(include={"start_time", "end_time", "title", "location", "notes"}).items()
+            if value is not None
+        })
+        if exception.start_time and not exception.end_time:
+            update["end_time"] = exception.start_time + duration
+    return event.model_copy(update=update)
+
+def expand_occurrences(event: Event, window_start: datetime, window_end: datetime) -> Iterator[Event]:
+    """
+    Lazily yields the occurrences of event that overlap [window_start, window_end),
+    with its exceptions applied. A non-recurring event is its own single occurrence.
+    """
+    window_start, window_end = to_calendar_time(window_start), to_calendar_time(window_end)
+    if event.recurrence is None:
+        if event.start_time < window_end and (event.end_time is None or event.end_time > window_start):
+            yield event
+        return
+
+    duration = (event.end_time or event.start_time) - event.start_time
+    exceptions = {exception.original_start: exception for exception in event.exceptions}
+    for original_start in _rule_starts(event.start_time, event.recurrence, window_start - duration):
+        if original_start >= window_end:
+            break
+        if original_start in exceptions or original_start + duration <= window_start:
+            continue
+        yield _occurrence(event, original_start, duration)
+
+    # Edited occurrences may have been moved into the window from outside it
+    for exception in event.exceptions:
+        if exception.cancelled:
+            continue
+        occurrence = _occurrence(event, exception.original_start, duration, exception)
+        if occurrence.start_time < window_end and occurrence.end_time > window_start:
+            yield occurrence
+
+def expand_events(events: Iterable[Event], window_start: datetime, window_end: datetime) -> Iterator[Event]:
+    """Passes non-recurring events through untouched and expands recurring ones within the window."""
+    for event in events:
+        if event.recurrence is None:
+            yield event
+        else:
+            yield from expand_occurrences(event, window_start, window_end)
+
+def is_occurrence(event: Event, original_start: datetime) -> bool:
+    """Whether the event's rule starts an occurrence at exactly original_start."""
+    if event.recurrence is None:
+        return False
+    original_start = to_calendar_time(original_start)
+    return next(_rule_starts(event.start_time, event.recurrence, original_start), None) == original_start
+
+def compute_series_end(event: Event) -> Optional[datetime]:
+    """The end of a recurring event's last occurrence, or None for a single event."""
+    rule = event.recurrence
+    if rule is None:
+        return None
+    duration = (event.end_time or event.start_time) - event.start_time
+    if rule.count:
+        last_start = deque(_rule_starts(event.start_time, rule, event.start_time), maxlen=1)[0]
+        series_end = last_start + duration
+    elif rule.until:
+        series_end = to_calendar_time(rule.until) + duration
+    else:
+        return OPEN_ENDED_SERIES_END
+    moved_ends = [exception.end_time or exception.start_time + duration for exception in event.exceptions if exception.start_time and not exception.cancelled]
+    return max([series_end, *moved_ends])
+
+def _first_overlap(event_id, start: datetime, end: datetime, existing_events: Iterable[Event]) -> Optional[Event]:
     for existing_event in existing_events:
         # Don't check for conflict with itself
-        if new_event.id and new_event.id == existing_event.id:
+        if event_id and event_id == existing_event.id:
             continue
-        if existing_event.end_time and new_event.end_time:
-            if new_event.start_time < existing_event.end_time and new_event.end_time > existing_event.start_time:
+        if not existing_event.end_time:
+            continue
+        if existing_event.recurrence is None:
+            if start < existing_event.end_time and end > existing_event.start_time:
                 return existing_event
+        else:
+            for occurrence in expand_occurrences(existing_event, start, end):
+                return occurrence
     return None
 
+@metrics.timed
+def check_conflict(new_event: Event, existing_events: Iterable[Event], window_end: Optional[datetime] = None) -> Optional[Event]:
+    """
+    Returns the first existing event, or occurrence of a recurring one, that
+    overlaps new_event. A recurring new_event is checked occurrence by
+    occurrence up to window_end.
+    """
+    if not new_event.end_time:
+        return None
+    if new_event.recurrence is None:
+        return _first_overlap(new_event.id, new_event.start_time, new_event.end_time, existing_events)
+
+    existing_events = list(existing_events)
+    for occurrence in expand_occurrences(new_event, new_event.start_time, window_end or new_event.end_time):
+        conflicting_event = _first_overlap(new_event.id, occurrence.start_time, occurrence.end_time, existing_events)
+        if conflicting_event:
+            return conflicting_event
+    return None
+
+@metrics.timed
 def find_next_available_slots(
     start_time: datetime,
     duration: timedelta,
-    existing_events: List[Event],
-    count: int = 3
+    existing_events: Iterable[Event],
+    count: int = 3,
+    horizon_end: Optional[datetime] = None
 ) -> List[datetime]:
     """
     Finds the next available time slots on a calendar.
+
+    Busy intervals are swept once in start order. A running maximum of their
+    end times turns "first event overlapping this candidate" into a bisect,
+    so the search is O(events log events) instead of rescanning every event
+    for each 15-minute candidate.
+
+    existing_events may mix several owners' events; a slot is then only
+    suggested when all of them are free. Recurring events are expanded up to
+    horizon_end (SLOT_SEARCH_HORIZON_DAYS ahead by default).
     """
     suggestions = []
-    
-    # Sort events by start time to make scanning easier
-    sorted_events = sorted(existing_events, key=lambda e: e.start_time)
-    
+
     # Start looking for slots from the end of the conflicting event or 30 mins from now
-    search_time = max(start_time, datetime.now() + timedelta(minutes=30))
+    search_time = max(start_time, now() + timedelta(minutes=30))
+    horizon_end = horizon_end or search_time + timedelta(days=settings.SLOT_SEARCH_HORIZON_DAYS)
+
+    # Sort events by start time (stable, so ties keep their input order)
+    busy = sorted(
+        ((e.start_time, e.end_time) for e in expand_events(existing_events, search_time, horizon_end) if e.end_time),
+        key=lambda b: b[0]
+    )
+    # max_ends[i] is the latest end among busy[0..i]; it never decreases, so it can be bisected
+    max_ends = list(accumulate((end for _, end in busy), max))
 
     while len(suggestions) < count:
         # Round up to the next 15-minute interval
@@ -35,25 +228,101 @@ def find_next_available_slots(
 
         # Define the potential new event's time window
         potential_end_time = search_time + duration
-        
+
         # Check if the slot is within reasonable hours (e.g., 8am to 10pm)
         if not (8 <= search_time.hour < 22):
             # If it's too late, jump to 8am the next day
             search_time = search_time.replace(hour=8, minute=0, second=0) + timedelta(days=1)
             continue
 
-        # Check for conflicts with existing events
-        is_free = True
-        for event in sorted_events:
-            if search_time < event.end_time and potential_end_time > event.start_time:
-                is_free = False
-                # Jump search time to the end of the conflicting event
-                search_time = event.end_time
-                break
-        
-        if is_free:
-            suggestions.append(search_time)
-            # Move to the next slot after the one we just found
-            search_time = potential_end_time
+        # The first event (in start order) ending after search_time is the only candidate
+        # for the first overlap: everything before it has already ended.
+        index = bisect_right(max_ends, search_time)
+        if index < len(busy) and busy[index][0] < potential_end_time:
+            # Jump search time to the end of the conflicting event
+            search_time = busy[index][1]
+            continue
+
+        suggestions.append(search_time)
+        # Move to the next slot after the one we just found
+        search_time = potential_end_time
+
+    return suggestions
+
+
+def slot_mask(first_slot: int, end_slot: int) -> int:
+    """The bits of slots first_slot up to (not including) end_slot."""
+    return ((1 << end_slot) - 1) ^ ((1 << first_slot) - 1)
+
+def day_slot_ranges(start: datetime, end: datetime) -> Iterator[Tuple[date, int, int]]:
+    """
+    Splits [start, end) into (day, first slot, end slot) for each day it
+    touches, rounded outwards to the slot grid.
+    """
+    day = start.date()
+    while True:
+        day_start = datetime.combine(day, time.min)
+        if day_start >= end:
+            return
+        first_slot = max(0, (start - day_start) // SLOT)
+        end_slot = min(SLOTS_PER_DAY, -((day_start - end) // SLOT))
+        if first_slot < end_slot:
+            yield day, first_slot, end_slot
+        day += timedelta(days=1)
+
+def _busy_until(busy_days: Dict[date, int], start: datetime, end: datetime) -> Optional[datetime]:
+    """The end of the first run of busy slots overlapping [start, end), or None if it is all free."""
+    for day, first_slot, end_slot in day_slot_ranges(start, end):
+        overlap = busy_days.get(day, 0) & slot_mask(first_slot, end_slot)
+        if not overlap:
+            continue
+        slot = (overlap & -overlap).bit_length() - 1
+        # Follow the run of busy slots, across midnight if need be
+        while True:
+            bits = busy_days.get(day, 0) >> slot
+            slot += (~bits & (bits + 1)).bit_length() - 1
+            if slot < SLOTS_PER_DAY:
+                return datetime.combine(day, time.min) + slot * SLOT
+            day, slot = day + timedelta(days=1), 0
+    return None
+
+def overlaps_busy(busy_days: Dict[date, int], event: Event, window_end: Optional[datetime] = None) -> bool:
+    """
+    Whether any slot event (or, for a series, any occurrence up to window_end)
+    touches is busy. Slots are 15 minutes, so a True is only a candidate
+    conflict; a False is definite.
+    """
+    if not event.end_time:
+        return False
+    for occurrence in expand_occurrences(event, event.start_time, window_end or event.end_time):
+        if _busy_until(busy_days, occurrence.start_time, occurrence.end_time):
+            return True
+    return False
+
+def find_free_slots(busy_days: Dict[date, int], start_time: datetime, duration: timedelta, count: int = 3) -> List[datetime]:
+    """
+    find_next_available_slots over free/busy bitsets: a candidate is rejected
+    by masking its slots instead of searching the events, and the search
+    jumps past a whole run of busy slots at once, so back-to-back events are
+    skipped as one block. Days missing from busy_days count as free.
+    """
+    suggestions = []
+    search_time = max(start_time, now() + timedelta(minutes=30))
+
+    while len(suggestions) < count:
+        search_time += timedelta(minutes=(15 - search_time.minute % 15))
+        potential_end_time = search_time + duration
+
+        if not (8 <= search_time.hour < 22):
+            search_time = search_time.replace(hour=8, minute=0, second=0) + timedelta(days=1)
+            continue
+
+        busy_until = _busy_until(busy_days, search_time, potential_end_time)
+        if busy_until:
+            search_time = busy_until
+            continue
+
+        suggestions.append(search_time)
+        search_time = potential_end_time
 
     return suggestions
@@ -1,64 +1,222 @@
-from typing import Dict, Optional, List
-from datetime import datetime
+import asyncio
+import base64
+import copy
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional, List, Tuple
+from datetime import datetime, timedelta
 from bson import ObjectId
 from fastapi import HTTPException
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from models.event import Event, EventPublic, ConflictCheckResponse, Reminder, SharePayload, EventState, StatusUpdate
-from services import nlp_service, calendar_service, assistant_service
+from pymongo import DeleteOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from models.event import Event, EventCategory, Reminder, SharePayload, EventState, StatusUpdate, OccurrenceException, OccurrenceUpdate, BulkSelection
+from services import nlp_service, calendar_service, assistant_service, reminder_service, freebusy_service, ical_service
 from models.user import User
+from core.config import settings
+from core import metrics
 
-async def create_event(db: AsyncIOMotorDatabase, text: str, current_user: User) -> ConflictCheckResponse:
-    # 1. Parse the event using the LLM
-    parsed_details = await nlp_service.parse_event_from_text(text)
-    
-    # 2. Agentic Step: Categorize the event
-    category = assistant_service.categorize_event(parsed_details.title)
-    
-    # 3. Create a new event
-    event_instance = await _create_new_event(db, parsed_details, category, current_user)
+# Called with (owner_id, notification) after every event write in this process.
+# notification_service listens here when change streams aren't available, and tests can too.
+change_listeners: List[Callable[[ObjectId, Dict[str, Any]], None]] = []
+
+def _publish_change(change_type: str, docs: List[Dict[str, Any]]):
+    if not change_listeners:
+        return
+    for doc in docs:
+        event = tombstone_to_public(doc) if change_type == "deleted" else event_document_to_public(doc)
+        for listener in change_listeners:
+            listener(doc["owner_id"], {"type": change_type, "event": event})
+
+async def _publish_reminded(db: AsyncIOMotorDatabase, event_ids: List[ObjectId]):
+    if change_listeners:
+        _publish_change("updated", await db.events.find({"_id": {"$in": event_ids}}).to_list(length=None))
+
+reminder_service.claim_listeners.append(_publish_reminded)
+
+@metrics.timed
+async def create_event(db: AsyncIOMotorDatabase, text: str, current_user: User, event_id: Optional[ObjectId] = None) -> Dict[str, Any]:
+    """
+    With an event_id, creating is idempotent: a background job run again after
+    its lease lapsed picks up the event an earlier attempt created with that id.
+    """
+    event_instance = await _get_created_event(db, event_id, current_user.id) if event_id else None
+    if event_instance is None:
+        # 1. Parse the event using the LLM
+        with metrics.stage("create_event", "parse"):
+            parsed_details = await nlp_service.parse_event_from_text(text, db=db)
+
+        # 2. Agentic Step: Categorize the event
+        with metrics.stage("create_event", "categorize"):
+            user_classifier = await assistant_service.get_user_classifier(db, current_user.id)
+            category = assistant_service.categorize_event(parsed_details.title, user_classifier)
+
+        # 3. Create a new event
+        with metrics.stage("create_event", "insert"):
+            try:
+                event_instance = await _create_new_event(db, parsed_details, category, current_user, event_id)
+                await db.event_timeline.insert_one(_created_timeline_entry(event_instance))
+            except DuplicateKeyError:
+                if not event_id:
+                    raise
+                # Another attempt of the same job inserted it in the meantime
+                event_instance = await _get_created_event(db, event_id, current_user.id)
+
+    # 4. Check for conflicts against the user's free/busy bitsets. Only a busy slot needs
+    #    the events in the window, to confirm the overlap and name the conflicting event.
+    window_end = _conflict_window_end(event_instance)
+    with metrics.stage("create_event", "freebusy"):
+        busy_days = await freebusy_service.get_busy_days(
+            db, [current_user.id], event_instance.start_time, window_end, exclude_id=event_instance.id
+        )
+        maybe_conflict = calendar_service.overlaps_busy(busy_days, event_instance, window_end)
+        if not maybe_conflict:
+            # The cached days may predate another worker's write, so confirm "free" from their
+            # freebusy documents; only a series another worker just wrote can still be missed,
+            # for up to FREEBUSY_CACHE_TTL_SECONDS
+            busy_days = await freebusy_service.get_busy_days(
+                db, [current_user.id], event_instance.start_time, window_end, exclude_id=event_instance.id, fresh=True
+            )
+            maybe_conflict = calendar_service.overlaps_busy(busy_days, event_instance, window_end)
+
+    conflicting_event = None
+    if maybe_conflict:
+        with metrics.stage("create_event", "load_window"):
+            overlapping_events = await get_events_in_window(
+                db, current_user.id, event_instance.start_time, window_end, exclude_id=event_instance.id
+            )
+        with metrics.stage("create_event", "check_conflict"):
+            conflicting_event = calendar_service.check_conflict(event_instance, overlapping_events, window_end)
 
-    # 4. Check for conflicts against the user's other events
-    user_events_cursor = db.events.find({"owner_id": current_user.id})
-    user_events = [Event(**doc) async for doc in user_events_cursor]
-    conflicting_event = calendar_service.check_conflict(event_instance, user_events)
-    
     suggested_times = []
     if conflicting_event:
-        duration = event_instance.end_time - event_instance.start_time
-        suggested_times = calendar_service.find_next_available_slots(
-            start_time=conflicting_event.end_time,
-            duration=duration,
-            existing_events=user_events
+        # Slot search only walks forward, so a bounded horizon of upcoming days is enough
+        search_from = max(conflicting_event.end_time, calendar_service.now())
+        with metrics.stage("create_event", "load_upcoming"):
+            upcoming_busy_days = await freebusy_service.get_busy_days(
+                db, [current_user.id], search_from, search_from + timedelta(days=settings.SLOT_SEARCH_HORIZON_DAYS)
+            )
+        suggested_times = calendar_service.find_free_slots(
+            upcoming_busy_days, conflicting_event.end_time, event_instance.end_time - event_instance.start_time
         )
 
+    with metrics.stage("create_event", "build_response"):
+        return _build_conflict_response(event_instance, conflicting_event, suggested_times)
+
+
+@metrics.timed
+async def create_events_batch(db: AsyncIOMotorDatabase, texts: List[str], current_user: User) -> List[Dict[str, Any]]:
+    """
+    Creates several events at once: parses them concurrently, writes them with a
+    single insert_many and checks conflicts once against the combined set,
+    so events in the same batch are checked against each other too.
+    """
+    # 1. Parse every text, with a bounded number of LLM calls in flight
+    semaphore = asyncio.Semaphore(settings.BATCH_PARSE_CONCURRENCY)
+
+    async def parse(text: str) -> nlp_service.ParsedEventDetails:
+        async with semaphore:
+            return await nlp_service.parse_event_from_text(text, db=db)
+
+    with metrics.stage("create_events_batch", "parse"):
+        all_parsed_details = await asyncio.gather(*(parse(text) for text in texts))
+    return await _create_parsed_events(db, all_parsed_details, current_user, "create_events_batch")
+
+
+@metrics.timed
+async def create_events_from_text(db: AsyncIOMotorDatabase, text: str, current_user: User) -> Dict[str, Any]:
+    """
+    Creates every event found in one long text, e.g. a pasted newsletter, from a
+    single LLM call per chunk of text rather than one per event, then writes and
+    conflict-checks them together like a batch.
+    """
+    with metrics.stage("create_events_from_text", "extract"):
+        all_parsed_details, chunks, failed_chunks = await nlp_service.extract_events_from_text(text, db=db)
+    if chunks and failed_chunks == chunks:
+        raise HTTPException(status_code=503, detail="Could not extract events from the text, please try again")
+    results = await _create_parsed_events(db, all_parsed_details, current_user, "create_events_from_text")
+    return {"results": results, "chunks": chunks, "failed_chunks": failed_chunks}
+
+
+async def _create_parsed_events(db: AsyncIOMotorDatabase, all_parsed_details: List[nlp_service.ParsedEventDetails], current_user: User, operation: str) -> List[Dict[str, Any]]:
+    """Writes parsed events with one insert_many and checks them for conflicts in one combined pass."""
+    if not all_parsed_details:
+        return []
+
+    # 2. Categorize the whole batch at once and build the new events
+    with metrics.stage(operation, "categorize"):
+        user_classifier = await assistant_service.get_user_classifier(db, current_user.id)
+        categories = assistant_service.categorize_events([parsed_details.title for parsed_details in all_parsed_details], user_classifier)
+    new_events = [
+        _build_event(parsed_details, category, current_user)
+        for parsed_details, category in zip(all_parsed_details, categories)
+    ]
+
+    # 3. Load the existing events the whole batch (and its slot search) can touch, then write the batch
+    window_start = min(event.start_time for event in new_events)
+    window_end = max(_conflict_window_end(event) for event in new_events)
+    with metrics.stage(operation, "load_window"):
+        existing_events = await get_events_in_window(
+            db, current_user.id, window_start, window_end + timedelta(days=settings.SLOT_SEARCH_HORIZON_DAYS)
+        )
+    with metrics.stage(operation, "insert"):
+        event_docs = [event.model_dump(by_alias=True) for event in new_events]
+        await db.events.insert_many(event_docs)
+        await db.event_timeline.insert_many([_created_timeline_entry(event) for event in new_events])
+        await freebusy_service.track_events(db, event_docs)
+        _publish_change("created", event_docs)
+
+    # 4. One conflict pass over the existing and new events together
+    combined_events = sorted(existing_events + new_events, key=lambda e: e.start_time)
+    responses = []
+    with metrics.stage(operation, "check_conflicts"):
+        for event in new_events:
+            conflicting_event = calendar_service.check_conflict(event, combined_events, _conflict_window_end(event))
+            suggested_times = []
+            if conflicting_event:
+                suggested_times = calendar_service.find_next_available_slots(
+                    start_time=conflicting_event.end_time,
+                    duration=event.end_time - event.start_time,
+                    existing_events=combined_events
+                )
+            responses.append(_build_conflict_response(event, conflicting_event, suggested_times))
+    return responses
+
+
+def _conflict_window_end(event: Event) -> datetime:
+    """A new series is only checked for conflicts up to the slot search horizon, not over its whole length."""
+    if event.recurrence:
+        return min(event.series_end, event.start_time + timedelta(days=settings.SLOT_SEARCH_HORIZON_DAYS))
+    return event.end_time or event.start_time
+
+
+def _build_conflict_response(event_instance: Event, conflicting_event: Optional[Event], suggested_times: List[datetime]) -> Dict[str, Any]:
+    """Builds the ConflictCheckResponse shape as plain data, ready for orjson."""
     conflict_details_str = f"Conflicts with '{conflicting_event.title}'" if conflicting_event else None
-    
-    # Convert to public model for response
-    public_event = EventPublic(
-        id=str(event_instance.id),
-        owner_id=str(event_instance.owner_id),
-        title=event_instance.title,
-        start_time=event_instance.start_time,
-        end_time=event_instance.end_time,
-        location=event_instance.location,
-        notes=event_instance.notes,
-        category=event_instance.category,
-        state=event_instance.state,
-        reminders=event_instance.reminders,
-        timeline=event_instance.timeline
-    )
 
-    return ConflictCheckResponse(is_conflict=bool(conflicting_event), conflict_details=conflict_details_str, created_event=public_event, suggested_times=suggested_times)
+    return {
+        "is_conflict": bool(conflicting_event),
+        "conflict_details": conflict_details_str,
+        "created_event": event_document_to_public(event_instance.model_dump(by_alias=True)),
+        "suggested_times": suggested_times,
+    }
 
 
-async def _create_new_event(db: AsyncIOMotorDatabase, parsed_details: nlp_service.ParsedEventDetails, category: assistant_service.EventCategory, current_user: User) -> Event:
+def _build_event(parsed_details: nlp_service.ParsedEventDetails, category: assistant_service.EventCategory, current_user: User) -> Event:
     note_about_category = f"Assistant classified this as: {category.value}."
     if parsed_details.notes:
-        parsed_details.notes += f"\n{note_about_category}"
+        # Imported events may already carry it
+        if not parsed_details.notes.endswith(note_about_category):
+            parsed_details.notes += f"\n{note_about_category}"
     else:
         parsed_details.notes = note_about_category
 
-    event_data = Event(
+    # Attach the user's default reminder for this category, e.g. 45 minutes before sports
+    reminders = []
+    default_minutes = current_user.preferences.default_reminders.get(category)
+    if default_minutes:
+        reminders.append(Reminder(minutes_before=default_minutes))
+
+    event = Event(
         owner_id=current_user.id,
         title=parsed_details.title,
         start_time=parsed_details.start_time,
@@ -66,24 +224,78 @@ async def _create_new_event(db: AsyncIOMotorDatabase, parsed_details: nlp_servic
         location=parsed_details.location,
         notes=parsed_details.notes,
         category=category,
-        timeline=[{
-            "timestamp": datetime.utcnow().isoformat(),
-            "action": "Event Created",
-            "details": f"Category: {category.value}"
-        }]
+        reminders=reminders,
+        next_reminder_at=reminder_service.compute_next_reminder_at(parsed_details.start_time, [r.minutes_before for r in reminders]),
+        recurrence=parsed_details.recurrence
     )
-    
-    insert_result = await db.events.insert_one(event_data.model_dump(by_alias=True))
-    event_data.id = insert_result.inserted_id
+    event.series_end = calendar_service.compute_series_end(event)
+    return event
+
+
+def _timeline_entry(event_id: ObjectId, owner_id: ObjectId, action: str, details: Optional[str] = None) -> Dict[str, Any]:
+    entry = {"event_id": event_id, "owner_id": owner_id, "timestamp": datetime.utcnow(), "action": action}
+    if details:
+        entry["details"] = details
+    return entry
+
+def _created_timeline_entry(event: Event) -> Dict[str, Any]:
+    return _timeline_entry(event.id, event.owner_id, "Event Created", f"Category: {event.category.value}")
+
+async def _append_timeline(db: AsyncIOMotorDatabase, event_id: str, owner_id: ObjectId, action: str, details: Optional[str] = None):
+    """Timeline entries live in their own append-only collection so event reads never carry them."""
+    await db.event_timeline.insert_one(_timeline_entry(ObjectId(event_id), owner_id, action, details))
+
+
+async def _create_new_event(db: AsyncIOMotorDatabase, parsed_details: nlp_service.ParsedEventDetails, category: assistant_service.EventCategory, current_user: User, event_id: Optional[ObjectId] = None) -> Event:
+    event_data = _build_event(parsed_details, category, current_user)
+    if event_id:
+        event_data.id = event_id
+    event_doc = event_data.model_dump(by_alias=True)
+    await db.events.insert_one(event_doc)
+    await freebusy_service.track_events(db, [event_doc])
+    _publish_change("created", [event_doc])
     return event_data
 
 
+async def _get_created_event(db: AsyncIOMotorDatabase, event_id: ObjectId, owner_id: ObjectId) -> Optional[Event]:
+    event_doc = await db.events.find_one({"_id": event_id, "owner_id": owner_id})
+    return Event(**event_doc) if event_doc else None
+
+@metrics.timed
 async def get_event_by_id(db: AsyncIOMotorDatabase, event_id: str, owner_id: ObjectId) -> Optional[Event]:
     event_doc = await db.events.find_one({"_id": ObjectId(event_id), "owner_id": owner_id})
     if event_doc:
         return Event(**event_doc)
     return None
 
+@metrics.timed
+async def get_event_document(db: AsyncIOMotorDatabase, event_id: str, owner_id: ObjectId) -> Optional[Dict[str, Any]]:
+    return await db.events.find_one({"_id": ObjectId(event_id), "owner_id": owner_id})
+
+def _overlaps_after(window_start: datetime) -> Dict[str, Any]:
+    # A series' own end_time is only its first occurrence; series_end covers the rest
+    return {"$or": [{"end_time": {"$gt": window_start}}, {"series_end": {"$gt": window_start}}]}
+
+@metrics.timed
+async def get_events_in_window(db: AsyncIOMotorDatabase, owner_id: ObjectId, window_start: datetime, window_end: datetime, exclude_id: Optional[ObjectId] = None) -> List[Event]:
+    """
+    Fetches only the owner's events that overlap [window_start, window_end),
+    served by the (owner_id, start_time, end_time) index. Recurring events are
+    matched on their series_end and returned unexpanded. Cancelled events
+    don't take up time, as in the free/busy bitsets.
+    """
+    query = {
+        "owner_id": owner_id,
+        "start_time": {"$lt": window_end},
+        "state": {"$ne": EventState.CANCELLED},
+        **_overlaps_after(window_start),
+    }
+    if exclude_id:
+        query["_id"] = {"$ne": exclude_id}
+    cursor = db.events.find(query).sort("start_time", 1)
+    return [Event(**doc) async for doc in cursor]
+
+@metrics.timed
 async def get_all_events(db: AsyncIOMotorDatabase, owner_id: ObjectId) -> List[Event]:
     events = []
     cursor = db.events.find({"owner_id": owner_id})
@@ -91,99 +303,649 @@ async def get_all_events(db: AsyncIOMotorDatabase, owner_id: ObjectId) -> List[E
         events.append(Event(**document))
     return events
 
-async def confirm_event(db: AsyncIOMotorDatabase, event_id: str, owner_id: ObjectId) -> Optional[Event]:
-    event = await get_event_by_id(db, event_id, owner_id)
-    if not event: return None
-    
-    update_result = await db.events.update_one(
-        {"_id": ObjectId(event_id)},
-        {
-            "$set": {"state": EventState.CONFIRMED, "is_confirmed": True},
-            "$push": {"timeline": {"timestamp": datetime.utcnow().isoformat(), "action": "Event Confirmed"}}
-        }
+PUBLIC_EVENT_FIELDS = ("title", "start_time", "end_time", "location", "notes", "category", "state", "reminders", "recurrence", "exceptions", "updated_at")
+# Documents written before a field existed get the default Event(**doc) used to fill in
+PUBLIC_EVENT_DEFAULTS = {"category": EventCategory.UNCATEGORIZED, "state": EventState.DRAFT, "reminders": [], "exceptions": []}
+
+def tombstone_to_public(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """The EventTombstone shape that stands in for a deleted event."""
+    return {"id": str(doc["_id"]), "deleted": True, "deleted_at": doc["deleted_at"]}
+
+def event_document_to_public(doc: Dict[str, Any], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Maps a raw event document straight to the EventPublic shape without building
+    any models. Datetimes and enums are left for orjson to serialize.
+    """
+    public = {"id": str(doc["_id"]), "owner_id": str(doc["owner_id"])}
+    for field in fields or PUBLIC_EVENT_FIELDS:
+        public[field] = doc[field] if field in doc else copy.copy(PUBLIC_EVENT_DEFAULTS.get(field))
+    return public
+
+def encode_cursor(position: datetime, doc_id: ObjectId) -> str:
+    raw = f"{position.isoformat()}|{doc_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        start_time, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(start_time), ObjectId(event_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def encode_sync_token(position: datetime) -> str:
+    return base64.urlsafe_b64encode(position.isoformat().encode()).decode()
+
+def decode_sync_token(token: str) -> datetime:
+    try:
+        return datetime.fromisoformat(base64.urlsafe_b64decode(token.encode()).decode())
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+def new_sync_token() -> str:
+    """
+    A token for "changes from now on", issued before the read it goes with.
+    It reaches back SYNC_SAFETY_WINDOW_SECONDS so writes that committed late
+    or carry a slightly skewed clock are sent again rather than missed.
+    """
+    return encode_sync_token(datetime.utcnow() - timedelta(seconds=settings.SYNC_SAFETY_WINDOW_SECONDS))
+
+@metrics.timed
+async def get_events_version(db: AsyncIOMotorDatabase, owner_id: ObjectId) -> str:
+    """
+    Changes whenever one of the owner's events is created, updated or deleted.
+    Two index-only lookups, so a conditional GET /events is cheap to answer.
+    """
+    latest_update, latest_delete = await asyncio.gather(
+        db.events.find_one({"owner_id": owner_id}, {"updated_at": 1}, sort=[("updated_at", -1)]),
+        db.event_tombstones.find_one({"owner_id": owner_id}, {"deleted_at": 1}, sort=[("deleted_at", -1)]),
     )
-    if update_result.modified_count:
-        return await get_event_by_id(db, event_id, owner_id)
-    return None
+    updated_at = latest_update.get("updated_at") if latest_update else None
+    deleted_at = latest_delete["deleted_at"] if latest_delete else None
+    return f"{updated_at.isoformat() if updated_at else '-'}|{deleted_at.isoformat() if deleted_at else '-'}"
 
-async def reschedule_event(db: AsyncIOMotorDatabase, event_id: str, text: str, current_user: User) -> Optional[Event]:
-    original_event = await get_event_by_id(db, event_id, current_user.id)
-    if not original_event:
-        return None
+@metrics.timed
+async def list_event_changes(db: AsyncIOMotorDatabase, owner_id: ObjectId, since: str, fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    The owner's events changed after the sync token, oldest change first,
+    followed by tombstones for the ones deleted since, and the token to
+    send next time.
+    """
+    since_time = decode_sync_token(since)
+    if since_time < datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_TTL_DAYS):
+        # Tombstones this old have expired, so deletions could be missed
+        raise HTTPException(status_code=410, detail="Sync token expired; fetch all events again")
+    sync_token = new_sync_token()
+
+    projection = {field: 1 for field in (*fields, "owner_id")} if fields else None
+    changed_cursor = db.events.find({"owner_id": owner_id, "updated_at": {"$gt": since_time}}, projection).sort("updated_at", 1)
+    deleted_cursor = db.event_tombstones.find({"owner_id": owner_id, "deleted_at": {"$gt": since_time}}).sort("deleted_at", 1)
+    changed_docs, deleted_docs = await asyncio.gather(changed_cursor.to_list(length=None), deleted_cursor.to_list(length=None))
+
+    changes = [event_document_to_public(doc, fields) for doc in changed_docs]
+    changes.extend(tombstone_to_public(doc) for doc in deleted_docs)
+    return changes, sync_token
+
+def _find_events(db: AsyncIOMotorDatabase, owner_id: ObjectId, start: Optional[datetime], end: Optional[datetime], after: Optional[str], fields: Optional[List[str]]):
+    query: Dict[str, Any] = {"owner_id": owner_id}
+    start_time_range = {}
+    if start:
+        start_time_range["$gte"] = start
+    if end:
+        start_time_range["$lt"] = end
+    if after:
+        # Keyset pagination: strictly after the last (start_time, _id) the client saw
+        after_start, after_id = decode_cursor(after)
+        start_time_range["$gte"] = max(start, after_start) if start else after_start
+        query["$or"] = [{"start_time": {"$gt": after_start}}, {"_id": {"$gt": after_id}}]
+    if start_time_range:
+        query["start_time"] = start_time_range
+
+    # start_time is always needed to build the next cursor
+    projection = {field: 1 for field in (*fields, "owner_id", "start_time")} if fields else None
+    return db.events.find(query, projection).sort([("start_time", 1), ("_id", 1)])
+
+@metrics.timed
+async def list_events_page(db: AsyncIOMotorDatabase, owner_id: ObjectId, limit: Optional[int] = None, start: Optional[datetime] = None, end: Optional[datetime] = None, after: Optional[str] = None, fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Returns one page of the owner's events ordered by (start_time, _id), and the
+    cursor for the next page if there is one. Without a limit every event is returned.
+    """
+    cursor = _find_events(db, owner_id, start, end, after, fields)
+    if limit:
+        # One extra document tells us whether there is a next page
+        cursor = cursor.limit(limit + 1)
+    docs = await cursor.to_list(length=None)
+
+    next_cursor = None
+    if limit and len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]["start_time"], docs[-1]["_id"])
+    return [event_document_to_public(doc, fields) for doc in docs], next_cursor
+
+@metrics.timed
+async def stream_events(db: AsyncIOMotorDatabase, owner_id: ObjectId, start: Optional[datetime] = None, end: Optional[datetime] = None, after: Optional[str] = None, fields: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Yields the owner's events one at a time as the cursor produces them."""
+    async for doc in _find_events(db, owner_id, start, end, after, fields):
+        yield event_document_to_public(doc, fields)
+
+async def _update_event(db: AsyncIOMotorDatabase, event_id: str, owner_id: ObjectId, update, publish: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Applies an owner-scoped update and returns the raw updated document in a
+    single round trip, or None if the owner has no such event. Every update
+    bumps updated_at, for delta sync, and is published to change listeners
+    unless the caller has more to write first.
+    """
+    if isinstance(update, list):
+        update = [*update, {"$set": {"updated_at": datetime.utcnow()}}]
+    else:
+        update = {**update, "$set": {**update.get("$set", {}), "updated_at": datetime.utcnow()}}
+    event = await db.events.find_one_and_update(
+        {"_id": ObjectId(event_id), "owner_id": owner_id},
+        update,
+        return_document=ReturnDocument.AFTER
+    )
+    if event and publish:
+        _publish_change("updated", [event])
+    return event
+
+@metrics.timed
+async def confirm_event(db: AsyncIOMotorDatabase, event_id: str, owner_id: ObjectId) -> Optional[Dict[str, Any]]:
+    event = await _update_event(db, event_id, owner_id, {"$set": {"state": EventState.CONFIRMED, "is_confirmed": True}})
+    if event:
+        # A cancelled event takes its time back once confirmed
+        await freebusy_service.track_events(db, [event])
+        await _append_timeline(db, event_id, owner_id, "Event Confirmed")
+    return event
 
-    parsed_details = await nlp_service.parse_event_from_text(text)
+@metrics.timed
+async def reschedule_event(db: AsyncIOMotorDatabase, event_id: str, text: str, current_user: User) -> Optional[Dict[str, Any]]:
+    parsed_details = await nlp_service.parse_event_from_text(text, db=db)
 
-    update_data = {
+    # A pipeline update keeps the current location/notes when the text doesn't mention new ones,
+    # so the original event never has to be read first. $literal stops "$..." text being read as a field path.
+    update_pipeline = [{"$set": {
         "start_time": parsed_details.start_time,
         "end_time": parsed_details.end_time,
-        "location": parsed_details.location or original_event.location,
-        "notes": parsed_details.notes or original_event.notes,
+        "location": {"$ifNull": [{"$literal": parsed_details.location or None}, "$location"]},
+        "notes": {"$ifNull": [{"$literal": parsed_details.notes or None}, "$notes"]},
         "state": EventState.DRAFT,
         "is_confirmed": False,
-    }
-    
-    update_result = await db.events.update_one(
-        {"_id": ObjectId(event_id)},
-        {
-            "$set": update_data,
-            "$push": {"timeline": {"timestamp": datetime.utcnow().isoformat(), "action": "Event Rescheduled", "details": f"New time: {parsed_details.start_time}"}}
-        }
-    )
-    if update_result.modified_count:
-        return await get_event_by_id(db, event_id, current_user.id)
-    return None
+        # The new time re-arms every reminder
+        "next_reminder_at": {"$min": {"$map": {
+            "input": {"$ifNull": ["$reminders", []]},
+            "as": "reminder",
+            "in": {"$subtract": [parsed_details.start_time, {"$multiply": ["$$reminder.minutes_before", 60000]}]},
+        }}},
+        "last_reminder_at": None,
+        "is_reminded": False,
+    }}]
 
+    event = await _update_event(db, event_id, current_user.id, update_pipeline, publish=False)
+    if event and event.get("recurrence"):
+        # Moving a series moves every occurrence, so its exceptions no longer line up with the rule
+        event["exceptions"] = []
+        event["series_end"] = calendar_service.compute_series_end(Event(**event))
+        await db.events.update_one({"_id": event["_id"]}, {"$set": {"exceptions": [], "series_end": event["series_end"], "updated_at": datetime.utcnow()}})
+    if event:
+        _publish_change("updated", [event])
+        await freebusy_service.sync_event(db, event)
+        await _append_timeline(db, event_id, current_user.id, "Event Rescheduled", f"New time: {parsed_details.start_time}")
+    return event
 
-async def add_reminder_to_event(db: AsyncIOMotorDatabase, event_id: str, reminder: Reminder, owner_id: ObjectId) -> Optional[Event]:
-    update_result = await db.events.update_one(
-        {"_id": ObjectId(event_id), "owner_id": owner_id},
-        {
-            "$push": {
-                "reminders": reminder.model_dump(),
-                "timeline": {"timestamp": datetime.utcnow().isoformat(), "action": "Reminder Added"}
-            }
-        }
-    )
-    if update_result.modified_count:
-        return await get_event_by_id(db, event_id, owner_id)
-    return None
 
+@metrics.timed
+async def add_reminder_to_event(db: AsyncIOMotorDatabase, event_id: str, reminder: Reminder, owner_id: ObjectId) -> Optional[Dict[str, Any]]:
+    # Pipeline update so the reminder's fire time is computed from the stored start_time in the same write
+    update_pipeline = [{"$set": {
+        "reminders": {"$concatArrays": [{"$ifNull": ["$reminders", []]}, [{"$literal": reminder.model_dump()}]]},
+        "next_reminder_at": {"$min": ["$next_reminder_at", {"$subtract": ["$start_time", reminder.minutes_before * 60000]}]},
+    }}]
+    event = await _update_event(db, event_id, owner_id, update_pipeline)
+    if event:
+        await _append_timeline(db, event_id, owner_id, "Reminder Added")
+    return event
+
+@metrics.timed
 async def share_event(db: AsyncIOMotorDatabase, event_id: str, share_with: List[str], owner_id: ObjectId) -> Optional[SharePayload]:
-    event = await get_event_by_id(db, event_id, owner_id)
+    event = await _update_event(db, event_id, owner_id, {"$set": {"state": EventState.SHARED, "was_shared": True}})
     if not event: return None
+    await freebusy_service.track_events(db, [event])
+
+    await _append_timeline(db, event_id, owner_id, "Event Shared", f"Simulated sharing with: {', '.join(share_with)}")
     
-    await db.events.update_one(
-        {"_id": ObjectId(event_id)},
-        {
-            "$set": {"state": EventState.SHARED, "was_shared": True},
-            "$push": {"timeline": {"timestamp": datetime.utcnow().isoformat(), "action": "Event Shared", "details": f"Simulated sharing with: {', '.join(share_with)}"}}
-        }
-    )
-    
-    return SharePayload(summary=f"Event: {event.title}", start=event.start_time, location=event.location, notes=event.notes)
+    return SharePayload(summary=f"Event: {event['title']}", start=event["start_time"], location=event.get("location"), notes=event.get("notes"))
 
-async def get_event_timeline(db: AsyncIOMotorDatabase, event_id: str, owner_id: ObjectId) -> Optional[List[Dict]]:
-    event = await get_event_by_id(db, event_id, owner_id)
+@metrics.timed
+async def update_event_category(db: AsyncIOMotorDatabase, event_id: str, category: EventCategory, owner_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Applies a user's category correction and remembers it for their later events with the same title."""
+    event = await _update_event(db, event_id, owner_id, {"$set": {"category": category}})
     if event:
-        return event.timeline
-    return None
+        await assistant_service.learn_category(db, owner_id, event["title"], category)
+        await _append_timeline(db, event_id, owner_id, "Category Corrected", f"Category: {category.value}")
+    return event
 
-async def update_event_status(db: AsyncIOMotorDatabase, event_id: str, status_update: StatusUpdate, owner_id: ObjectId) -> Optional[Event]:
+@metrics.timed
+async def get_event_timeline(db: AsyncIOMotorDatabase, event_id: str, owner_id: ObjectId, limit: Optional[int] = None, after: Optional[str] = None) -> Optional[Tuple[List[Dict], Optional[str]]]:
+    """
+    Returns one page of an event's timeline in chronological order and the
+    cursor for the next page, or None if the event doesn't exist.
+    """
+    if not await db.events.find_one({"_id": ObjectId(event_id), "owner_id": owner_id}, {"_id": 1}):
+        return None
+
+    query: Dict[str, Any] = {"event_id": ObjectId(event_id)}
+    if after:
+        after_timestamp, after_id = decode_cursor(after)
+        query["timestamp"] = {"$gte": after_timestamp}
+        query["$or"] = [{"timestamp": {"$gt": after_timestamp}}, {"_id": {"$gt": after_id}}]
+    cursor = db.event_timeline.find(query).sort([("timestamp", 1), ("_id", 1)])
+    if limit:
+        cursor = cursor.limit(limit + 1)
+    docs = await cursor.to_list(length=None)
+
+    next_cursor = None
+    if limit and len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]["timestamp"], docs[-1]["_id"])
+
+    timeline = []
+    for doc in docs:
+        entry = {"timestamp": doc["timestamp"], "action": doc["action"]}
+        if doc.get("details"):
+            entry["details"] = doc["details"]
+        timeline.append(entry)
+    return timeline, next_cursor
+
+@metrics.timed
+async def update_event_status(db: AsyncIOMotorDatabase, event_id: str, status_update: StatusUpdate, owner_id: ObjectId) -> Optional[Dict[str, Any]]:
     update_data = status_update.model_dump(exclude_unset=True)
     if not update_data:
         raise HTTPException(status_code=400, detail="No status information provided")
 
-    update_result = await db.events.update_one(
-        {"_id": ObjectId(event_id), "owner_id": owner_id},
-        {
-            "$set": update_data,
-            "$push": {"timeline": {"timestamp": datetime.utcnow().isoformat(), "action": "Status Updated", "details": f"New status: {update_data}"}}
-        }
-    )
-    if update_result.modified_count:
-        return await get_event_by_id(db, event_id, owner_id)
-    return None
+    set_fields = dict(update_data)
+    if update_data.get("state") in (EventState.CANCELLED, EventState.COMPLETED):
+        # Finished events never need their reminders
+        set_fields["next_reminder_at"] = None
+    event = await _update_event(db, event_id, owner_id, {"$set": set_fields})
+    if event and "state" in update_data:
+        # Cancelling frees the event's slots; any other state holds them again
+        if event["state"] == EventState.CANCELLED:
+            await freebusy_service.untrack_event(db, event)
+        else:
+            await freebusy_service.track_events(db, [event])
+    if event:
+        await _append_timeline(db, event_id, owner_id, "Status Updated", f"New status: {update_data}")
+    return event
 
+@metrics.timed
+async def list_occurrences(db: AsyncIOMotorDatabase, event_id: str, owner_id: ObjectId, start: datetime, end: datetime) -> Optional[List[Dict[str, Any]]]:
+    """
+    The occurrences of an event that overlap [start, end), in start order, or
+    None if the owner has no such event. Only the window is ever expanded.
+    """
+    start, end = calendar_service.to_calendar_time(start), calendar_service.to_calendar_time(end)
+    if end - start > timedelta(days=settings.OCCURRENCE_WINDOW_MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"The window can span at most {settings.OCCURRENCE_WINDOW_MAX_DAYS} days")
+    event = await get_event_by_id(db, event_id, owner_id)
+    if not event:
+        return None
+
+    occurrences = sorted(calendar_service.expand_occurrences(event, start, end), key=lambda occurrence: occurrence.start_time)
+    return [
+        {**event_document_to_public(occurrence.model_dump(by_alias=True)), "occurrence_start": occurrence.occurrence_start}
+        for occurrence in occurrences
+    ]
+
+async def _set_occurrence_exception(db: AsyncIOMotorDatabase, event: Event, exception: OccurrenceException, action: str) -> Optional[Dict[str, Any]]:
+    """Replaces the exception for one occurrence, if any, in a single pipeline update."""
+    duration = (event.end_time or event.start_time) - event.start_time
+    set_fields: Dict[str, Any] = {"exceptions": {"$concatArrays": [
+        {"$filter": {
+            "input": {"$ifNull": ["$exceptions", []]},
+            "as": "exception",
+            "cond": {"$ne": ["$$exception.original_start", exception.original_start]},
+        }},
+        {"$literal": [exception.model_dump()]},
+    ]}}
+    if exception.start_time and not exception.cancelled:
+        # An occurrence moved past the last one extends the series
+        set_fields["series_end"] = {"$max": ["$series_end", exception.end_time or exception.start_time + duration]}
+
+    updated = await _update_event(db, str(event.id), event.owner_id, [{"$set": set_fields}])
+    if updated:
+        await freebusy_service.track_events(db, [updated])
+        await _append_timeline(db, str(event.id), event.owner_id, action, f"Occurrence: {exception.original_start}")
+    return updated
+
+async def _get_occurrence_event(db: AsyncIOMotorDatabase, event_id: str, original_start: datetime, owner_id: ObjectId) -> Optional[Event]:
+    event = await get_event_by_id(db, event_id, owner_id)
+    if event and not calendar_service.is_occurrence(event, original_start):
+        raise HTTPException(status_code=404, detail="Occurrence not found")
+    return event
+
+@metrics.timed
+async def update_occurrence(db: AsyncIOMotorDatabase, event_id: str, original_start: datetime, occurrence_update: OccurrenceUpdate, owner_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Edits a single occurrence of a recurring event, leaving the rest of the series as it is."""
+    changes = occurrence_update.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No occurrence changes provided")
+    original_start = calendar_service.to_calendar_time(original_start)
+    for field in ("start_time", "end_time"):
+        if changes.get(field):
+            changes[field] = calendar_service.to_calendar_time(changes[field])
+    event = await _get_occurrence_event(db, event_id, original_start, owner_id)
+    if not event:
+        return None
+
+    # Later edits of the same occurrence build on the earlier ones
+    previous = next((exception for exception in event.exceptions if exception.original_start == original_start), None)
+    fields = previous.model_dump() if previous else {}
+    if "start_time" in changes and "end_time" not in changes:
+        # A new start without an end keeps the occurrence's duration
+        fields.pop("end_time", None)
+    exception = OccurrenceException(**{**fields, **changes, "original_start": original_start, "cancelled": False})
+    return await _set_occurrence_exception(db, event, exception, "Occurrence Updated")
+
+@metrics.timed
+async def cancel_occurrence(db: AsyncIOMotorDatabase, event_id: str, original_start: datetime, owner_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Cancels a single occurrence of a recurring event."""
+    original_start = calendar_service.to_calendar_time(original_start)
+    event = await _get_occurrence_event(db, event_id, original_start, owner_id)
+    if not event:
+        return None
+    return await _set_occurrence_exception(db, event, OccurrenceException(original_start=original_start, cancelled=True), "Occurrence Cancelled")
+
+@metrics.timed
 async def delete_event(db: AsyncIOMotorDatabase, event_id: str, owner_id: ObjectId) -> bool:
-    delete_result = await db.events.delete_one({"_id": ObjectId(event_id), "owner_id": owner_id})
-    return delete_result.deleted_count > 0
+    # find_one_and_delete hands back what the free/busy bitsets need in the same round trip
+    deleted = await db.events.find_one_and_delete({"_id": ObjectId(event_id), "owner_id": owner_id}, {"owner_id": 1, "recurrence": 1})
+    if deleted:
+        await db.event_timeline.delete_many({"event_id": ObjectId(event_id)})
+        tombstone = {"_id": deleted["_id"], "owner_id": owner_id, "deleted_at": datetime.utcnow()}
+        try:
+            await db.event_tombstones.insert_one(tombstone)
+        except DuplicateKeyError:
+            # A bulk delete racing this one already wrote it
+            pass
+        _publish_change("deleted", [tombstone])
+        await freebusy_service.untrack_event(db, deleted)
+    return deleted is not None
+
+
+async def _find_bulk_targets(db: AsyncIOMotorDatabase, selection: BulkSelection, owner_id: ObjectId, projection: Optional[Dict[str, int]] = None) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+    """
+    Resolves a bulk selection to the requested ids, in request order, and the
+    owner's matching documents by id, in one owner-scoped query.
+    """
+    if (selection.ids is None) == (selection.filter is None):
+        raise HTTPException(status_code=400, detail="Provide either ids or a filter")
+
+    if selection.ids is not None:
+        requested_ids = list(dict.fromkeys(selection.ids))
+        if len(requested_ids) > settings.BULK_MAX_EVENTS:
+            raise HTTPException(status_code=400, detail=f"At most {settings.BULK_MAX_EVENTS} events per request")
+        query = {"owner_id": owner_id, "_id": {"$in": [ObjectId(event_id) for event_id in requested_ids if ObjectId.is_valid(event_id)]}}
+    else:
+        if not selection.filter.model_dump(exclude_none=True):
+            # An empty filter would select every event the user has
+            raise HTTPException(status_code=400, detail="The filter needs a category, start or end")
+        requested_ids = None
+        query = {"owner_id": owner_id}
+        if selection.filter.category:
+            query["category"] = selection.filter.category
+        if selection.filter.start or selection.filter.end:
+            query["start_time"] = {}
+            if selection.filter.start:
+                query["start_time"]["$gte"] = selection.filter.start
+            if selection.filter.end:
+                query["start_time"]["$lt"] = selection.filter.end
+
+    cursor = db.events.find(query, projection).limit(settings.BULK_MAX_EVENTS + 1)
+    docs = {str(doc["_id"]): doc async for doc in cursor}
+    if len(docs) > settings.BULK_MAX_EVENTS:
+        raise HTTPException(status_code=400, detail=f"The filter matches more than {settings.BULK_MAX_EVENTS} events; narrow it down")
+    return requested_ids or list(docs), docs
+
+@metrics.timed
+async def bulk_update_status(db: AsyncIOMotorDatabase, selection: BulkSelection, status_update: StatusUpdate, owner_id: ObjectId) -> Dict[str, Any]:
+    """
+    update_event_status for many events: one read to resolve them, then one
+    bulk_write for the events and one insert_many for their timeline entries.
+    Events already in the requested status are left alone.
+    """
+    started = time.perf_counter()
+    update_data = status_update.model_dump(exclude_unset=True)
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No status information provided")
+
+    with metrics.stage("bulk_update_status", "find"):
+        requested_ids, docs = await _find_bulk_targets(db, selection, owner_id)
+
+    set_fields = dict(update_data)
+    if update_data.get("state") in (EventState.CANCELLED, EventState.COMPLETED):
+        # Finished events never need their reminders
+        set_fields["next_reminder_at"] = None
+    now = datetime.utcnow()
+    changed_docs, results = [], []
+    for event_id in requested_ids:
+        doc = docs.get(event_id)
+        if doc is None:
+            results.append({"id": event_id, "result": "not_found"})
+        elif all(doc.get(field) == value for field, value in update_data.items()):
+            results.append({"id": event_id, "result": "unchanged"})
+        else:
+            # The update is a plain $set, so the new document can be built here instead of read back
+            changed_docs.append({**doc, **set_fields, "updated_at": now})
+            results.append({"id": event_id, "result": "updated"})
+
+    modified = 0
+    if changed_docs:
+        with metrics.stage("bulk_update_status", "write"):
+            result = await db.events.bulk_write([
+                UpdateOne({"_id": doc["_id"], "owner_id": owner_id}, {"$set": {**set_fields, "updated_at": now}})
+                for doc in changed_docs
+            ], ordered=False)
+            modified = result.modified_count
+            await db.event_timeline.insert_many([
+                _timeline_entry(doc["_id"], owner_id, "Status Updated", f"New status: {update_data}") for doc in changed_docs
+            ])
+        _publish_change("updated", changed_docs)
+        if "state" in update_data:
+            # Cancelling frees the events' slots; any other state holds them again
+            if update_data["state"] == EventState.CANCELLED:
+                await freebusy_service.untrack_events(db, changed_docs)
+            else:
+                await freebusy_service.track_events(db, changed_docs)
+
+    return {"matched": len(docs), "modified": modified, "results": results, "elapsed_ms": (time.perf_counter() - started) * 1000}
+
+@metrics.timed
+async def bulk_delete_events(db: AsyncIOMotorDatabase, selection: BulkSelection, owner_id: ObjectId) -> Dict[str, Any]:
+    """
+    delete_event for many events: one read to resolve them, one bulk_write to
+    delete them, then their timelines, tombstones and free/busy slots in one
+    write each.
+
+    An event another request deletes in between is reported "not_found". The
+    bulk result doesn't say which deletes matched, so when some didn't, the
+    tombstone (keyed by event id) decides: whoever writes it deleted the event.
+    """
+    started = time.perf_counter()
+    with metrics.stage("bulk_delete_events", "find"):
+        requested_ids, docs = await _find_bulk_targets(db, selection, owner_id, {"owner_id": 1, "recurrence": 1})
+
+    deleted_docs = {}
+    if docs:
+        event_ids = [doc["_id"] for doc in docs.values()]
+        with metrics.stage("bulk_delete_events", "write"):
+            result = await db.events.bulk_write([DeleteOne({"_id": event_id, "owner_id": owner_id}) for event_id in event_ids], ordered=False)
+            tombstones = []
+            if result.deleted_count:
+                await db.event_timeline.delete_many({"event_id": {"$in": event_ids}})
+                now = datetime.utcnow()
+                tombstones = [{"_id": event_id, "owner_id": owner_id, "deleted_at": now} for event_id in event_ids]
+                if result.deleted_count < len(event_ids):
+                    tombstones = await _insert_new_tombstones(db, tombstones)
+                else:
+                    await db.event_tombstones.insert_many(tombstones)
+        deleted_docs = {str(tombstone["_id"]): docs[str(tombstone["_id"])] for tombstone in tombstones}
+        _publish_change("deleted", tombstones)
+        await freebusy_service.untrack_events(db, list(deleted_docs.values()))
+
+    results = [{"id": event_id, "result": "deleted" if event_id in deleted_docs else "not_found"} for event_id in requested_ids]
+    return {"matched": len(docs), "modified": len(deleted_docs), "results": results, "elapsed_ms": (time.perf_counter() - started) * 1000}
+
+async def _insert_new_tombstones(db: AsyncIOMotorDatabase, tombstones: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Inserts the tombstones no other request has written yet and returns those."""
+    try:
+        await db.event_tombstones.insert_many(tombstones, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details["writeErrors"]
+        if any(error["code"] != 11000 for error in errors):
+            raise
+        duplicates = {error["index"] for error in errors}
+        return [tombstone for index, tombstone in enumerate(tombstones) if index not in duplicates]
+    return tombstones
+
+
+async def _insert_imported_events(db: AsyncIOMotorDatabase, imported_events: List[ical_service.ImportedEvent], current_user: User, summary: Dict[str, Any]):
+    uids = [imported.uid for imported in imported_events if imported.uid]
+    known_uids = set()
+    if uids:
+        cursor = db.events.find({"owner_id": current_user.id, "ical_uid": {"$in": uids}}, {"ical_uid": 1})
+        known_uids = {doc["ical_uid"] async for doc in cursor}
+
+    new_events = []
+    for imported in imported_events:
+        if imported.uid in known_uids:
+            summary["duplicates"] += 1
+            continue
+        if imported.uid:
+            known_uids.add(imported.uid)
+        new_events.append(imported)
+    if not new_events:
+        return
+
+    uncategorized = [imported for imported in new_events if imported.category is None]
+    user_classifier = await assistant_service.get_user_classifier(db, current_user.id) if uncategorized else None
+    predicted = iter(assistant_service.categorize_events([imported.details.title for imported in uncategorized], user_classifier))
+    events = []
+    for imported in new_events:
+        event = _build_event(imported.details, imported.category or next(predicted), current_user)
+        event.ical_uid = imported.uid
+        event.state = imported.state
+        event.is_confirmed = imported.state == EventState.CONFIRMED
+        if imported.state == EventState.CANCELLED:
+            event.next_reminder_at = None
+        event.exceptions = [OccurrenceException(original_start=start, cancelled=True) for start in imported.exdates]
+        events.append(event)
+
+    event_docs = [event.model_dump(by_alias=True) for event in events]
+    await db.events.insert_many(event_docs, ordered=False)
+    await db.event_timeline.insert_many([
+        _timeline_entry(event.id, event.owner_id, "Event Imported", f"Category: {event.category.value}") for event in events
+    ])
+    await freebusy_service.track_events(db, event_docs)
+    _publish_change("created", event_docs)
+    summary["imported"] += len(events)
+
+async def _apply_imported_overrides(db: AsyncIOMotorDatabase, overrides: List[ical_service.ImportedEvent], owner_id: ObjectId, summary: Dict[str, Any]):
+    """Turns VEVENTs with a RECURRENCE-ID into exceptions of the imported series with the same UID."""
+    now = datetime.utcnow()
+    operations = []
+    for imported in overrides:
+        details = imported.details
+        exception = OccurrenceException(
+            original_start=imported.recurrence_id,
+            cancelled=imported.state == EventState.CANCELLED,
+            start_time=details.start_time,
+            end_time=details.end_time,
+            title=details.title,
+            location=details.location,
+            notes=details.notes,
+        )
+        update = {"$push": {"exceptions": exception.model_dump()}, "$set": {"updated_at": now}}
+        if not exception.cancelled:
+            update["$max"] = {"series_end": details.end_time or details.start_time}
+        operations.append(UpdateOne(
+            # Already having the exception makes a re-import a no-op
+            {"owner_id": owner_id, "ical_uid": imported.uid, "recurrence": {"$ne": None}, "exceptions.original_start": {"$ne": imported.recurrence_id}},
+            update,
+        ))
+    result = await db.events.bulk_write(operations, ordered=False)
+    summary["overrides"] += result.modified_count
+    freebusy_service.series_cache.invalidate(owner_id)
+    if change_listeners:
+        cursor = db.events.find({"owner_id": owner_id, "ical_uid": {"$in": list({imported.uid for imported in overrides})}})
+        _publish_change("updated", await cursor.to_list(length=None))
+
+async def _apply_ready_overrides(db: AsyncIOMotorDatabase, overrides: List[ical_service.ImportedEvent], owner_id: ObjectId, summary: Dict[str, Any]) -> List[ical_service.ImportedEvent]:
+    """Applies the overrides whose series is already stored and returns the rest, whose series may still be coming."""
+    stored_uids = set(await db.events.distinct(
+        "ical_uid", {"owner_id": owner_id, "ical_uid": {"$in": list({imported.uid for imported in overrides})}, "recurrence": {"$ne": None}}
+    ))
+    ready = [imported for imported in overrides if imported.uid in stored_uids]
+    if ready:
+        await _apply_imported_overrides(db, ready, owner_id, summary)
+    return [imported for imported in overrides if imported.uid not in stored_uids]
+
+@metrics.timed
+async def import_ics_events(db: AsyncIOMotorDatabase, chunks: AsyncIterator[bytes], current_user: User) -> Dict[str, Any]:
+    """
+    Imports an iCalendar upload without the LLM. VEVENTs are parsed as the
+    upload streams in, categorized locally and inserted ICS_IMPORT_CHUNK_SIZE
+    at a time, so memory doesn't grow with the file. UIDs the user already has
+    are skipped. Edited occurrences are applied in batches of the same size
+    once their series is stored; the ones whose series hasn't been read yet
+    are held until it is, or until the end.
+    """
+    started = time.perf_counter()
+    summary = {"imported": 0, "duplicates": 0, "invalid": 0, "overrides": 0, "unsupported_recurrences": 0}
+    pending: List[ical_service.ImportedEvent] = []
+    overrides: List[ical_service.ImportedEvent] = []
+    # Held overrides don't count towards the next batch, or each new one would trigger a flush
+    overrides_flush_at = settings.ICS_IMPORT_CHUNK_SIZE
+    async for vevent in ical_service.parse_vevents(chunks):
+        imported = ical_service.vevent_to_event(vevent)
+        if imported is None:
+            summary["invalid"] += 1
+            continue
+        if imported.recurrence_id:
+            if imported.uid:
+                overrides.append(imported)
+            if len(overrides) >= overrides_flush_at:
+                with metrics.stage("import_ics_events", "insert"):
+                    # The series they refer to may be among the pending events
+                    if pending:
+                        await _insert_imported_events(db, pending, current_user, summary)
+                        pending = []
+                    overrides = await _apply_ready_overrides(db, overrides, current_user.id, summary)
+                overrides_flush_at = len(overrides) + settings.ICS_IMPORT_CHUNK_SIZE
+            continue
+        summary["unsupported_recurrences"] += imported.unsupported_recurrence
+        pending.append(imported)
+        if len(pending) >= settings.ICS_IMPORT_CHUNK_SIZE:
+            with metrics.stage("import_ics_events", "insert"):
+                await _insert_imported_events(db, pending, current_user, summary)
+            pending = []
+
+    with metrics.stage("import_ics_events", "insert"):
+        if pending:
+            await _insert_imported_events(db, pending, current_user, summary)
+        if overrides:
+            await _apply_imported_overrides(db, overrides, current_user.id, summary)
+    summary["elapsed_ms"] = (time.perf_counter() - started) * 1000
+    return summary
+
+@metrics.timed
+async def export_ics_events(db: AsyncIOMotorDatabase, owner_id: ObjectId) -> AsyncIterator[bytes]:
+    """Yields the owner's calendar as an iCalendar file, a few events at a time as the cursor produces them."""
+    yield ical_service.CALENDAR_HEADER.encode()
+    vevents = []
+    async for doc in _find_events(db, owner_id, None, None, None, None):
+        vevents.append(ical_service.to_vevent(doc))
+        # Small writes cost more than they save in memory
+        if len(vevents) >= 100:
+            yield "".join(vevents).encode()
+            vevents = []
+    yield ("".join(vevents) + ical_service.CALENDAR_FOOTER).encode()
@@ -0,0 +1,147 @@
+"""
+Per-user free/busy bitsets: one int per day, with a bit for each 15-minute slot.
+
+Each freebusy document holds one owner's day and the slot range every single
+(non-recurring, not cancelled) event covers on it, so an event can be removed
+by id without knowing its old times. Writes update both the collection and
+this process's cache; other workers see them once their cached copy expires,
+so a caller that must not act on a stale "free" answer asks for a fresh read
+of the days. Recurring events are not stored: their occurrences in the
+requested range are expanded from a per-owner cache of the owner's series,
+which another worker's series writes can leave stale for up to
+FREEBUSY_CACHE_TTL_SECONDS.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from models.event import Event, EventState
+from services import calendar_service
+from core.cache import TTLCache
+from core.config import settings
+from core import metrics
+
+# owner_id -> {day: {event_id: slot mask}}; days missing from the dict haven't been loaded yet
+day_cache = TTLCache(max_entries=settings.FREEBUSY_CACHE_MAX_OWNERS, ttl_seconds=settings.FREEBUSY_CACHE_TTL_SECONDS)
+# owner_id -> (start the series were loaded for, the owner's recurring events still running after it)
+series_cache = TTLCache(max_entries=settings.FREEBUSY_CACHE_MAX_OWNERS, ttl_seconds=settings.FREEBUSY_CACHE_TTL_SECONDS)
+
+def get_freebusy_stats() -> Dict[str, Any]:
+    return {"days": day_cache.stats(), "series": series_cache.stats()}
+
+def _day_key(day: date) -> datetime:
+    # BSON has no date type
+    return datetime.combine(day, time.min)
+
+def _is_busy(doc: Dict[str, Any]) -> bool:
+    return bool(doc.get("end_time")) and doc.get("state") != EventState.CANCELLED
+
+async def track_events(db: AsyncIOMotorDatabase, docs: Iterable[Dict[str, Any]]):
+    """
+    Marks the slots of the given event documents busy. Idempotent, so it is
+    also how a confirmed or shared event gets back in after a cancellation.
+    """
+    operations, cache_updates = [], []
+    for doc in docs:
+        if doc.get("recurrence"):
+            series_cache.invalidate(doc["owner_id"])
+            continue
+        if not _is_busy(doc):
+            continue
+        for day, first_slot, end_slot in calendar_service.day_slot_ranges(doc["start_time"], doc["end_time"]):
+            entry = {"event_id": doc["_id"], "first_slot": first_slot, "end_slot": end_slot}
+            operations.append(UpdateOne({"owner_id": doc["owner_id"], "day": _day_key(day)}, {"$addToSet": {"entries": entry}}, upsert=True))
+            cache_updates.append((doc["owner_id"], day, doc["_id"], calendar_service.slot_mask(first_slot, end_slot)))
+    if not operations:
+        return
+
+    await db.freebusy.bulk_write(operations, ordered=False)
+    for owner_id, day, event_id, mask in cache_updates:
+        cached_days = day_cache.get(owner_id)
+        if cached_days is not None and day in cached_days:
+            cached_days[day][event_id] = mask
+
+async def untrack_event(db: AsyncIOMotorDatabase, doc: Dict[str, Any]):
+    """Frees every slot the event held, wherever it was."""
+    await untrack_events(db, [doc])
+
+async def untrack_events(db: AsyncIOMotorDatabase, docs: Iterable[Dict[str, Any]]):
+    """untrack_event for several events, with one update per owner."""
+    event_ids_by_owner: Dict[ObjectId, List[ObjectId]] = {}
+    for doc in docs:
+        if doc.get("recurrence"):
+            series_cache.invalidate(doc["owner_id"])
+        else:
+            event_ids_by_owner.setdefault(doc["owner_id"], []).append(doc["_id"])
+
+    for owner_id, event_ids in event_ids_by_owner.items():
+        await db.freebusy.update_many(
+            {"owner_id": owner_id, "entries.event_id": {"$in": event_ids}},
+            {"$pull": {"entries": {"event_id": {"$in": event_ids}}}}
+        )
+        cached_days = day_cache.get(owner_id)
+        if cached_days:
+            for masks in cached_days.values():
+                for event_id in event_ids:
+                    masks.pop(event_id, None)
+
+async def sync_event(db: AsyncIOMotorDatabase, doc: Dict[str, Any]):
+    """Re-tracks an event whose times or state changed."""
+    await untrack_event(db, doc)
+    await track_events(db, [doc])
+
+async def _load_days(db: AsyncIOMotorDatabase, owner_id: ObjectId, days: List[date], fresh: bool = False) -> Dict[date, Dict[ObjectId, int]]:
+    cached_days = day_cache.get(owner_id)
+    if cached_days is None:
+        cached_days = {}
+        day_cache.set(owner_id, cached_days)
+    missing = list(days) if fresh else [day for day in days if day not in cached_days]
+    if missing:
+        # One range query fills every missing day, including the ones with nothing on them
+        loaded = {day: {} for day in missing}
+        cursor = db.freebusy.find({"owner_id": owner_id, "day": {"$gte": _day_key(missing[0]), "$lte": _day_key(missing[-1])}})
+        async for doc in cursor:
+            day = doc["day"].date()
+            if day in loaded:
+                loaded[day] = {
+                    entry["event_id"]: calendar_service.slot_mask(entry["first_slot"], entry["end_slot"])
+                    for entry in doc.get("entries", [])
+                }
+        cached_days.update(loaded)
+    return cached_days
+
+async def _load_series(db: AsyncIOMotorDatabase, owner_id: ObjectId, start: datetime) -> List[Event]:
+    cached = series_cache.get(owner_id)
+    if cached is not None and cached[0] <= start:
+        return cached[1]
+    # Series that ended before the range can't occur in it, so only running ones are loaded
+    cursor = db.events.find({"owner_id": owner_id, "series_end": {"$gt": start}, "state": {"$ne": EventState.CANCELLED}})
+    series = [Event(**doc) async for doc in cursor]
+    series_cache.set(owner_id, (start, series))
+    return series
+
+@metrics.timed
+async def get_busy_days(db: AsyncIOMotorDatabase, owner_ids: List[ObjectId], start: datetime, end: datetime, exclude_id: Optional[ObjectId] = None, fresh: bool = False) -> Dict[date, int]:
+    """
+    The busy bitset of every day touching [start, end), OR-ed over all the
+    given owners, so a slot is busy if any of them is busy then. With fresh,
+    the days are re-read from the database (refreshing the cache) instead of
+    trusting copies another worker may have made stale; series still come
+    from the cache.
+    """
+    days = [start.date() + timedelta(days=offset) for offset in range((end.date() - start.date()).days + 1)]
+    busy_days = dict.fromkeys(days, 0)
+    for owner_id in owner_ids:
+        owner_days = await _load_days(db, owner_id, days, fresh)
+        for day in days:
+            for event_id, mask in owner_days[day].items():
+                if event_id != exclude_id:
+                    busy_days[day] |= mask
+        for occurrence in calendar_service.expand_events(await _load_series(db, owner_id, start), start, end):
+            if occurrence.id == exclude_id or not occurrence.end_time:
+                continue
+            for day, first_slot, end_slot in calendar_service.day_slot_ranges(occurrence.start_time, occurrence.end_time):
+                if day in busy_days:
+                    busy_days[day] |= calendar_service.slot_mask(first_slot, end_slot)
+    return busy_days
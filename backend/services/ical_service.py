@@ -0,0 +1,356 @@
+"""
+Reads and writes iCalendar (RFC 5545) files one VEVENT at a time.
+
+parse_vevents consumes an upload as it arrives and only ever holds the event
+being read, and to_vevent renders one stored event, so neither depends on the
+size of the calendar. Nothing here touches the database or the LLM; importing
+and exporting happen in event_service.
+"""
+import codecs
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from models.event import EventCategory, EventState, ParsedEventDetails, RecurrenceFrequency, RecurrenceRule
+from services import calendar_service
+
+# Property name -> every (parameters, value) it appeared with, e.g. several EXDATE lines
+VEvent = Dict[str, List[Tuple[Dict[str, str], str]]]
+
+CALENDAR_HEADER = "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Family Event Assistant//EN\r\nCALSCALE:GREGORIAN\r\n"
+CALENDAR_FOOTER = "END:VCALENDAR\r\n"
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+# RecurrenceRule.count's upper bound
+MAX_COUNT = 5000
+
+_TEXT_ESCAPE = re.compile(r"\\([\\;,nN])")
+_DURATION = re.compile(r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+class ImportedEvent(NamedTuple):
+    """What one VEVENT says, in the shapes event_service builds events from."""
+    uid: Optional[str]
+    details: ParsedEventDetails
+    state: EventState
+    # From CATEGORIES when it names one of ours, e.g. in a file this app exported
+    category: Optional[EventCategory]
+    # Starts of cancelled occurrences of a series
+    exdates: List[datetime]
+    # Set when the VEVENT edits one occurrence of the series with the same UID
+    recurrence_id: Optional[datetime]
+    # The RRULE used parts RecurrenceRule can't express, so only the first occurrence is kept
+    unsupported_recurrence: bool
+
+
+async def _content_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decodes and unfolds the upload into content lines as the chunks arrive."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    line = None
+    final = False
+    chunks = chunks.__aiter__()
+    while not final:
+        try:
+            pending += decoder.decode(await chunks.__anext__())
+        except StopAsyncIteration:
+            pending += decoder.decode(b"", final=True) + "\n"
+            final = True
+        *raw_lines, pending = pending.split("\n")
+        for raw_line in raw_lines:
+            raw_line = raw_line.rstrip("\r")
+            if raw_line[:1] in (" ", "\t"):
+                # A folded continuation of the previous line
+                if line is not None:
+                    line += raw_line[1:]
+                continue
+            if line:
+                yield line
+            line = raw_line
+    if line:
+        yield line
+
+def _split_content_line(line: str) -> Optional[Tuple[str, Dict[str, str], str]]:
+    colon = line.find(":")
+    if colon < 0:
+        return None
+    head = line[:colon]
+    if '"' in head:
+        # Quoted parameter values may contain ':' and ';' themselves
+        in_quotes = False
+        for colon, char in enumerate(line):
+            if char == '"':
+                in_quotes = not in_quotes
+            elif char == ":" and not in_quotes:
+                break
+        else:
+            return None
+        head = line[:colon]
+        name, *raw_params = re.split(r';(?=(?:[^"]*"[^"]*")*[^"]*$)', head)
+    else:
+        name, *raw_params = head.split(";")
+    params = {}
+    for raw_param in raw_params:
+        key, _, value = raw_param.partition("=")
+        params[key.upper()] = value.strip('"')
+    return name.upper(), params, line[colon + 1:]
+
+async def parse_vevents(chunks: AsyncIterator[bytes]) -> AsyncIterator[VEvent]:
+    """
+    Yields the properties of each VEVENT in an iCalendar stream. Components
+    nested inside one, such as VALARM, and everything outside them are skipped.
+    """
+    vevent: Optional[VEvent] = None
+    nested = 0
+    async for line in _content_lines(chunks):
+        parsed = _split_content_line(line)
+        if parsed is None:
+            continue
+        name, params, value = parsed
+        if name == "BEGIN":
+            if vevent is not None:
+                nested += 1
+            elif value.strip().upper() == "VEVENT":
+                vevent = {}
+        elif name == "END":
+            if vevent is not None:
+                if nested:
+                    nested -= 1
+                elif value.strip().upper() == "VEVENT":
+                    yield vevent
+                    vevent = None
+        elif vevent is not None and not nested:
+            vevent.setdefault(name, []).append((params, value))
+
+
+def _unescape(value: str) -> str:
+    return _TEXT_ESCAPE.sub(lambda match: "\n" if match.group(1) in "nN" else match.group(1), value)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\n").replace("\n", "\\n")
+
+@lru_cache(maxsize=128)
+def _zone(tzid: Optional[str]) -> Optional[ZoneInfo]:
+    if not tzid:
+        return None
+    try:
+        return ZoneInfo(tzid)
+    except (ZoneInfoNotFoundError, ValueError, OSError):
+        # e.g. Windows zone names; their times are read as local wall-clock times
+        return None
+
+def _parse_datetime(params: Dict[str, str], value: str) -> Tuple[datetime, bool]:
+    """A DATE or DATE-TIME as the naive CALENDAR_TIMEZONE time events are stored in, and whether it was a DATE."""
+    value = value.strip()
+    # Sliced by hand: strptime was most of the cost of a large import
+    day = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return day, True
+    if value[8:9] != "T":
+        raise ValueError(f"Invalid DATE-TIME: {value}")
+    moment = day.replace(hour=int(value[9:11]), minute=int(value[11:13]), second=int(value[13:15]))
+    if value.endswith("Z"):
+        return calendar_service.to_calendar_time(moment.replace(tzinfo=timezone.utc)), False
+    zone = _zone(params.get("TZID"))
+    if zone:
+        return calendar_service.to_calendar_time(moment.replace(tzinfo=zone)), False
+    # Floating time
+    return moment, False
+
+def _parse_duration(value: str) -> Optional[timedelta]:
+    match = _DURATION.match(value.strip())
+    if not match:
+        return None
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0), minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -duration if sign == "-" else duration
+
+def _parse_rrule(value: str) -> Optional[RecurrenceRule]:
+    """The RRULE as a RecurrenceRule, or None if it uses parts this app can't repeat by."""
+    parts = dict(part.split("=", 1) for part in value.upper().split(";") if "=" in part)
+    parts.pop("WKST", None)
+    frequency = parts.pop("FREQ", None)
+    interval = int(parts.pop("INTERVAL", None) or 1)
+    if frequency == "YEARLY":
+        frequency, interval = RecurrenceFrequency.MONTHLY.value, interval * 12
+
+    by_weekday = None
+    if "BYDAY" in parts:
+        weekdays = parts.pop("BYDAY").split(",")
+        # Ordinals such as 2TU (second Tuesday) have no equivalent
+        if frequency != RecurrenceFrequency.WEEKLY.value or not set(weekdays) <= set(WEEKDAYS):
+            return None
+        by_weekday = sorted(WEEKDAYS.index(weekday) for weekday in weekdays)
+
+    until = None
+    if "UNTIL" in parts:
+        until, is_date = _parse_datetime({}, parts.pop("UNTIL"))
+        if is_date:
+            # A DATE includes occurrences starting at any time that day
+            until += timedelta(days=1) - timedelta(seconds=1)
+    count = int(parts.pop("COUNT")) if "COUNT" in parts else None
+
+    if parts or frequency not in RecurrenceFrequency.__members__:
+        return None
+    return RecurrenceRule(
+        frequency=frequency,
+        interval=max(1, interval),
+        by_weekday=by_weekday,
+        until=until,
+        count=min(max(1, count), MAX_COUNT) if count is not None else None,
+    )
+
+def vevent_to_event(vevent: VEvent) -> Optional[ImportedEvent]:
+    """Maps a parsed VEVENT to an ImportedEvent, or None if it has no usable start."""
+    def first(name: str) -> Optional[Tuple[Dict[str, str], str]]:
+        values = vevent.get(name)
+        return values[0] if values else None
+
+    def text(name: str) -> Optional[str]:
+        prop = first(name)
+        return (_unescape(prop[1]).strip() or None) if prop else None
+
+    dtstart = first("DTSTART")
+    if dtstart is None:
+        return None
+    try:
+        start_time, all_day = _parse_datetime(*dtstart)
+    except ValueError:
+        return None
+
+    end_time = None
+    try:
+        if first("DTEND"):
+            end_time = _parse_datetime(*first("DTEND"))[0]
+        elif first("DURATION"):
+            duration = _parse_duration(first("DURATION")[1])
+            end_time = start_time + duration if duration is not None else None
+        elif all_day:
+            end_time = start_time + timedelta(days=1)
+    except ValueError:
+        end_time = None
+    if end_time is not None and end_time < start_time:
+        end_time = None
+
+    recurrence, unsupported_recurrence = None, False
+    if first("RRULE"):
+        try:
+            recurrence = _parse_rrule(first("RRULE")[1])
+        except ValueError:
+            recurrence = None
+        unsupported_recurrence = recurrence is None
+
+    exdates = []
+    for params, value in vevent.get("EXDATE", []):
+        for part in value.split(","):
+            try:
+                exdates.append(_parse_datetime(params, part)[0])
+            except ValueError:
+                continue
+
+    recurrence_id = None
+    if first("RECURRENCE-ID"):
+        try:
+            recurrence_id = _parse_datetime(*first("RECURRENCE-ID"))[0]
+        except ValueError:
+            return None
+
+    categories = {category.strip().upper() for category in (text("CATEGORIES") or "").split(",")}
+    category = next((known for known in EventCategory if known.value in categories), None)
+
+    status = (text("STATUS") or "").upper()
+    state = {"CANCELLED": EventState.CANCELLED, "CONFIRMED": EventState.CONFIRMED}.get(status, EventState.DRAFT)
+    details = ParsedEventDetails(
+        title=text("SUMMARY") or "Untitled event",
+        start_time=start_time,
+        end_time=end_time,
+        location=text("LOCATION"),
+        notes=text("DESCRIPTION"),
+        recurrence=recurrence,
+    )
+    return ImportedEvent(text("UID"), details, state, category, exdates if recurrence else [], recurrence_id, unsupported_recurrence)
+
+
+def _format_datetime(moment: datetime) -> str:
+    # Events are stored in naive local time, so they are written as floating times
+    return moment.strftime("%Y%m%dT%H%M%S")
+
+def _fold(line: str) -> str:
+    """Folds a content line into 75-octet pieces without splitting a UTF-8 sequence."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    pieces, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        pieces.append(encoded[start:end].decode())
+        # Continuation lines start with a space, which counts towards their 75
+        start, limit = end, 74
+    return "\r\n ".join(pieces) + "\r\n"
+
+def _format_rrule(rule: Dict[str, Any]) -> str:
+    frequency, interval = RecurrenceFrequency(rule["frequency"]).value, rule.get("interval") or 1
+    if frequency == RecurrenceFrequency.MONTHLY.value and interval % 12 == 0:
+        frequency, interval = "YEARLY", interval // 12
+    parts = [f"FREQ={frequency}"]
+    if interval > 1:
+        parts.append(f"INTERVAL={interval}")
+    if rule.get("by_weekday"):
+        parts.append("BYDAY=" + ",".join(WEEKDAYS[weekday] for weekday in rule["by_weekday"]))
+    if rule.get("until"):
+        parts.append(f"UNTIL={_format_datetime(rule['until'])}")
+    if rule.get("count"):
+        parts.append(f"COUNT={rule['count']}")
+    return ";".join(parts)
+
+def _vevent_lines(uid: str, stamp: str, start: datetime, end: Optional[datetime], title: str, location: Optional[str], notes: Optional[str], category: str, state: str) -> List[str]:
+    lines = [f"UID:{_escape(uid)}", f"DTSTAMP:{stamp}", f"DTSTART:{_format_datetime(start)}"]
+    if end:
+        lines.append(f"DTEND:{_format_datetime(end)}")
+    lines.append(f"SUMMARY:{_escape(title)}")
+    if location:
+        lines.append(f"LOCATION:{_escape(location)}")
+    if notes:
+        lines.append(f"DESCRIPTION:{_escape(notes)}")
+    lines.append(f"CATEGORIES:{EventCategory(category).value}")
+    lines.append("STATUS:" + {EventState.CANCELLED: "CANCELLED", EventState.DRAFT: "TENTATIVE"}.get(EventState(state), "CONFIRMED"))
+    return lines
+
+def to_vevent(doc: Dict[str, Any]) -> str:
+    """
+    One stored event document as a VEVENT, followed by one VEVENT per edited
+    occurrence if it is a series. Imported events keep their original UID.
+    """
+    uid = doc.get("ical_uid") or f"{doc['_id']}@family-event-assistant"
+    stamp = (doc.get("updated_at") or datetime.utcnow()).strftime("%Y%m%dT%H%M%SZ")
+    start, end = doc["start_time"], doc.get("end_time")
+    lines = ["BEGIN:VEVENT", *_vevent_lines(uid, stamp, start, end, doc["title"], doc.get("location"), doc.get("notes"), doc["category"], doc["state"])]
+
+    exceptions = doc.get("exceptions") or []
+    if doc.get("recurrence"):
+        lines.append(f"RRULE:{_format_rrule(doc['recurrence'])}")
+        cancelled = [_format_datetime(exception["original_start"]) for exception in exceptions if exception.get("cancelled")]
+        if cancelled:
+            lines.append(f"EXDATE:{','.join(cancelled)}")
+    lines.append("END:VEVENT")
+
+    if doc.get("recurrence"):
+        duration = (end or start) - start
+        for exception in exceptions:
+            if exception.get("cancelled"):
+                continue
+            occurrence_start = exception.get("start_time") or exception["original_start"]
+            occurrence_end = exception.get("end_time") or (occurrence_start + duration if end else None)
+            lines.extend([
+                "BEGIN:VEVENT",
+                *_vevent_lines(
+                    uid, stamp, occurrence_start, occurrence_end,
+                    exception.get("title") or doc["title"], exception.get("location") or doc.get("location"),
+                    exception.get("notes") or doc.get("notes"), doc["category"], doc["state"],
+                ),
+                f"RECURRENCE-ID:{_format_datetime(exception['original_start'])}",
+                "END:VEVENT",
+            ])
+    return "".join(_fold(line) for line in lines)
@@ -0,0 +1,239 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from models.job import JobStatus
+from services import auth_service, event_service
+from core.cache import TTLCache
+from core.config import settings
+from core.database import db
+from core import metrics
+
+job_stats = {
+    "submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0, "recovered": 0,
+    "queue_seconds_total": 0.0, "run_seconds_total": 0.0, "run_seconds_max": 0.0,
+}
+stats_started_at = time.monotonic()
+
+
+class InMemoryJobQueue:
+    """
+    Jobs live in this process only: queued work is lost on restart and
+    GET /jobs/{id} only finds jobs submitted to the same worker process.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._jobs = TTLCache(max_entries=settings.JOB_RESULT_MAX_ENTRIES, ttl_seconds=settings.JOB_RESULT_TTL_SECONDS)
+
+    async def submit(self, database: AsyncIOMotorDatabase, job: Dict[str, Any]):
+        self._jobs.set(job["_id"], job)
+        self._queue.put_nowait(job["_id"])
+
+    async def claim(self, database: AsyncIOMotorDatabase) -> Dict[str, Any]:
+        while True:
+            job = self._jobs.get(await self._queue.get())
+            # Jobs evicted from the result cache before a worker reached them are dropped
+            if job:
+                job.update(status=JobStatus.RUNNING, started_at=datetime.utcnow(), attempts=job["attempts"] + 1)
+                return job
+
+    async def complete(self, database: AsyncIOMotorDatabase, job: Dict[str, Any], fields: Dict[str, Any]):
+        job.update(fields)
+        # Re-setting restarts the TTL, so results are kept for a full TTL after they finish
+        self._jobs.set(job["_id"], job)
+
+    async def find(self, database: AsyncIOMotorDatabase, job_id: ObjectId, owner_id: ObjectId) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return job if job and job["owner_id"] == owner_id else None
+
+    async def depth(self, database: AsyncIOMotorDatabase) -> int:
+        return self._queue.qsize()
+
+
+class MongoJobQueue:
+    """
+    Jobs are documents in the `jobs` collection, so queued work survives
+    restarts and every worker process serves from one queue. A running job
+    whose lease lapses (its worker died) is claimed again, so delivery is
+    at-least-once and gives up after JOB_MAX_ATTEMPTS.
+    """
+
+    def __init__(self):
+        self.worker_id = uuid4().hex
+        self._wakeup = asyncio.Event()
+
+    async def submit(self, database: AsyncIOMotorDatabase, job: Dict[str, Any]):
+        await database.jobs.insert_one(job)
+        # Local workers pick it up at once; other processes find it on their next poll
+        self._wakeup.set()
+
+    async def claim(self, database: AsyncIOMotorDatabase) -> Dict[str, Any]:
+        while True:
+            now = datetime.utcnow()
+            job = await database.jobs.find_one_and_update(
+                {"$or": [
+                    {"status": JobStatus.QUEUED},
+                    {"status": JobStatus.RUNNING, "lease_expires_at": {"$lt": now}},
+                ]},
+                {
+                    "$set": {
+                        "status": JobStatus.RUNNING,
+                        "worker": self.worker_id,
+                        "started_at": now,
+                        "lease_expires_at": now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("created_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if job:
+                if job["attempts"] > 1:
+                    job_stats["recovered"] += 1
+                return job
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def complete(self, database: AsyncIOMotorDatabase, job: Dict[str, Any], fields: Dict[str, Any]):
+        # A worker whose lease was taken over must not overwrite the new attempt
+        await database.jobs.update_one(
+            {"_id": job["_id"], "worker": self.worker_id, "attempts": job["attempts"]},
+            {"$set": fields, "$unset": {"lease_expires_at": ""}}
+        )
+
+    async def find(self, database: AsyncIOMotorDatabase, job_id: ObjectId, owner_id: ObjectId) -> Optional[Dict[str, Any]]:
+        return await database.jobs.find_one({"_id": job_id, "owner_id": owner_id})
+
+    async def depth(self, database: AsyncIOMotorDatabase) -> int:
+        return await database.jobs.count_documents({"status": JobStatus.QUEUED})
+
+
+class JobWorkerPool:
+    """Runs JOB_WORKERS concurrent consumers of a job queue on the event loop."""
+
+    def __init__(self, queue):
+        self.queue = queue
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(settings.JOB_WORKERS)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self):
+        while True:
+            try:
+                job = await self.queue.claim(db.db)
+                await self.process(db.db, job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error processing jobs: {e}")
+                await asyncio.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+
+    @metrics.timed
+    async def process(self, database: AsyncIOMotorDatabase, job: Dict[str, Any]):
+        job_stats["queue_seconds_total"] += (job["started_at"] - job["created_at"]).total_seconds()
+        started = time.monotonic()
+        try:
+            if job["attempts"] > settings.JOB_MAX_ATTEMPTS:
+                raise RuntimeError(f"Gave up after {settings.JOB_MAX_ATTEMPTS} attempts")
+            user = await auth_service.get_user_by_id(database, job["owner_id"])
+            if user is None:
+                raise RuntimeError("The job's owner no longer exists")
+            result = await event_service.create_event(database, job["text"], current_user=user, event_id=job.get("event_id"))
+            fields = {"status": JobStatus.SUCCEEDED, "result": result}
+            job_stats["succeeded"] += 1
+        except Exception as e:
+            fields = {"status": JobStatus.FAILED, "error": getattr(e, "detail", None) or str(e)}
+            job_stats["failed"] += 1
+
+        elapsed = time.monotonic() - started
+        job_stats["run_seconds_total"] += elapsed
+        job_stats["run_seconds_max"] = max(job_stats["run_seconds_max"], elapsed)
+        fields["finished_at"] = datetime.utcnow()
+        await self.queue.complete(database, job, fields)
+
+
+job_queue = MongoJobQueue() if settings.JOB_QUEUE_BACKEND == "mongo" else InMemoryJobQueue()
+worker_pool = JobWorkerPool(job_queue)
+
+async def start_workers():
+    worker_pool.start()
+
+async def stop_workers():
+    await worker_pool.stop()
+
+@metrics.timed
+async def submit_create_event(database: AsyncIOMotorDatabase, text: str, owner_id: ObjectId) -> Dict[str, Any]:
+    """Queues create_event for a background worker and returns the queued job."""
+    if await job_queue.depth(database) >= settings.JOB_MAX_QUEUED:
+        job_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many queued jobs, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
+    job = {
+        "_id": ObjectId(),
+        "owner_id": owner_id,
+        "text": text,
+        # Chosen up front, so an attempt that runs again finds the event instead of creating a second one
+        "event_id": ObjectId(),
+        "status": JobStatus.QUEUED,
+        "attempts": 0,
+        "created_at": datetime.utcnow(),
+        "started_at": None,
+        "finished_at": None,
+        "result": None,
+        "error": None,
+    }
+    await job_queue.submit(database, job)
+    job_stats["submitted"] += 1
+    return job
+
+@metrics.timed
+async def get_job(database: AsyncIOMotorDatabase, job_id: str, owner_id: ObjectId) -> Optional[Dict[str, Any]]:
+    try:
+        return await job_queue.find(database, ObjectId(job_id), owner_id)
+    except InvalidId:
+        return None
+
+def job_to_public(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "job_id": str(job["_id"]),
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "result": job["result"],
+        "error": job["error"],
+    }
+
+async def get_job_stats(database: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    finished = job_stats["succeeded"] + job_stats["failed"]
+    return {
+        "backend": settings.JOB_QUEUE_BACKEND,
+        "workers": settings.JOB_WORKERS,
+        "queue_depth": await job_queue.depth(database),
+        "throughput_per_second": finished / max(time.monotonic() - stats_started_at, 1e-9),
+        "avg_queue_seconds": job_stats["queue_seconds_total"] / finished if finished else 0.0,
+        "avg_run_seconds": job_stats["run_seconds_total"] / finished if finished else 0.0,
+        **job_stats,
+    }
@@ -0,0 +1,158 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+import openai
+from openai import AsyncOpenAI
+from core.config import settings
+from core import metrics
+
+# Retries are handled here (with jitter and the circuit breaker), not by the SDK
+client = AsyncOpenAI(
+    api_key=settings.OPENAI_API_KEY,
+    base_url=settings.OPENAI_BASE_URL,
+    timeout=settings.LLM_TIMEOUT_SECONDS,
+    max_retries=0,
+)
+
+class CircuitOpenError(Exception):
+    """Raised without calling OpenAI while the provider is considered degraded."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive provider failures and fails fast
+    for `reset_seconds`; then lets a single probe through to decide whether to close.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def release_probe(self):
+        """Ends a probe that left without an answer from the provider, e.g. when cancelled; that counts as a failure."""
+        if self._probe_in_flight:
+            self.record_failure()
+
+
+breaker = CircuitBreaker(settings.LLM_BREAKER_FAILURE_THRESHOLD, settings.LLM_BREAKER_RESET_SECONDS)
+semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+in_flight_requests: Dict[str, asyncio.Task] = {}
+llm_stats = {
+    "calls": 0, "coalesced": 0, "waiting": 0, "running": 0, "queue_wait_seconds_total": 0.0,
+    "retries": 0, "failures": 0, "deadline_exceeded": 0, "rejected_open_circuit": 0,
+}
+
+def get_llm_stats() -> Dict[str, Any]:
+    return {**llm_stats, "circuit_state": breaker.state}
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+def _backoff_seconds(attempt: int, error: Exception) -> float:
+    cap = settings.LLM_BACKOFF_MAX_SECONDS
+    if isinstance(error, openai.RateLimitError):
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after and retry_after.replace(".", "", 1).isdigit():
+            return min(float(retry_after), cap)
+    # Full jitter keeps a burst of failed callers from retrying in lockstep
+    return random.uniform(0, min(cap, settings.LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+async def _call_with_admission(request: Dict[str, Any]):
+    if not breaker.allow_request():
+        llm_stats["rejected_open_circuit"] += 1
+        raise CircuitOpenError("OpenAI circuit is open")
+    is_probe = breaker.state == "half_open"
+
+    try:
+        queued_at = time.monotonic()
+        llm_stats["waiting"] += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            llm_stats["waiting"] -= 1
+        llm_stats["queue_wait_seconds_total"] += time.monotonic() - queued_at
+
+        llm_stats["running"] += 1
+        try:
+            for attempt in range(settings.LLM_MAX_RETRIES + 1):
+                llm_stats["calls"] += 1
+                try:
+                    response = await client.chat.completions.create(**request)
+                except Exception as e:
+                    retryable = _is_retryable(e)
+                    if retryable:
+                        breaker.record_failure()
+                    elif isinstance(e, openai.APIStatusError):
+                        # The provider answered; it's the request that was refused (400, 401...)
+                        breaker.record_success()
+                    if not retryable or attempt == settings.LLM_MAX_RETRIES or breaker.state == "open":
+                        llm_stats["failures"] += 1
+                        raise
+                    llm_stats["retries"] += 1
+                    await asyncio.sleep(_backoff_seconds(attempt, e))
+                    continue
+
+                breaker.record_success()
+                if response.usage:
+                    metrics.llm_tokens.inc(response.usage.prompt_tokens, model=request.get("model"), kind="prompt")
+                    metrics.llm_tokens.inc(response.usage.completion_tokens, model=request.get("model"), kind="completion")
+                return response
+        finally:
+            llm_stats["running"] -= 1
+            semaphore.release()
+    finally:
+        # Any other way out (a non-OpenAI error, cancellation) must not leave the breaker waiting on this probe forever
+        if is_probe:
+            breaker.release_probe()
+
+@metrics.timed
+async def create_chat_completion(dedupe_key: Optional[str] = None, **request):
+    """
+    Admission-controlled chat.completions.create. Identical in-flight requests
+    (same dedupe_key) share one upstream call, and every caller gives up after
+    LLM_DEADLINE_SECONDS even if the shared call carries on for the others.
+    """
+    task = in_flight_requests.get(dedupe_key) if dedupe_key else None
+    if task is not None:
+        llm_stats["coalesced"] += 1
+    else:
+        task = asyncio.ensure_future(_call_with_admission(request))
+        if dedupe_key:
+            in_flight_requests[dedupe_key] = task
+            task.add_done_callback(lambda _: in_flight_requests.pop(dedupe_key, None))
+
+    try:
+        # shield: one caller timing out or disconnecting must not cancel the call for the rest
+        return await asyncio.wait_for(asyncio.shield(task), timeout=settings.LLM_DEADLINE_SECONDS)
+    except asyncio.TimeoutError:
+        llm_stats["deadline_exceeded"] += 1
+        raise
@@ -1,29 +1,93 @@
+import asyncio
 import json
-from openai import AsyncOpenAI
-from datetime import datetime, timedelta # <--- THE FIX IS HERE
-from typing import Optional
-from pydantic import BaseModel, Field
-from models.event import Event
+from datetime import date, datetime, timedelta # <--- THE FIX IS HERE
+from typing import Dict, List, Optional, Tuple, Type, TypeVar
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import BaseModel, ValidationError
+from models.event import Event, ExtractedEvents, ParsedEventDetails
 from core.config import settings
+from core.cache import TTLCache
+from core import metrics
+from services import calendar_service, llm_client, rule_parser
 
-# Initialize the modern, v1.x client
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+# First tier of the parse cache; the second tier is the `parse_cache` collection
+parse_cache = TTLCache(max_entries=settings.PARSE_CACHE_MAX_ENTRIES, ttl_seconds=settings.PARSE_CACHE_TTL_SECONDS)
+db_cache_stats = {"hits": 0, "misses": 0}
+fast_path_stats = {"hits": 0, "fallthroughs": 0}
+extraction_stats = {"chunks": 0, "failed_chunks": 0, "events": 0, "invalid_events": 0}
 
-class ParsedEventDetails(BaseModel):
-    """A model for the LLM to populate."""
-    title: str
-    start_time: datetime
-    end_time: Optional[datetime] = None
-    location: Optional[str] = None
-    notes: Optional[str] = None
-    is_reschedule: bool = Field(default=False, description="Set to true if the text mentions 'reschedule', 'move', 'change', or similar terms.")
+CachedParse = TypeVar("CachedParse", bound=BaseModel)
 
 
-async def parse_event_from_text(text: str) -> ParsedEventDetails:
+def parse_cache_key(text: str, reference_date: date) -> str:
+    """
+    Relative phrases ("next Tuesday") resolve against the current date,
+    so the date is part of the key alongside the normalized text.
+    """
+    normalized_text = " ".join(text.casefold().split())
+    return f"{reference_date.isoformat()}|{normalized_text}"
+
+def get_parse_stats() -> Dict[str, Dict[str, int]]:
+    return {"fast_path": dict(fast_path_stats), "memory": parse_cache.stats(), "database": dict(db_cache_stats), "extraction": dict(extraction_stats)}
+
+async def _get_cached_parse(db: Optional[AsyncIOMotorDatabase], key: str, model: Type[CachedParse] = ParsedEventDetails) -> Optional[CachedParse]:
+    cached = parse_cache.get(key)
+    if cached:
+        return cached.model_copy(deep=True)
+    if db is None:
+        return None
+    try:
+        doc = await db.parse_cache.find_one({"_id": key})
+    except Exception as e:
+        print(f"Error reading the parse cache: {e}")
+        return None
+    if not doc:
+        db_cache_stats["misses"] += 1
+        return None
+    db_cache_stats["hits"] += 1
+    parsed_details = model(**doc["details"])
+    parse_cache.set(key, parsed_details)
+    return parsed_details.model_copy(deep=True)
+
+async def _store_parse(db: Optional[AsyncIOMotorDatabase], key: str, parsed_details: BaseModel):
+    # Callers mutate the details they get back, so the cache keeps its own copy
+    parse_cache.set(key, parsed_details.model_copy(deep=True))
+    if db is None:
+        return
+    try:
+        await db.parse_cache.update_one(
+            {"_id": key},
+            {"$set": {"details": parsed_details.model_dump(), "created_at": datetime.utcnow()}},
+            upsert=True
+        )
+    except Exception as e:
+        print(f"Error writing the parse cache: {e}")
+
+
+@metrics.timed
+async def parse_event_from_text(text: str, db: Optional[AsyncIOMotorDatabase] = None) -> ParsedEventDetails:
     """
     Uses the OpenAI API (v1.x) with Tools to parse unstructured text,
     ensuring an end_time is always present and detecting reschedule intent.
+    Simple phrases are handled by the local rule parser; LLM results are
+    cached in memory and, when a database is given, in MongoDB.
+    The LLM call goes through llm_client's admission controls, so identical
+    concurrent texts share one call and an open circuit returns the fallback at once.
     """
+    if settings.FAST_PARSE_ENABLED:
+        fast_details, confidence = rule_parser.parse_event(text)
+        if fast_details and confidence >= settings.FAST_PARSE_MIN_CONFIDENCE:
+            fast_path_stats["hits"] += 1
+            return fast_details
+        fast_path_stats["fallthroughs"] += 1
+
+    reference_date = calendar_service.now().date()
+    cache_key = parse_cache_key(text, reference_date)
+    cached_details = await _get_cached_parse(db, cache_key)
+    if cached_details:
+        return cached_details
+
     tools = [
         {
             "type": "function",
@@ -36,17 +100,19 @@ async def parse_event_from_text(text: str) -> ParsedEventDetails:
     ]
 
     prompt = f"""
-    The current date is {datetime.now().strftime('%A, %Y-%m-%d')}.
+    The current date is {reference_date.strftime('%A, %Y-%m-%d')}.
     Analyze the following text: "{text}".
     Extract the event details. Pay close attention to keywords like 'reschedule', 'move', 'postpone', 'change' to determine if this is an update to an existing event.
     If an end time is not specified, predict a reasonable duration based on the event's title and context
     (e.g., a meeting is usually 60 minutes, a soccer game 90 minutes, a party 3 hours)
     and calculate the `end_time`.
+    If the event repeats (e.g. 'every Tuesday', 'daily until Friday'), fill in `recurrence`; the start and end times are then the first occurrence.
     """
 
     try:
         # --- REAL API CALL using modern client ---
-        response = await client.chat.completions.create(
+        response = await llm_client.create_chat_completion(
+            dedupe_key=cache_key,
             model="gpt-4-turbo",
             messages=[{"role": "user", "content": prompt}],
             tools=tools,
@@ -64,6 +130,8 @@ async def parse_event_from_text(text: str) -> ParsedEventDetails:
             if parsed_details.end_time is None:
                 parsed_details.end_time = parsed_details.start_time + timedelta(hours=1)
             
+            # Only successful parses are cached; failures should be retried next time
+            await _store_parse(db, cache_key, parsed_details)
             return parsed_details
         else:
             raise ValueError("OpenAI did not return a tool call.")
@@ -73,7 +141,132 @@ async def parse_event_from_text(text: str) -> ParsedEventDetails:
         # Return a default object on failure
         return ParsedEventDetails(
             title="Could not parse event",
-            start_time=datetime.now() + timedelta(hours=1),
-            end_time=datetime.now() + timedelta(hours=2),
+            start_time=calendar_service.now() + timedelta(hours=1),
+            end_time=calendar_service.now() + timedelta(hours=2),
             notes=f"Original text: '{text}'. Error during parsing."
         )
+
+
+def split_for_extraction(text: str, max_chars: int, separators: Tuple[str, ...] = ("\n\n", "\n", " ")) -> List[str]:
+    """
+    Splits text into pieces of at most max_chars, breaking between paragraphs
+    where possible, then between lines, then between words, so the lines
+    describing one event usually stay in the same piece.
+    """
+    if len(text) <= max_chars:
+        return [text] if text.strip() else []
+    if not separators:
+        return [text[start:start + max_chars] for start in range(0, len(text), max_chars)]
+
+    separator, finer_separators = separators[0], separators[1:]
+    chunks, current = [], ""
+    for piece in text.split(separator):
+        for part in split_for_extraction(piece, max_chars, finer_separators) if len(piece) > max_chars else [piece]:
+            if current and len(current) + len(separator) + len(part) > max_chars:
+                chunks.append(current)
+                current = part
+            else:
+                current = f"{current}{separator}{part}" if current else part
+    chunks.append(current)
+    return [chunk for chunk in chunks if chunk.strip()]
+
+async def _extract_chunk(chunk: str, part: int, parts: int, reference_date: date, db: Optional[AsyncIOMotorDatabase]) -> Optional[List[ParsedEventDetails]]:
+    """The events in one piece of text from a single LLM call, or None if the call failed."""
+    # A piece of a longer document gets the part note in its prompt, so it is cached apart from the same text on its own
+    part_key = f"{part}/{parts}|" if parts > 1 else ""
+    cache_key = f"extract|{part_key}" + parse_cache_key(chunk, reference_date)
+    cached = await _get_cached_parse(db, cache_key, ExtractedEvents)
+    if cached:
+        return cached.events
+
+    tools = [
+        {
+            "type": "function",
+            "function": {
+                "name": "create_events",
+                "description": "Extracts every event mentioned in a longer text, such as a newsletter or a schedule.",
+                "parameters": ExtractedEvents.model_json_schema(by_alias=True)
+            }
+        }
+    ]
+    part_note = f" It is part {part} of {parts} of a longer document." if parts > 1 else ""
+
+    prompt = f"""
+    The current date is {reference_date.strftime('%A, %Y-%m-%d')}.
+    The text below may mention many events, e.g. a school newsletter or a team's season schedule.{part_note}
+    Return every distinct event that has a date as its own entry in `events`, in the order they appear,
+    and skip anything without a date. Resolve relative dates against the current date.
+    If an end time is not specified, predict a reasonable duration based on the event's title and context
+    and calculate the `end_time`. If an event repeats (e.g. 'every Tuesday'), fill in its `recurrence`
+    once instead of listing each date.
+    Text:
+    \"\"\"{chunk}\"\"\"
+    """
+
+    try:
+        response = await llm_client.create_chat_completion(
+            dedupe_key=cache_key,
+            model="gpt-4-turbo",
+            messages=[{"role": "user", "content": prompt}],
+            tools=tools,
+            tool_choice={"type": "function", "function": {"name": "create_events"}}
+        )
+        tool_calls = response.choices[0].message.tool_calls
+        if not tool_calls:
+            raise ValueError("OpenAI did not return a tool call.")
+        arguments = json.loads(tool_calls[0].function.arguments)
+    except Exception as e:
+        print(f"Error calling OpenAI or parsing response: {e}")
+        return None
+
+    events = []
+    # One malformed entry shouldn't cost the rest of the piece
+    for item in arguments.get("events") or []:
+        try:
+            parsed_details = ParsedEventDetails(**item)
+        except (TypeError, ValidationError):
+            extraction_stats["invalid_events"] += 1
+            continue
+        if parsed_details.end_time is None:
+            parsed_details.end_time = parsed_details.start_time + timedelta(hours=1)
+        parsed_details.is_reschedule = False
+        events.append(parsed_details)
+
+    await _store_parse(db, cache_key, ExtractedEvents(events=events))
+    return events
+
+@metrics.timed
+async def extract_events_from_text(text: str, db: Optional[AsyncIOMotorDatabase] = None) -> Tuple[List[ParsedEventDetails], int, int]:
+    """
+    Extracts every event in a long text, such as a pasted newsletter, with one
+    LLM call per EXTRACT_CHUNK_CHARS piece instead of one per event. Pieces are
+    sent concurrently, within BATCH_PARSE_CONCURRENCY, and cached like single
+    parses. Returns the events, deduplicated across pieces, with how many
+    pieces there were and how many of them failed.
+    """
+    chunks = split_for_extraction(text, settings.EXTRACT_CHUNK_CHARS)
+    if len(chunks) > settings.EXTRACT_MAX_CHUNKS:
+        raise HTTPException(status_code=413, detail=f"Text is too long to extract events from; split it into pieces of at most {settings.EXTRACT_MAX_CHUNKS * settings.EXTRACT_CHUNK_CHARS} characters")
+
+    reference_date = calendar_service.now().date()
+    semaphore = asyncio.Semaphore(settings.BATCH_PARSE_CONCURRENCY)
+
+    async def extract(part: int, chunk: str) -> Optional[List[ParsedEventDetails]]:
+        async with semaphore:
+            return await _extract_chunk(chunk, part, len(chunks), reference_date, db)
+
+    results = await asyncio.gather(*(extract(part, chunk) for part, chunk in enumerate(chunks, start=1)))
+
+    events, seen = [], set()
+    for chunk_events in results:
+        for parsed_details in chunk_events or []:
+            # An event mentioned on both sides of a split is only created once
+            key = (parsed_details.title.casefold(), parsed_details.start_time)
+            if key not in seen:
+                seen.add(key)
+                events.append(parsed_details)
+    failed_chunks = sum(chunk_events is None for chunk_events in results)
+    extraction_stats["chunks"] += len(chunks)
+    extraction_stats["failed_chunks"] += failed_chunks
+    extraction_stats["events"] += len(events)
+    return events, len(chunks), failed_chunks
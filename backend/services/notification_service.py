@@ -0,0 +1,169 @@
+"""
+Pushes event changes to connected clients.
+
+One watcher per process reads a single MongoDB change stream over the events
+and their tombstones and fans each change out to the owner's subscribers, so
+connections never hold a database cursor of their own. Servers without change
+streams (standalone mongod) fall back to event_service's in-process hook,
+which only sees writes made by this process.
+"""
+import asyncio
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Optional, Set
+from bson import ObjectId
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+from services import event_service
+from core.config import settings
+from core.database import db
+
+CHANGE_PIPELINE = [{"$match": {
+    "ns.coll": {"$in": ["events", "event_tombstones"]},
+    "operationType": {"$in": ["insert", "update", "replace"]},
+}}]
+
+notification_stats = {"published": 0, "delivered": 0, "resyncs": 0, "connections": 0}
+
+class Subscription:
+    """One connection's bounded queue of notifications."""
+
+    def __init__(self, owner_id: ObjectId):
+        self.owner_id = owner_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.NOTIFY_QUEUE_SIZE)
+        self.resync_pending = False
+
+    def offer(self, notification: Dict[str, Any]):
+        if self.resync_pending:
+            # The resync already covers this change
+            return
+        try:
+            self.queue.put_nowait(notification)
+            notification_stats["delivered"] += 1
+        except asyncio.QueueFull:
+            # A client this far behind drops its backlog and catches up with GET /events?since=
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+            self.resync_pending = True
+            notification_stats["resyncs"] += 1
+
+subscriptions: Dict[ObjectId, Set[Subscription]] = defaultdict(set)
+
+def get_notification_stats() -> Dict[str, Any]:
+    return {**notification_stats, "subscribed_users": len(subscriptions), "source": watcher.source}
+
+def publish(owner_id: ObjectId, notification: Dict[str, Any]):
+    notification_stats["published"] += 1
+    for subscription in subscriptions.get(owner_id, ()):
+        subscription.offer(notification)
+
+def subscribe(owner_id: ObjectId) -> Subscription:
+    if len(subscriptions.get(owner_id, ())) >= settings.NOTIFY_MAX_CONNECTIONS_PER_USER:
+        raise HTTPException(status_code=429, detail="Too many open notification streams")
+    subscription = Subscription(owner_id)
+    subscriptions[owner_id].add(subscription)
+    notification_stats["connections"] += 1
+    return subscription
+
+def unsubscribe(subscription: Subscription):
+    owner_subscriptions = subscriptions.get(subscription.owner_id)
+    if owner_subscriptions is None or subscription not in owner_subscriptions:
+        return
+    owner_subscriptions.discard(subscription)
+    notification_stats["connections"] -= 1
+    if not owner_subscriptions:
+        del subscriptions[subscription.owner_id]
+
+async def listen(subscription: Subscription) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Yields the subscription's notifications as they arrive, and None after every
+    NOTIFY_HEARTBEAT_SECONDS of quiet so the caller can keep the connection alive.
+    The caller unsubscribes when the connection closes.
+    """
+    while True:
+        try:
+            notification = await asyncio.wait_for(subscription.queue.get(), timeout=settings.NOTIFY_HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            yield None
+            continue
+        if notification["type"] == "resync":
+            subscription.resync_pending = False
+        yield notification
+
+
+def _change_to_notification(change: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    doc = change.get("fullDocument")
+    if not doc:
+        # The event was deleted before the update could be looked up; its tombstone follows
+        return None
+    if change["ns"]["coll"] == "event_tombstones":
+        return {"type": "deleted", "event": event_service.tombstone_to_public(doc)}
+    change_type = "created" if change["operationType"] == "insert" else "updated"
+    return {"type": change_type, "event": event_service.event_document_to_public(doc)}
+
+class ChangeStreamWatcher:
+    """The process's single change stream, resumed from its last token after errors."""
+
+    def __init__(self):
+        self.source: Optional[str] = None
+        self._database: Optional[AsyncIOMotorDatabase] = None
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token = None
+
+    async def start(self, database: AsyncIOMotorDatabase):
+        self._database = database
+        if settings.NOTIFY_SOURCE == "change_stream":
+            try:
+                stream = self._open()
+                # Opening the cursor is where a standalone server refuses
+                change = await stream.try_next()
+            except OperationFailure as e:
+                print(f"Change streams unavailable ({e}); only pushing this process's own writes.")
+            else:
+                self.source = "change_stream"
+                self._task = asyncio.create_task(self._run(stream, change))
+                return
+        self.source = "local"
+        event_service.change_listeners.append(publish)
+
+    async def stop(self):
+        if publish in event_service.change_listeners:
+            event_service.change_listeners.remove(publish)
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.source = None
+
+    def _open(self):
+        return self._database.watch(CHANGE_PIPELINE, full_document="updateLookup", resume_after=self._resume_token)
+
+    def _dispatch(self, change: Optional[Dict[str, Any]], stream):
+        if change is None:
+            return
+        self._resume_token = stream.resume_token
+        notification = _change_to_notification(change)
+        if notification:
+            publish(change["fullDocument"]["owner_id"], notification)
+
+    async def _run(self, stream, first_change: Optional[Dict[str, Any]]):
+        self._dispatch(first_change, stream)
+        while True:
+            try:
+                async with stream:
+                    async for change in stream:
+                        self._dispatch(change, stream)
+            except PyMongoError as e:
+                # The driver already retries resumable errors once; anything else gets a pause and a fresh cursor
+                print(f"Change stream interrupted ({e}); resuming.")
+                await asyncio.sleep(1)
+            stream = self._open()
+
+watcher = ChangeStreamWatcher()
+
+async def start_watcher():
+    await watcher.start(db.db)
+
+async def stop_watcher():
+    await watcher.stop()
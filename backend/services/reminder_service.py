@@ -0,0 +1,228 @@
+import asyncio
+import heapq
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+from bson import ObjectId
+from pydantic import BaseModel
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from models.event import EventState
+from core.config import settings
+from core.database import db
+from core import metrics
+from services import calendar_service
+
+DUE_REMINDER_PROJECTION = {
+    "owner_id": 1, "title": 1, "start_time": 1, "location": 1, "reminders": 1, "next_reminder_at": 1,
+}
+LEASE_ID = "reminder-dispatcher"
+# Awaited with the ids of events a fired reminder marked REMINDER_SENT.
+# event_service imports this module, so it registers its change publisher here.
+claim_listeners: List[Callable[[AsyncIOMotorDatabase, List[ObjectId]], Awaitable[None]]] = []
+
+class DueReminder(BaseModel):
+    event_id: str
+    owner_id: str
+    title: str
+    start_time: datetime
+    location: Optional[str] = None
+    minutes_before: int
+    message: Optional[str] = None
+
+
+class ReminderSink:
+    """Where fired reminders go. Subclass it to deliver by email, push, SMS..."""
+    async def send(self, reminders: List[DueReminder]):
+        raise NotImplementedError
+
+class LogReminderSink(ReminderSink):
+    async def send(self, reminders: List[DueReminder]):
+        for reminder in reminders:
+            print(f"Reminder for {reminder.owner_id}: '{reminder.title}' starts at {reminder.start_time} ({reminder.minutes_before} min)")
+
+class InMemoryReminderSink(ReminderSink):
+    """Keeps every fired reminder; meant for tests."""
+    def __init__(self):
+        self.sent: List[DueReminder] = []
+
+    async def send(self, reminders: List[DueReminder]):
+        self.sent.extend(reminders)
+
+
+def compute_next_reminder_at(start_time: datetime, minutes_before: Iterable[int], after: Optional[datetime] = None) -> Optional[datetime]:
+    """The earliest reminder fire time for an event, optionally only those later than `after`."""
+    fire_times = [start_time - timedelta(minutes=minutes) for minutes in minutes_before]
+    if after is not None:
+        fire_times = [fire_time for fire_time in fire_times if fire_time > after]
+    return min(fire_times, default=None)
+
+
+class ReminderDispatcher:
+    """
+    Fires reminders from an in-memory heap.
+
+    Every REMINDER_LOAD_INTERVAL_SECONDS it loads only the events whose indexed
+    next_reminder_at falls within the next two intervals, so pending reminders
+    further out are never read. Only the process holding the MongoDB lease
+    dispatches, which keeps multi-worker deployments from sending duplicates.
+    Each round's events are claimed in one bulk_write before their reminders
+    go to the sink, so an event rescheduled or cancelled after it was loaded
+    is never reminded about; a crash between the claim and the sink loses
+    that reminder instead.
+    """
+
+    def __init__(self, sink: Optional[ReminderSink] = None):
+        self.sink = sink or LogReminderSink()
+        self.lease_owner = uuid4().hex
+        self.stats = {"loaded": 0, "fired": 0, "skipped": 0, "superseded": 0, "errors": 0}
+        self._heap: List[Tuple[datetime, ObjectId]] = []
+        self._scheduled: Dict[ObjectId, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        interval = settings.REMINDER_LOAD_INTERVAL_SECONDS
+        while True:
+            try:
+                if not await self._hold_lease(db.db, interval):
+                    self._heap.clear()
+                    self._scheduled.clear()
+                    await asyncio.sleep(interval)
+                    continue
+
+                next_load = time.monotonic() + interval
+                await self.load_due(db.db, calendar_service.now() + timedelta(seconds=2 * interval))
+                while (remaining := next_load - time.monotonic()) > 0:
+                    await self.fire_due(db.db)
+                    if self._heap:
+                        remaining = min(remaining, max((self._heap[0][0] - calendar_service.now()).total_seconds(), 0.01))
+                    await asyncio.sleep(remaining)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"Error dispatching reminders: {e}")
+                await asyncio.sleep(interval)
+
+    async def _hold_lease(self, database: AsyncIOMotorDatabase, interval: int) -> bool:
+        now = datetime.utcnow()
+        try:
+            await database.scheduler_leases.find_one_and_update(
+                {"_id": LEASE_ID, "$or": [{"owner": self.lease_owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": self.lease_owner, "expires_at": now + timedelta(seconds=3 * interval)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            # Another process holds a live lease
+            return False
+
+    @metrics.timed
+    async def load_due(self, database: AsyncIOMotorDatabase, horizon: datetime):
+        cursor = database.events.find(
+            {
+                "next_reminder_at": {"$lte": horizon},
+                "state": {"$nin": [EventState.CANCELLED, EventState.COMPLETED]},
+            },
+            DUE_REMINDER_PROJECTION
+        ).sort("next_reminder_at", 1).limit(settings.REMINDER_LOAD_BATCH_SIZE)
+
+        async for doc in cursor:
+            queued = self._scheduled.get(doc["_id"])
+            self._scheduled[doc["_id"]] = doc
+            if not queued or queued["next_reminder_at"] != doc["next_reminder_at"]:
+                heapq.heappush(self._heap, (doc["next_reminder_at"], doc["_id"]))
+                self.stats["loaded"] += 1
+
+    @metrics.timed
+    async def fire_due(self, database: AsyncIOMotorDatabase):
+        now = calendar_service.now()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            fire_time, event_id = heapq.heappop(self._heap)
+            doc = self._scheduled.get(event_id)
+            # Entries superseded by a reload are stale; the newer entry is still queued
+            if doc and doc["next_reminder_at"] == fire_time:
+                del self._scheduled[event_id]
+                due.append(doc)
+        if not due:
+            return
+
+        # Tags this round's claims, so the events that were still due can be told apart afterwards
+        claim = uuid4().hex
+        claims, pending = [], []
+        for doc in due:
+            fire_time = doc["next_reminder_at"]
+            all_minutes = [reminder["minutes_before"] for reminder in doc.get("reminders", [])]
+            next_reminder_at = compute_next_reminder_at(doc["start_time"], all_minutes, after=fire_time)
+
+            event_reminders = []
+            if doc["start_time"] <= now:
+                # The event already started (e.g. the service was down); don't send stale reminders
+                self.stats["skipped"] += 1
+                fields = {"next_reminder_at": None}
+            else:
+                for reminder in doc.get("reminders", []):
+                    if doc["start_time"] - timedelta(minutes=reminder["minutes_before"]) == fire_time:
+                        event_reminders.append(DueReminder(
+                            event_id=str(doc["_id"]),
+                            owner_id=str(doc["owner_id"]),
+                            title=doc["title"],
+                            start_time=doc["start_time"],
+                            location=doc.get("location"),
+                            minutes_before=reminder["minutes_before"],
+                            message=reminder.get("message"),
+                        ))
+                fields = {
+                    "state": EventState.REMINDER_SENT,
+                    "is_reminded": True,
+                    "last_reminder_at": fire_time,
+                    "next_reminder_at": next_reminder_at,
+                    "updated_at": datetime.utcnow(),
+                }
+            # Only matches while the event is as it was loaded: not rescheduled, edited or cancelled since
+            claims.append(UpdateOne(
+                {"_id": doc["_id"], "next_reminder_at": fire_time, "state": {"$nin": [EventState.CANCELLED, EventState.COMPLETED]}},
+                {"$set": {**fields, "reminder_claim": claim}},
+            ))
+            pending.append((doc["_id"], "state" in fields, event_reminders))
+
+        result = await database.events.bulk_write(claims, ordered=False)
+        if result.matched_count < len(claims):
+            cursor = database.events.find({"_id": {"$in": [event_id for event_id, _, _ in pending]}, "reminder_claim": claim}, {"_id": 1})
+            won = {doc["_id"] async for doc in cursor}
+            self.stats["superseded"] += len(pending) - len(won)
+            pending = [claimed for claimed in pending if claimed[0] in won]
+
+        reminded_ids = [event_id for event_id, state_changed, _ in pending if state_changed]
+        if reminded_ids:
+            for listener in claim_listeners:
+                await listener(database, reminded_ids)
+        reminders = [reminder for _, _, event_reminders in pending for reminder in event_reminders]
+        if reminders:
+            await self.sink.send(reminders)
+            self.stats["fired"] += len(reminders)
+
+dispatcher = ReminderDispatcher()
+
+async def start_dispatcher():
+    if settings.REMINDER_DISPATCH_ENABLED:
+        dispatcher.start()
+
+async def stop_dispatcher():
+    await dispatcher.stop()
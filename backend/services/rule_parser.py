@@ -0,0 +1,233 @@
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
+from models.event import ParsedEventDetails
+from core import metrics
+from services import calendar_service
+
+# Durations mirror the ones the LLM prompt asks for when no end time is given
+DEFAULT_DURATION = timedelta(minutes=60)
+DURATION_KEYWORDS = [
+    (("party", "birthday", "celebration"), timedelta(hours=3)),
+    (("soccer", "game", "match", "tournament"), timedelta(minutes=90)),
+    (("meeting", "call", "conference"), timedelta(minutes=60)),
+]
+
+WEEKDAYS = {
+    "mon": 0, "monday": 0,
+    "tue": 1, "tues": 1, "tuesday": 1,
+    "wed": 2, "wednesday": 2,
+    "thu": 3, "thur": 3, "thurs": 3, "thursday": 3,
+    "fri": 4, "friday": 4,
+    "sat": 5, "saturday": 5,
+    "sun": 6, "sunday": 6,
+}
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+_MERIDIEM = r"(?:(?P<{0}>[ap])\.?m\.?(?![a-z]))"
+RESCHEDULE_RE = re.compile(r"\b(?:reschedule|move|postpone|change|push back)\b", re.I)
+RANGE_RE = re.compile(
+    r"(?:\b(?:from|at)\s+)?\b(?P<h1>1[0-2]|0?[1-9])(?::(?P<m1>[0-5]\d))?\s*" + _MERIDIEM.format("mer1") + r"?"
+    r"\s*(?:-|–|to|until|till)\s*"
+    r"(?P<h2>1[0-2]|0?[1-9])(?::(?P<m2>[0-5]\d))?\s*" + _MERIDIEM.format("mer2"),
+    re.I,
+)
+TIME_12H_RE = re.compile(r"(?:(?:\bat|@)\s*)?\b(?P<h>1[0-2]|0?[1-9])(?::(?P<m>[0-5]\d))?\s*" + _MERIDIEM.format("mer"), re.I)
+TIME_24H_RE = re.compile(r"(?:(?:\bat|@)\s*)?\b(?P<h>[01]?\d|2[0-3]):(?P<m>[0-5]\d)\b", re.I)
+TIME_WORD_RE = re.compile(r"(?:\bat\s+)?\b(?P<word>noon|midnight)\b", re.I)
+DURATION_RE = re.compile(
+    r"\bfor\s+(?P<qty>\d+(?:\.\d+)?|an?|one|half an?)\s*(?P<unit>hours?|hrs?|minutes?|mins?)\b", re.I
+)
+RELATIVE_DAY_RE = re.compile(r"\b(?P<word>today|tonight|tomorrow|tmrw)\b", re.I)
+WEEKDAY_RE = re.compile(
+    r"(?:\bon\s+)?\b(?:(?P<mod>next|this)\s+)?(?P<day>" + "|".join(sorted(WEEKDAYS, key=len, reverse=True)) + r")\b",
+    re.I,
+)
+ISO_DATE_RE = re.compile(r"(?:\bon\s+)?\b(?P<y>\d{4})-(?P<mo>\d{2})-(?P<d>\d{2})\b")
+NUMERIC_DATE_RE = re.compile(r"(?:\bon\s+)?\b(?P<mo>1[0-2]|0?[1-9])/(?P<d>3[01]|[12]\d|0?[1-9])(?:/(?P<y>\d{2}|\d{4}))?\b")
+MONTH_DATE_RE = re.compile(
+    r"(?:\bon\s+)?\b(?P<mon>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+"
+    r"(?P<d>3[01]|[12]\d|0?[1-9])(?:st|nd|rd|th)?\b(?:,?\s+(?P<y>\d{4}))?",
+    re.I,
+)
+LOCATION_RE = re.compile(r"(?:^|\s)(?:at|@)\s+(?P<loc>.+?)(?=\s+(?:with|for)\s|[,;]|$)", re.I)
+# Phrases the rules don't model; anything like this goes to the LLM
+AMBIGUOUS_RE = re.compile(
+    r"\d|\b(?:every|each|daily|weekly|monthly|weekend|week|month|morning|afternoon|evening|"
+    r"night|after|before|until|between|or|later|soon|next|last)\b",
+    re.I,
+)
+EDGE_WORDS = {"to", "on", "at", "for", "from", "by", "and", "@", "-", "–"}
+
+
+def _cut(text: str, match: re.Match) -> str:
+    return f"{text[:match.start()]} {text[match.end():]}"
+
+def _to_time(hour: str, minute: Optional[str], meridiem: Optional[str]) -> time:
+    h = int(hour) % 12
+    if meridiem and meridiem.lower() == "p":
+        h += 12
+    return time(h, int(minute or 0))
+
+def _default_duration(title: str) -> timedelta:
+    title_lower = title.lower()
+    for keywords, duration in DURATION_KEYWORDS:
+        if any(re.search(rf"\b{keyword}", title_lower) for keyword in keywords):
+            return duration
+    return DEFAULT_DURATION
+
+def _next_weekday(today: date, weekday: int, start: time, now: datetime, skip_today: bool) -> date:
+    days_ahead = (weekday - today.weekday()) % 7
+    if days_ahead == 0 and (skip_today or datetime.combine(today, start) <= now):
+        days_ahead = 7
+    return today + timedelta(days=days_ahead)
+
+def _extract_time(text: str) -> Tuple[str, Optional[time], Optional[time], bool]:
+    """Returns the remaining text, start time, optional end time and whether the time was ambiguous."""
+    match = RANGE_RE.search(text)
+    if match:
+        meridiem = match.group("mer2")
+        start = _to_time(match.group("h1"), match.group("m1"), match.group("mer1") or meridiem)
+        end = _to_time(match.group("h2"), match.group("m2"), meridiem)
+        if not match.group("mer1") and start >= end:
+            # "11-1pm" starts in the morning
+            start = _to_time(match.group("h1"), match.group("m1"), "a")
+        return _cut(text, match), start, end, start >= end
+
+    matches = list(TIME_12H_RE.finditer(text))
+    if len(matches) == 1:
+        match = matches[0]
+        return _cut(text, match), _to_time(match.group("h"), match.group("m"), match.group("mer")), None, False
+
+    match = TIME_24H_RE.search(text)
+    if match and not matches:
+        hour = match.group("h")
+        # "17:00" and "09:00" are unambiguous, "5:30" could be either half of the day
+        ambiguous = not hour.startswith("0") and 1 <= int(hour) <= 12
+        return _cut(text, match), time(int(hour), int(match.group("m"))), None, ambiguous
+
+    match = TIME_WORD_RE.search(text)
+    if match and not matches:
+        return _cut(text, match), time(12) if match.group("word").lower() == "noon" else time(0), None, False
+
+    return text, None, None, len(matches) > 1
+
+def _extract_date(text: str, start: time, now: datetime) -> Tuple[str, Optional[date]]:
+    today = now.date()
+
+    match = RELATIVE_DAY_RE.search(text)
+    if match:
+        offset = 1 if match.group("word").lower() in ("tomorrow", "tmrw") else 0
+        return _cut(text, match), today + timedelta(days=offset)
+
+    match = ISO_DATE_RE.search(text)
+    if match:
+        try:
+            return _cut(text, match), date(int(match.group("y")), int(match.group("mo")), int(match.group("d")))
+        except ValueError:
+            return text, None
+
+    for pattern in (MONTH_DATE_RE, NUMERIC_DATE_RE):
+        match = pattern.search(text)
+        if not match:
+            continue
+        month = MONTHS[match.group("mon")[:3].lower()] if "mon" in match.groupdict() else int(match.group("mo"))
+        year = match.group("y")
+        try:
+            if year:
+                parsed = date(int(year) + (2000 if len(year) == 2 else 0), month, int(match.group("d")))
+            else:
+                parsed = date(today.year, month, int(match.group("d")))
+                if parsed < today:
+                    parsed = parsed.replace(year=today.year + 1)
+        except ValueError:
+            return text, None
+        return _cut(text, match), parsed
+
+    match = WEEKDAY_RE.search(text)
+    if match:
+        skip_today = (match.group("mod") or "").lower() == "next"
+        return _cut(text, match), _next_weekday(today, WEEKDAYS[match.group("day").lower()], start, now, skip_today)
+
+    return text, None
+
+def _extract_duration(text: str) -> Tuple[str, Optional[timedelta]]:
+    match = DURATION_RE.search(text)
+    if not match:
+        return text, None
+    qty = match.group("qty").lower()
+    amount = 0.5 if qty.startswith("half") else 1.0 if qty in ("a", "an", "one") else float(qty)
+    unit = match.group("unit").lower()
+    duration = timedelta(hours=amount) if unit.startswith("h") else timedelta(minutes=amount)
+    return _cut(text, match), duration
+
+def _clean(fragment: str) -> str:
+    words = fragment.replace(",", " ").split()
+    while words and words[0].lower() in EDGE_WORDS:
+        words.pop(0)
+    while words and words[-1].lower() in EDGE_WORDS:
+        words.pop()
+    return " ".join(words).strip(" .!?:;")
+
+
+@metrics.timed
+def parse_event(text: str, now: Optional[datetime] = None) -> Tuple[Optional[ParsedEventDetails], float]:
+    """
+    Deterministically parses short, regular phrases such as
+    "soccer practice Tuesday 5pm at Sunset Field".
+    Returns the details and a confidence in [0, 1]; anything the rules can't
+    model confidently returns (None, 0.0) so the caller can fall back to the LLM.
+    """
+    now = now or calendar_service.now()
+    remaining = f" {text.strip()} "
+
+    is_reschedule = False
+    match = RESCHEDULE_RE.search(remaining)
+    if match:
+        is_reschedule = True
+        remaining = _cut(remaining, match)
+
+    remaining, duration = _extract_duration(remaining)
+    remaining, start, end, ambiguous_time = _extract_time(remaining)
+    if start is None or ambiguous_time:
+        return None, 0.0
+
+    remaining, day = _extract_date(remaining, start, now)
+    confidence = 1.0
+    if day is None:
+        # A bare time means the next time it comes around, as the LLM would read it
+        day = now.date() if datetime.combine(now.date(), start) > now else now.date() + timedelta(days=1)
+        confidence = 0.85
+
+    location = None
+    match = LOCATION_RE.search(remaining)
+    if match:
+        location = _clean(match.group("loc")) or None
+        remaining = _cut(remaining, match)
+
+    title = _clean(remaining)
+    if not title or AMBIGUOUS_RE.search(title) or (location and AMBIGUOUS_RE.search(location)):
+        return None, 0.0
+    # A second date or time word ("Monday and Tuesday") is more than the rules can resolve
+    if _extract_date(title, start, now)[1] is not None or TIME_WORD_RE.search(title):
+        return None, 0.0
+    if len(title.split()) > 8:
+        confidence *= 0.7
+
+    title = title[0].upper() + title[1:]
+    start_time = datetime.combine(day, start)
+    if end is not None:
+        end_time = datetime.combine(day, end)
+    else:
+        end_time = start_time + (duration or _default_duration(title))
+
+    return ParsedEventDetails(
+        title=title,
+        start_time=start_time,
+        end_time=end_time,
+        location=location,
+        is_reschedule=is_reschedule,
+    ), confidence
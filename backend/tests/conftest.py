@@ -0,0 +1,74 @@
+"""
+The app runs in-process behind httpx's ASGI transport against mongomock-motor,
+with the LLM parser stubbed. Every test gets an empty database.
+
+Needs `pip install pytest anyio mongomock-motor httpx`.
+"""
+import os
+
+# Settings are read from the environment when core.config is imported, so these are set
+# first. They keep tests away from a real MongoDB or OpenAI; variables already exported
+# in the shell still win.
+TEST_ENV = {
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+    "OPENAI_API_KEY": "unused",
+    "MONGO_CONNECTION_STRING": "mongodb://unused",
+    "REMINDER_DISPATCH_ENABLED": "false",
+}
+for key, value in TEST_ENV.items():
+    os.environ.setdefault(key, value)
+
+from typing import Awaitable, Callable, Dict, Tuple
+import httpx
+import pytest
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+from core.database import create_indexes, db
+from services import assistant_service, auth_service, freebusy_service, nlp_service
+from tests.support import API, StubParser
+import main
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def database():
+    db.client = AsyncMongoMockClient()
+    db.db = db.client.get_database("family_assistant")
+    await create_indexes(db.db)
+    yield db.db
+    # Cached users and bitsets would outlive the database they came from
+    auth_service.user_cache.clear()
+    freebusy_service.day_cache.clear()
+    freebusy_service.series_cache.clear()
+    assistant_service.user_classifier_cache.clear()
+
+@pytest.fixture
+def parser(monkeypatch) -> StubParser:
+    stub = StubParser()
+    monkeypatch.setattr(nlp_service, "parse_event_from_text", stub)
+    return stub
+
+@pytest.fixture
+async def client(database, parser):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        yield client
+
+@pytest.fixture
+def signup(client) -> Callable[[], Awaitable[Tuple[Dict[str, str], ObjectId]]]:
+    """Signs up and logs in a new user, returning (Authorization headers, owner id)."""
+    async def signup() -> Tuple[Dict[str, str], ObjectId]:
+        email, password = f"test-{ObjectId()}@example.com", "password"
+        await client.post(f"{API}/users/signup", json={"email": email, "password": password})
+        token = (await client.post(f"{API}/users/login", data={"username": email, "password": password})).json()["access_token"]
+        owner = await auth_service.get_user_by_email(db.db, email)
+        return {"Authorization": f"Bearer {token}"}, owner.id
+    return signup
+
+@pytest.fixture
+async def user(signup):
+    return await signup()
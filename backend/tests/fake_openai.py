@@ -0,0 +1,74 @@
+"""
+A local stand-in for the OpenAI chat completions API, so llm_client can be
+exercised over real HTTP. Responses are scripted per request; once the
+script runs out every request gets a plain successful completion.
+"""
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+def completion(arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """A chat.completion body, with a tool call carrying `arguments` if given."""
+    message: Dict[str, Any] = {"role": "assistant", "content": None if arguments is not None else "ok"}
+    if arguments is not None:
+        message["tool_calls"] = [{
+            "id": "call_0", "type": "function",
+            "function": {"name": "create_event", "arguments": json.dumps(arguments)},
+        }]
+    return {
+        "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": "gpt-4-turbo",
+        "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if arguments is not None else "stop"}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+def error(status: int, message: str = "scripted error") -> Dict[str, Any]:
+    return {"status": status, "body": {"error": {"message": message, "type": "fake", "code": None}}}
+
+class FakeOpenAI:
+    def __init__(self):
+        self.requests: List[Dict[str, Any]] = []
+        self.script: deque = deque()
+        # Seconds every response waits before it is sent
+        self.delay = 0.0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def respond(self, *responses: Dict[str, Any]):
+        """Queues responses, each {"status": ..., "body": ...}, for the next requests in order."""
+        self.script.extend(responses)
+
+    def start(self) -> "FakeOpenAI":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.requests.append({"path": self.path, "body": body})
+                response = fake.script.popleft() if fake.script else {"status": 200, "body": completion()}
+                time.sleep(fake.delay)
+                payload = json.dumps(response["body"]).encode()
+                self.send_response(response["status"])
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
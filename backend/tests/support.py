@@ -0,0 +1,34 @@
+"""What the tests share besides fixtures: the API prefix, a stub parser and a mongomock fix."""
+import zlib
+from datetime import datetime, timedelta
+import mongomock.collection
+from models.event import ParsedEventDetails, RecurrenceFrequency, RecurrenceRule
+
+API = "/api/v1"
+
+# mongomock predates the `sort` argument newer pymongo passes for bulk updates
+_add_update = mongomock.collection.BulkOperationBuilder.add_update
+mongomock.collection.BulkOperationBuilder.add_update = lambda self, *args, sort=None, **kwargs: _add_update(self, *args, **kwargs)
+
+class StubParser:
+    """
+    Stands in for the LLM parser: every text maps to a stable one-hour slot
+    between 8am and 10pm over the next two weeks, so the same text always
+    conflicts with itself. Texts starting with "every" repeat weekly.
+    """
+
+    def __init__(self):
+        self.first_day = (datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.calls = 0
+
+    async def __call__(self, text: str, db=None) -> ParsedEventDetails:
+        self.calls += 1
+        day, slot = divmod(zlib.crc32(text.encode()) % (14 * 56), 56)
+        start = self.first_day + timedelta(days=day, hours=8, minutes=15 * slot)
+        return ParsedEventDetails(
+            title=text[:80],
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            is_reschedule=text.lower().startswith("move"),
+            recurrence=RecurrenceRule(frequency=RecurrenceFrequency.WEEKLY) if text.lower().startswith("every") else None,
+        )
@@ -0,0 +1,19 @@
+"""POST /events/batch limits."""
+import pytest
+from core.config import settings
+from tests.support import API
+import main
+
+pytestmark = pytest.mark.anyio
+
+async def test_too_many_texts_are_rejected_before_parsing(client, user, parser):
+    headers, _ = user
+
+    response = await client.post(f"{API}/events/batch", headers=headers, json={"texts": ["Soccer practice"] * (settings.BATCH_MAX_TEXTS + 1)})
+
+    assert response.status_code == 422
+    assert parser.calls == 0
+
+def test_limit_is_in_the_schema():
+    schema = main.app.openapi()["components"]["schemas"]["EventBatchInput"]
+    assert schema["properties"]["texts"]["maxItems"] == settings.BATCH_MAX_TEXTS
@@ -0,0 +1,53 @@
+"""Bulk deletes: racing other deletes of the same events, and filters that select nothing in particular."""
+import pytest
+from tests.support import API
+from services import event_service
+
+pytestmark = pytest.mark.anyio
+
+async def test_event_deleted_in_between_is_not_found(client, user, database, monkeypatch):
+    headers, owner_id = user
+    ids = [
+        (await client.post(f"{API}/events", headers=headers, json={"text": text})).json()["created_event"]["id"]
+        for text in ("Soccer practice", "Piano lesson")
+    ]
+    find_bulk_targets = event_service._find_bulk_targets
+
+    async def find_then_lose_the_race(*args, **kwargs):
+        targets = await find_bulk_targets(*args, **kwargs)
+        # Another request deletes the first event after this one resolved it
+        await event_service.delete_event(database, ids[0], owner_id)
+        return targets
+    monkeypatch.setattr(event_service, "_find_bulk_targets", find_then_lose_the_race)
+
+    response = await client.post(f"{API}/events/bulk/delete", headers=headers, json={"ids": ids})
+
+    assert response.status_code == 200
+    assert response.json()["modified"] == 1
+    assert [item["result"] for item in response.json()["results"]] == ["not_found", "deleted"]
+    assert await database.event_tombstones.count_documents({}) == 2
+
+async def test_already_deleted_events_get_no_tombstone(client, user, database, monkeypatch):
+    headers, owner_id = user
+    event_id = (await client.post(f"{API}/events", headers=headers, json={"text": "Soccer practice"})).json()["created_event"]["id"]
+    find_bulk_targets = event_service._find_bulk_targets
+
+    async def find_then_lose_the_race(*args, **kwargs):
+        targets = await find_bulk_targets(*args, **kwargs)
+        await database.events.delete_one({"owner_id": owner_id})
+        return targets
+    monkeypatch.setattr(event_service, "_find_bulk_targets", find_then_lose_the_race)
+
+    response = await client.post(f"{API}/events/bulk/delete", headers=headers, json={"ids": [event_id]})
+
+    assert response.json()["results"] == [{"id": event_id, "result": "not_found"}]
+    assert await database.event_tombstones.count_documents({}) == 0
+
+async def test_empty_filter_deletes_nothing(client, user, database):
+    headers, owner_id = user
+    await client.post(f"{API}/events", headers=headers, json={"text": "Soccer practice"})
+
+    response = await client.post(f"{API}/events/bulk/delete", headers=headers, json={"filter": {}})
+
+    assert response.status_code == 400
+    assert await database.events.count_documents({"owner_id": owner_id}) == 1
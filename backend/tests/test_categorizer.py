@@ -0,0 +1,72 @@
+"""The shipped category model, and corrections that teach only the user who made them."""
+import asyncio
+import pytest
+from bson import ObjectId
+from tests.support import API
+from core.config import settings
+from models.event import EventCategory
+from services import assistant_service
+
+# Titles the keyword rules this model replaced got right, which it must keep getting right
+BASELINE_TITLES = [
+    ("Soccer practice", EventCategory.SPORTS),
+    ("Dentist appointment", EventCategory.APPOINTMENT),
+    ("PTA meeting", EventCategory.SCHOOL),
+    ("Parent-teacher conference", EventCategory.SCHOOL),
+    ("Team meeting", EventCategory.WORK),
+    ("Client call", EventCategory.WORK),
+    ("Dinner party", EventCategory.SOCIAL),
+]
+
+@pytest.mark.parametrize("title, category", BASELINE_TITLES)
+def test_shipped_model_matches_the_keyword_rules(title, category):
+    assert assistant_service.categorize_event(title) == category
+
+@pytest.mark.anyio
+async def test_correction_applies_to_its_user_only(client, user, signup):
+    headers, _ = user
+    other_headers, _ = await signup()
+    created = (await client.post(f"{API}/events", headers=headers, json={"text": "Team meeting"})).json()["created_event"]
+    assert created["category"] == "WORK"
+
+    await client.put(f"{API}/events/{created['id']}/category", headers=headers, json={"category": "SOCIAL"})
+    again = (await client.post(f"{API}/events", headers=headers, json={"text": "team meeting!"})).json()["created_event"]
+    others = (await client.post(f"{API}/events", headers=other_headers, json={"text": "Team meeting"})).json()["created_event"]
+
+    assert again["category"] == "SOCIAL"
+    assert others["category"] == "WORK"
+
+@pytest.mark.anyio
+async def test_corrections_per_user_are_capped(database, monkeypatch):
+    monkeypatch.setattr(settings, "CATEGORY_CORRECTIONS_MAX_PER_USER", 3)
+    owner_id = ObjectId()
+    for title in ["Yoga", "Pilates", "Chess club", "Yoga", "Choir"]:
+        await assistant_service.learn_category(database, owner_id, title, EventCategory.SOCIAL)
+
+    user_classifier = await assistant_service.get_user_classifier(database, owner_id)
+
+    assert list(user_classifier.corrections) == ["chess club", "yoga", "choir"]
+
+@pytest.mark.anyio
+async def test_correction_teaches_similar_titles(database):
+    owner_id = ObjectId()
+    assert assistant_service.categorize_event("Robotics showcase") == EventCategory.UNCATEGORIZED
+
+    await assistant_service.learn_category(database, owner_id, "Robotics club", EventCategory.SCHOOL)
+    user_classifier = await assistant_service.get_user_classifier(database, owner_id)
+
+    assert assistant_service.categorize_event("Robotics showcase", user_classifier) == EventCategory.SCHOOL
+    # The shared model hasn't learned it
+    assert assistant_service.categorize_event("Robotics showcase") == EventCategory.UNCATEGORIZED
+
+@pytest.mark.anyio
+async def test_concurrent_corrections_of_a_title_keep_one_entry(database):
+    owner_id = ObjectId()
+
+    await asyncio.gather(*(
+        assistant_service.learn_category(database, owner_id, "Swim meet", category)
+        for category in [EventCategory.SPORTS, EventCategory.SOCIAL, EventCategory.SCHOOL]
+    ))
+
+    doc = await database.category_feedback.find_one({"_id": owner_id})
+    assert [item["title"] for item in doc["corrections"]] == ["swim meet"]
@@ -0,0 +1,38 @@
+"""Conflict checks when this worker's cached bitsets are out of date."""
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from tests.support import API
+from models.event import Event, RecurrenceFrequency, RecurrenceRule
+from services import calendar_service, freebusy_service
+
+pytestmark = pytest.mark.anyio
+
+async def test_stale_cached_free_answer_is_confirmed_from_the_database(client, user):
+    headers, owner_id = user
+    first = (await client.post(f"{API}/events", headers=headers, json={"text": "Dentist appointment"})).json()
+
+    # As if another worker had added the event after this one cached the day
+    for masks in freebusy_service.day_cache.get(owner_id).values():
+        masks.clear()
+    second = (await client.post(f"{API}/events", headers=headers, json={"text": "Dentist appointment"})).json()
+
+    assert not first["is_conflict"]
+    assert second["is_conflict"]
+    assert second["conflict_details"] == "Conflicts with 'Dentist appointment'"
+
+async def test_only_series_still_running_are_loaded(database):
+    owner_id = ObjectId()
+    start = datetime(2030, 1, 7, 10, 0)
+    for title, until in (("Swim lesson", datetime(2020, 6, 1)), ("Piano lesson", None)):
+        series = Event(
+            owner_id=owner_id, title=title, start_time=datetime(2020, 1, 6, 10, 0), end_time=datetime(2020, 1, 6, 11, 0),
+            recurrence=RecurrenceRule(frequency=RecurrenceFrequency.WEEKLY, until=until),
+        )
+        series.series_end = calendar_service.compute_series_end(series)
+        await database.events.insert_one(series.model_dump(by_alias=True))
+
+    busy_days = await freebusy_service.get_busy_days(database, [owner_id], start, start + timedelta(days=1))
+
+    assert [series.title for series in freebusy_service.series_cache.get(owner_id)[1]] == ["Piano lesson"]
+    assert busy_days[start.date()] == calendar_service.slot_mask(40, 44)
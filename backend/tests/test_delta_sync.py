@@ -0,0 +1,73 @@
+"""Delta sync on GET /events: sync tokens, tombstones and conditional requests."""
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from tests.support import API
+from core.config import settings
+from services import event_service
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(autouse=True)
+def no_safety_window(monkeypatch):
+    # Tokens then mark exactly when they were issued, so earlier writes aren't sent again
+    monkeypatch.setattr(settings, "SYNC_SAFETY_WINDOW_SECONDS", 0)
+
+async def _create(client, headers, text: str) -> str:
+    return (await client.post(f"{API}/events", headers=headers, json={"text": text})).json()["created_event"]["id"]
+
+async def _sync_token(client, headers) -> str:
+    token = (await client.get(f"{API}/events", headers=headers)).headers["X-Sync-Token"]
+    await asyncio.sleep(0.01)
+    return token
+
+async def test_events_created_since_the_token_are_returned(client, user):
+    headers, _ = user
+    await _create(client, headers, "Soccer practice")
+    token = await _sync_token(client, headers)
+    created_id = await _create(client, headers, "Piano lesson")
+
+    response = await client.get(f"{API}/events", headers=headers, params={"since": token})
+
+    assert response.status_code == 200
+    assert [(event["id"], event["title"]) for event in response.json()] == [(created_id, "Piano lesson")]
+    assert response.headers["X-Sync-Token"] != token
+
+async def test_events_deleted_since_the_token_come_back_as_tombstones(client, user):
+    headers, _ = user
+    event_id = await _create(client, headers, "Soccer practice")
+    token = await _sync_token(client, headers)
+    await client.delete(f"{API}/events/{event_id}", headers=headers)
+
+    changes = (await client.get(f"{API}/events", headers=headers, params={"since": token})).json()
+
+    assert [(change["id"], change["deleted"]) for change in changes] == [(event_id, True)]
+
+async def test_unchanged_calendar_answers_304_to_its_etag(client, user):
+    headers, _ = user
+    await _create(client, headers, "Soccer practice")
+    first = await client.get(f"{API}/events", headers=headers)
+
+    unchanged = await client.get(f"{API}/events", headers={**headers, "If-None-Match": first.headers["ETag"]})
+    await _create(client, headers, "Piano lesson")
+    changed = await client.get(f"{API}/events", headers={**headers, "If-None-Match": first.headers["ETag"]})
+
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert changed.status_code == 200
+    assert len(changed.json()) == 2
+
+async def test_malformed_sync_token_is_rejected(client, user):
+    headers, _ = user
+
+    response = await client.get(f"{API}/events", headers=headers, params={"since": "not a token"})
+
+    assert response.status_code == 400
+
+async def test_token_older_than_the_tombstones_has_expired(client, user):
+    headers, _ = user
+    token = event_service.encode_sync_token(datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_TTL_DAYS + 1))
+
+    response = await client.get(f"{API}/events", headers=headers, params={"since": token})
+
+    assert response.status_code == 410
@@ -0,0 +1,18 @@
+"""Events stored before newer fields existed still read back in the full shape."""
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from tests.support import API
+
+pytestmark = pytest.mark.anyio
+
+async def test_missing_fields_read_as_model_defaults(client, user, database):
+    headers, owner_id = user
+    event_id = ObjectId()
+    await database.events.insert_one({"_id": event_id, "owner_id": owner_id, "title": "Old event", "start_time": datetime(2030, 1, 7, 10, 0)})
+
+    event = (await client.get(f"{API}/events/{event_id}", headers=headers)).json()
+
+    assert event["reminders"] == [] and event["exceptions"] == []
+    assert (event["state"], event["category"]) == ("DRAFT", "UNCATEGORIZED")
+    assert event["updated_at"] is None
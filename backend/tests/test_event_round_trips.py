@@ -0,0 +1,101 @@
+"""
+Every event mutation is one owner-scoped find_one_and_update on the events
+collection: no read before the write and none after it.
+"""
+from collections import Counter
+import pytest
+from tests.support import API
+from core.database import get_database
+import main
+
+pytestmark = pytest.mark.anyio
+
+# Collection methods that each cost one round trip to MongoDB
+ROUND_TRIP_METHODS = {
+    "find", "find_one", "find_one_and_update", "find_one_and_delete", "find_one_and_replace",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "bulk_write", "aggregate", "count_documents", "distinct",
+}
+
+class CountingCollection:
+    def __init__(self, collection, round_trips: Counter):
+        self._collection = collection
+        self._round_trips = round_trips
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in ROUND_TRIP_METHODS:
+            return attribute
+
+        def counted(*args, **kwargs):
+            self._round_trips[(self._collection.name, name)] += 1
+            return attribute(*args, **kwargs)
+        return counted
+
+class CountingDatabase:
+    """Stands in for the request's database and counts the calls made on each collection."""
+
+    def __init__(self, database):
+        self._database = database
+        self.round_trips = Counter()
+
+    def __getattr__(self, name):
+        return CountingCollection(getattr(self._database, name), self.round_trips)
+
+    def __getitem__(self, name):
+        return CountingCollection(self._database[name], self.round_trips)
+
+    def on(self, collection: str) -> Counter:
+        return Counter({method: count for (name, method), count in self.round_trips.items() if name == collection})
+
+@pytest.fixture
+async def counting_db(database):
+    counting = CountingDatabase(database)
+    main.app.dependency_overrides[get_database] = lambda: counting
+    yield counting
+    main.app.dependency_overrides.pop(get_database, None)
+
+@pytest.fixture
+async def event_id(client, user):
+    headers, _ = user
+    response = await client.post(f"{API}/events", headers=headers, json={"text": "Soccer practice"})
+    return response.json()["created_event"]["id"]
+
+MUTATIONS = {
+    "confirm": lambda event_id: ("POST", f"{API}/events/{event_id}/confirm", {}),
+    "reschedule": lambda event_id: ("PUT", f"{API}/events/{event_id}/reschedule", {"json": {"text": "move it to Friday"}}),
+    "add_reminder": lambda event_id: ("POST", f"{API}/events/{event_id}/reminders", {"json": {"minutes_before": 30}}),
+    "share": lambda event_id: ("POST", f"{API}/events/{event_id}/share", {"json": {"share_with": ["family@example.com"]}}),
+    "status": lambda event_id: ("PUT", f"{API}/events/{event_id}/status", {"json": {"is_confirmed": True}}),
+    "category": lambda event_id: ("PUT", f"{API}/events/{event_id}/category", {"json": {"category": "SOCIAL"}}),
+}
+
+@pytest.mark.parametrize("mutation", MUTATIONS)
+async def test_mutation_is_one_events_round_trip(client, user, event_id, counting_db, mutation):
+    headers, _ = user
+    method, url, kwargs = MUTATIONS[mutation](event_id)
+
+    response = await client.request(method, url, headers=headers, **kwargs)
+
+    assert response.status_code == 200, response.text
+    assert counting_db.on("events") == Counter({"find_one_and_update": 1})
+    assert counting_db.on("event_timeline") == Counter({"insert_one": 1})
+
+@pytest.mark.parametrize("mutation", MUTATIONS)
+async def test_mutation_is_scoped_to_the_owner(client, user, signup, event_id, counting_db, mutation):
+    method, url, kwargs = MUTATIONS[mutation](event_id)
+    other_headers, _ = await signup()
+
+    response = await client.request(method, url, headers=other_headers, **kwargs)
+
+    assert response.status_code == 404
+    assert counting_db.on("events") == Counter({"find_one_and_update": 1})
+    assert not counting_db.on("event_timeline")
+
+async def test_delete_is_one_events_round_trip(client, user, event_id, counting_db):
+    headers, _ = user
+
+    response = await client.delete(f"{API}/events/{event_id}", headers=headers)
+
+    assert response.status_code == 204
+    assert counting_db.on("events") == Counter({"find_one_and_delete": 1})
@@ -0,0 +1,43 @@
+"""Password hashing pool accounting."""
+import asyncio
+import threading
+import pytest
+from services import auth_service
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = {key: 0 for key in auth_service.hash_pool_stats}
+    monkeypatch.setattr(auth_service, "hash_pool_stats", stats)
+    return stats
+
+async def _settle():
+    # Completion is recorded through the event loop, one callback later
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+async def test_failed_hashes_are_not_counted_as_completed(stats):
+    def fail():
+        raise ValueError("malformed hash")
+
+    with pytest.raises(ValueError):
+        await auth_service._run_in_hash_pool(fail)
+    await auth_service._run_in_hash_pool(str, "ok")
+    await _settle()
+
+    assert (stats["pending"], stats["completed"], stats["failed"]) == (0, 1, 1)
+
+async def test_hash_stays_pending_until_its_thread_finishes(stats):
+    release = threading.Event()
+    task = asyncio.create_task(auth_service._run_in_hash_pool(release.wait))
+    await asyncio.sleep(0.05)
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    still_hashing = stats["pending"]
+    release.set()
+    await asyncio.sleep(0.05)
+
+    assert still_hashing == 1
+    assert (stats["pending"], stats["completed"]) == (0, 1)
@@ -0,0 +1,52 @@
+"""iCalendar imports: time zones and edited occurrences of imported series."""
+from datetime import datetime
+import pytest
+from tests.support import API
+from core.config import settings
+from services import event_service, ical_service
+
+pytestmark = pytest.mark.anyio
+
+def _vevent(uid: str, start: str, *extra: str) -> str:
+    return "".join(f"{line}\r\n" for line in (
+        "BEGIN:VEVENT", f"UID:{uid}", "SUMMARY:Swim lesson", f"DTSTART{start}", "DURATION:PT1H", *extra, "END:VEVENT",
+    ))
+
+def _calendar(*vevents: str) -> bytes:
+    return (ical_service.CALENDAR_HEADER + "".join(vevents) + ical_service.CALENDAR_FOOTER).encode()
+
+async def test_zoned_times_are_stored_in_the_calendar_zone(client, user, database, monkeypatch):
+    headers, _ = user
+    monkeypatch.setattr(settings, "CALENDAR_TIMEZONE", "America/New_York")
+    ics = _calendar(_vevent("utc", ":20300114T150000Z"), _vevent("paris", ";TZID=Europe/Paris:20300114T210000"))
+
+    await client.post(f"{API}/events/import", headers={**headers, "Content-Type": "text/calendar"}, content=ics)
+
+    stored = {doc["ical_uid"]: doc["start_time"] async for doc in database.events.find()}
+    assert stored == {"utc": datetime(2030, 1, 14, 10, 0), "paris": datetime(2030, 1, 14, 15, 0)}
+
+async def test_overrides_are_applied_in_batches_once_their_series_is_stored(client, user, database, monkeypatch):
+    headers, _ = user
+    monkeypatch.setattr(settings, "ICS_IMPORT_CHUNK_SIZE", 2)
+    batches = []
+    apply_imported_overrides = event_service._apply_imported_overrides
+
+    async def record_batch(db, overrides, owner_id, summary):
+        batches.append(sorted(imported.recurrence_id.day for imported in overrides))
+        await apply_imported_overrides(db, overrides, owner_id, summary)
+    monkeypatch.setattr(event_service, "_apply_imported_overrides", record_batch)
+
+    weekly = "RRULE:FREQ=WEEKLY"
+    override = lambda uid, day: _vevent(uid, f":203001{day}T110000", f"RECURRENCE-ID:203001{day}T100000")
+    ics = _calendar(
+        _vevent("swim", ":20300107T100000", weekly), override("swim", 14), override("swim", 21),
+        # This series comes after its first override, which waits for it
+        override("piano", 15), override("swim", 28), _vevent("piano", ":20300108T100000", weekly), override("piano", 22),
+    )
+
+    response = await client.post(f"{API}/events/import", headers={**headers, "Content-Type": "text/calendar"}, content=ics)
+
+    assert response.json()["overrides"] == 5
+    assert batches == [[14, 21], [28], [15, 22]]
+    exceptions = {doc["ical_uid"]: len(doc["exceptions"]) async for doc in database.events.find()}
+    assert exceptions == {"swim": 3, "piano": 2}
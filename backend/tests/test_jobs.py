@@ -0,0 +1,61 @@
+"""Background job mode for POST /events on the default, MongoDB-backed queue."""
+import asyncio
+import pytest
+from tests.support import API
+from core.config import settings
+from services import job_service
+import serve
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def workers(database):
+    await job_service.start_workers()
+    yield
+    await job_service.stop_workers()
+
+async def test_async_create_is_polled_to_completion(client, user, workers):
+    headers, _ = user
+    assert isinstance(job_service.job_queue, job_service.MongoJobQueue)
+
+    submitted = await client.post(f"{API}/events", headers=headers, params={"async": "true"}, json={"text": "Soccer practice"})
+    assert submitted.status_code == 202
+    for _ in range(100):
+        job = (await client.get(submitted.headers["Location"], headers=headers)).json()
+        if job["status"] == "SUCCEEDED":
+            break
+        await asyncio.sleep(0.02)
+
+    assert job["status"] == "SUCCEEDED"
+    assert job["result"]["created_event"]["title"] == "Soccer practice"
+
+async def test_job_metrics_need_a_user(client, user):
+    headers, _ = user
+
+    assert (await client.get(f"{API}/jobs/metrics")).status_code == 401
+    assert (await client.get(f"{API}/jobs/metrics", headers=headers)).json()["backend"] == "mongo"
+
+def test_memory_queue_refuses_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_QUEUE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+
+    with pytest.raises(SystemExit):
+        serve.main()
+
+async def test_job_run_again_creates_its_event_once(database, user, parser):
+    _, owner_id = user
+    job = await job_service.submit_create_event(database, "Soccer practice", owner_id)
+    queue = job_service.MongoJobQueue()
+    pool = job_service.JobWorkerPool(queue)
+
+    first = await queue.claim(database)
+    await pool.process(database, first)
+    # As if the first attempt's lease lapsed before it completed and another worker claimed the job
+    await database.jobs.update_one({"_id": job["_id"]}, {"$set": {"status": "RUNNING", "lease_expires_at": first["started_at"]}})
+    await pool.process(database, await queue.claim(database))
+
+    stored = await database.jobs.find_one({"_id": job["_id"]})
+    assert stored["status"] == "SUCCEEDED"
+    assert await database.events.count_documents({"owner_id": owner_id}) == 1
+    assert stored["result"]["created_event"]["id"] == str(job["event_id"])
+    assert parser.calls == 1
@@ -0,0 +1,120 @@
+"""Admission control in llm_client against a local fake OpenAI server."""
+import asyncio
+from datetime import datetime
+import pytest
+from openai import AsyncOpenAI, BadRequestError, InternalServerError
+from core.config import settings
+from services import llm_client, nlp_service
+from tests.fake_openai import FakeOpenAI, completion, error
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    fake = FakeOpenAI().start()
+    monkeypatch.setattr(llm_client, "client", AsyncOpenAI(api_key="test", base_url=fake.base_url, timeout=5, max_retries=0))
+    monkeypatch.setattr(llm_client, "breaker", llm_client.CircuitBreaker(failure_threshold=2, reset_seconds=0.05))
+    monkeypatch.setattr(llm_client, "semaphore", asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY))
+    monkeypatch.setattr(llm_client, "llm_stats", {key: 0 for key in llm_client.llm_stats})
+    monkeypatch.setattr(settings, "LLM_BACKOFF_BASE_SECONDS", 0.001)
+    yield fake
+    fake.stop()
+
+def _request(content: str = "hello"):
+    return {"model": "gpt-4-turbo", "messages": [{"role": "user", "content": content}]}
+
+async def test_identical_requests_in_flight_share_one_call(fake_openai):
+    fake_openai.delay = 0.2
+
+    responses = await asyncio.gather(*(llm_client.create_chat_completion(dedupe_key="same", **_request()) for _ in range(5)))
+
+    assert len(fake_openai.requests) == 1
+    assert {response.id for response in responses} == {"chatcmpl-fake"}
+    assert llm_client.llm_stats["coalesced"] == 4
+    assert llm_client.in_flight_requests == {}
+
+async def test_rate_limits_are_retried(fake_openai):
+    fake_openai.respond(error(429))
+
+    response = await llm_client.create_chat_completion(**_request())
+
+    assert response.choices[0].message.content == "ok"
+    assert len(fake_openai.requests) == 2
+    assert llm_client.llm_stats["retries"] == 1
+
+async def test_breaker_opens_and_fails_fast(fake_openai, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 0)
+    fake_openai.respond(error(500), error(500))
+
+    for _ in range(2):
+        with pytest.raises(InternalServerError):
+            await llm_client.create_chat_completion(**_request())
+    with pytest.raises(llm_client.CircuitOpenError):
+        await llm_client.create_chat_completion(**_request())
+
+    assert len(fake_openai.requests) == 2
+    assert llm_client.breaker.state == "open"
+
+async def test_half_open_probe_closes_the_breaker(fake_openai, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 0)
+    fake_openai.respond(error(500), error(500))
+    for _ in range(2):
+        with pytest.raises(InternalServerError):
+            await llm_client.create_chat_completion(**_request())
+
+    await asyncio.sleep(0.06)
+    await llm_client.create_chat_completion(**_request())
+
+    assert llm_client.breaker.state == "closed"
+
+async def test_probe_refused_by_the_provider_releases_the_breaker(fake_openai, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 0)
+    fake_openai.respond(error(500), error(500), error(400))
+    for _ in range(2):
+        with pytest.raises(InternalServerError):
+            await llm_client.create_chat_completion(**_request())
+    await asyncio.sleep(0.06)
+
+    with pytest.raises(BadRequestError):
+        await llm_client.create_chat_completion(**_request())
+    response = await llm_client.create_chat_completion(**_request())
+
+    assert response.choices[0].message.content == "ok"
+    assert len(fake_openai.requests) == 4
+
+async def test_probe_that_errors_locally_reopens_the_breaker(fake_openai, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 0)
+    fake_openai.respond(error(500), error(500))
+    for _ in range(2):
+        with pytest.raises(InternalServerError):
+            await llm_client.create_chat_completion(**_request())
+    await asyncio.sleep(0.06)
+
+    with pytest.raises(TypeError):
+        # The SDK rejects this before any request is sent
+        await llm_client.create_chat_completion(**_request(), not_an_argument=True)
+
+    assert llm_client.breaker.state == "open"
+    await asyncio.sleep(0.06)
+    await llm_client.create_chat_completion(**_request())
+    assert llm_client.breaker.state == "closed"
+
+async def test_parse_goes_through_the_fake_server(fake_openai):
+    start = datetime(2030, 5, 6, 12, 0)
+    fake_openai.respond({"status": 200, "body": completion({"title": "Lunch with Sam", "start_time": start.isoformat()})})
+
+    parsed = await nlp_service.parse_event_from_text("Lunch with Sam sometime the week after next")
+
+    assert (parsed.title, parsed.start_time, parsed.end_time) == ("Lunch with Sam", start, datetime(2030, 5, 6, 13, 0))
+    assert fake_openai.requests[0]["path"] == "/v1/chat/completions"
+    assert fake_openai.requests[0]["body"]["tool_choice"]["function"]["name"] == "create_event"
+
+async def test_extraction_cache_tells_document_parts_apart(fake_openai):
+    fake_openai.respond(*({"status": 200, "body": completion({"events": []})} for _ in range(2)))
+    today = datetime.now().date()
+
+    for part, parts in ((1, 1), (2, 3), (1, 1), (2, 3)):
+        await nlp_service._extract_chunk("Bake sale in the gym on Friday", part, parts, today, None)
+
+    assert len(fake_openai.requests) == 2
+    assert "part 2 of 3" in fake_openai.requests[1]["body"]["messages"][0]["content"]
@@ -0,0 +1,101 @@
+"""
+Event changes reach the owner's subscribers through event_service's
+in-process publish hook, which stands in for the change stream here.
+"""
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from tests.support import API
+from core.config import settings
+from services import notification_service
+from services.reminder_service import InMemoryReminderSink, ReminderDispatcher
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def watcher(database, monkeypatch):
+    # mongomock has no change streams
+    monkeypatch.setattr(settings, "NOTIFY_SOURCE", "local")
+    await notification_service.watcher.start(database)
+    yield notification_service.watcher
+    await notification_service.watcher.stop()
+
+@pytest.fixture
+async def subscription(user, watcher):
+    _, owner_id = user
+    subscription = notification_service.subscribe(owner_id)
+    yield subscription
+    notification_service.unsubscribe(subscription)
+
+async def test_create_update_and_delete_are_pushed(client, user, subscription):
+    headers, _ = user
+
+    created = (await client.post(f"{API}/events", headers=headers, json={"text": "Soccer practice"})).json()["created_event"]
+    await client.post(f"{API}/events/{created['id']}/confirm", headers=headers)
+    await client.delete(f"{API}/events/{created['id']}", headers=headers)
+
+    notifications = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+    assert [(n["type"], n["event"]["id"]) for n in notifications] == [
+        ("created", created["id"]), ("updated", created["id"]), ("deleted", created["id"]),
+    ]
+    assert notifications[1]["event"]["state"] == "CONFIRMED"
+
+async def test_other_users_are_not_notified(client, user, watcher):
+    headers, _ = user
+    stranger = notification_service.subscribe(ObjectId())
+    try:
+        await client.post(f"{API}/events", headers=headers, json={"text": "Soccer practice"})
+        assert stranger.queue.empty()
+    finally:
+        notification_service.unsubscribe(stranger)
+
+async def test_listen_yields_the_published_change(client, user, subscription):
+    headers, _ = user
+    listener = notification_service.listen(subscription)
+
+    await client.post(f"{API}/events", headers=headers, json={"text": "Soccer practice"})
+
+    notification = await asyncio.wait_for(listener.__anext__(), timeout=1)
+    assert notification["type"] == "created"
+    await listener.aclose()
+
+async def test_a_full_queue_is_replaced_by_one_resync(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFY_QUEUE_SIZE", 2)
+    owner_id = ObjectId()
+    subscription = notification_service.subscribe(owner_id)
+    try:
+        for i in range(5):
+            notification_service.publish(owner_id, {"type": "updated", "event": {"id": str(i)}})
+        assert [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())] == [{"type": "resync"}]
+    finally:
+        notification_service.unsubscribe(subscription)
+
+async def test_connections_per_user_are_limited(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFY_MAX_CONNECTIONS_PER_USER", 1)
+    owner_id = ObjectId()
+    subscription = notification_service.subscribe(owner_id)
+    try:
+        with pytest.raises(notification_service.HTTPException) as error:
+            notification_service.subscribe(owner_id)
+        assert error.value.status_code == 429
+    finally:
+        notification_service.unsubscribe(subscription)
+    assert owner_id not in notification_service.subscriptions
+
+async def test_fired_reminder_is_pushed(client, user, subscription, database):
+    headers, owner_id = user
+    created = (await client.post(f"{API}/events", headers=headers, json={"text": "Soccer practice"})).json()["created_event"]
+    subscription.queue.get_nowait()
+    # Due now, as if the reminder had been set for the current minute
+    await database.events.update_one({"_id": ObjectId(created["id"])}, {"$set": {
+        "start_time": datetime.now() + timedelta(minutes=29), "reminders": [{"minutes_before": 30}],
+        "next_reminder_at": datetime.now() - timedelta(minutes=1),
+    }})
+    dispatcher = ReminderDispatcher(InMemoryReminderSink())
+
+    await dispatcher.load_due(database, datetime.now())
+    await dispatcher.fire_due(database)
+
+    notification = subscription.queue.get_nowait()
+    assert (notification["type"], notification["event"]["id"], notification["event"]["state"]) == ("updated", created["id"], "REMINDER_SENT")
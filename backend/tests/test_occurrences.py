@@ -0,0 +1,52 @@
+"""Recurring events addressed with timezone-aware times, and rule validation."""
+from datetime import datetime, timedelta, timezone
+import pytest
+from bson import ObjectId
+from pydantic import ValidationError
+from tests.support import API
+from core.config import settings
+from models.event import Event, RecurrenceFrequency, RecurrenceRule
+from services import calendar_service
+
+def _weekly(start: datetime) -> Event:
+    return Event(
+        owner_id=ObjectId(), title="Swim lesson", start_time=start, end_time=start + timedelta(hours=1),
+        recurrence=RecurrenceRule(frequency=RecurrenceFrequency.WEEKLY),
+    )
+
+def test_aware_times_are_read_as_calendar_time(monkeypatch):
+    monkeypatch.setattr(settings, "CALENDAR_TIMEZONE", "America/New_York")
+    event = _weekly(datetime(2030, 1, 7, 10, 0))
+
+    # 15:00 UTC is 10:00 in New York in January
+    assert calendar_service.is_occurrence(event, datetime(2030, 1, 14, 15, 0, tzinfo=timezone.utc))
+    window = list(calendar_service.expand_occurrences(
+        event, datetime(2030, 1, 14, tzinfo=timezone.utc), datetime(2030, 1, 22, tzinfo=timezone.utc)
+    ))
+    assert [occurrence.start_time for occurrence in window] == [datetime(2030, 1, 14, 10, 0), datetime(2030, 1, 21, 10, 0)]
+
+def test_weekdays_outside_the_week_are_rejected():
+    with pytest.raises(ValidationError):
+        RecurrenceRule(frequency=RecurrenceFrequency.WEEKLY, by_weekday=[0, 7])
+
+@pytest.mark.anyio
+async def test_occurrence_routes_accept_utc_times(client, user):
+    headers, _ = user
+    created = (await client.post(f"{API}/events", headers=headers, json={"text": "Every week swim lesson"})).json()["created_event"]
+    first = datetime.fromisoformat(created["start_time"])
+    second = first + timedelta(weeks=1)
+    as_utc = lambda moment: moment.replace(tzinfo=timezone.utc).isoformat()
+
+    listed = await client.get(
+        f"{API}/events/{created['id']}/occurrences", headers=headers,
+        params={"start": as_utc(first), "end": as_utc(first + timedelta(weeks=2))},
+    )
+    edited = await client.put(f"{API}/events/{created['id']}/occurrences/{as_utc(second)}", headers=headers, json={"title": "Moved lesson"})
+    again = await client.get(
+        f"{API}/events/{created['id']}/occurrences", headers=headers,
+        params={"start": first.isoformat(), "end": (first + timedelta(weeks=2)).isoformat()},
+    )
+
+    assert listed.status_code == 200 and len(listed.json()) == 2
+    assert edited.status_code == 200
+    assert [occurrence["title"] for occurrence in again.json()] == [created["title"], "Moved lesson"]
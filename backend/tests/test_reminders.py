@@ -0,0 +1,103 @@
+"""The dispatcher only reminds about events still due when it claims them."""
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from models.event import Event, EventState, Reminder
+from core.config import settings
+from services import calendar_service, reminder_service
+from services.reminder_service import InMemoryReminderSink, ReminderDispatcher, compute_next_reminder_at
+
+pytestmark = pytest.mark.anyio
+
+async def _insert_due_event(database, minutes_before: int = 30) -> Event:
+    # Starts just inside its reminder, so the reminder is due now
+    start_time = calendar_service.now() + timedelta(minutes=minutes_before - 1)
+    event = Event(
+        owner_id=ObjectId(), title="Soccer practice", start_time=start_time, end_time=start_time + timedelta(hours=1),
+        reminders=[Reminder(minutes_before=minutes_before)],
+        next_reminder_at=compute_next_reminder_at(start_time, [minutes_before]),
+    )
+    await database.events.insert_one(event.model_dump(by_alias=True))
+    return event
+
+@pytest.fixture
+def dispatcher() -> ReminderDispatcher:
+    return ReminderDispatcher(InMemoryReminderSink())
+
+async def test_due_reminder_is_sent_once(database, dispatcher):
+    event = await _insert_due_event(database)
+
+    await dispatcher.load_due(database, calendar_service.now() + timedelta(minutes=1))
+    await dispatcher.fire_due(database)
+    await dispatcher.load_due(database, calendar_service.now() + timedelta(minutes=1))
+    await dispatcher.fire_due(database)
+
+    assert [reminder.event_id for reminder in dispatcher.sink.sent] == [str(event.id)]
+    stored = await database.events.find_one({"_id": event.id})
+    assert stored["state"] == EventState.REMINDER_SENT
+    assert stored["next_reminder_at"] is None
+
+async def test_reminders_are_due_by_the_calendar_clock(database, dispatcher, monkeypatch):
+    # Fourteen hours ahead of UTC, so far from whatever zone the server runs in
+    monkeypatch.setattr(settings, "CALENDAR_TIMEZONE", "Pacific/Kiritimati")
+    event = await _insert_due_event(database)
+
+    await dispatcher.load_due(database, calendar_service.now() + timedelta(minutes=1))
+    await dispatcher.fire_due(database)
+
+    assert [reminder.event_id for reminder in dispatcher.sink.sent] == [str(event.id)]
+
+async def test_event_rescheduled_after_loading_is_not_reminded(database, dispatcher):
+    event = await _insert_due_event(database)
+    await dispatcher.load_due(database, calendar_service.now() + timedelta(minutes=1))
+
+    later = event.start_time + timedelta(days=1)
+    await database.events.update_one({"_id": event.id}, {"$set": {"start_time": later, "next_reminder_at": later - timedelta(minutes=30)}})
+    await dispatcher.fire_due(database)
+
+    assert dispatcher.sink.sent == []
+    assert dispatcher.stats["superseded"] == 1
+
+async def test_event_cancelled_after_loading_is_not_reminded(database, dispatcher):
+    event = await _insert_due_event(database)
+    await dispatcher.load_due(database, calendar_service.now() + timedelta(minutes=1))
+
+    await database.events.update_one({"_id": event.id}, {"$set": {"state": EventState.CANCELLED}})
+    await dispatcher.fire_due(database)
+
+    assert dispatcher.sink.sent == []
+
+async def test_sent_reminder_bumps_updated_at_and_is_published(database, dispatcher, monkeypatch):
+    published = []
+
+    async def listener(database, event_ids):
+        published.extend(await database.events.find({"_id": {"$in": event_ids}}).to_list(length=None))
+    monkeypatch.setattr(reminder_service, "claim_listeners", [listener])
+    event = await _insert_due_event(database)
+    before = datetime.utcnow()
+
+    await dispatcher.load_due(database, calendar_service.now() + timedelta(minutes=1))
+    await dispatcher.fire_due(database)
+
+    stored = await database.events.find_one({"_id": event.id})
+    assert stored["updated_at"] >= before.replace(microsecond=before.microsecond // 1000 * 1000)
+    assert [(doc["_id"], doc["state"]) for doc in published] == [(event.id, EventState.REMINDER_SENT)]
+
+async def test_due_events_are_claimed_in_one_write(database, dispatcher, monkeypatch):
+    events = [await _insert_due_event(database) for _ in range(3)]
+    await dispatcher.load_due(database, calendar_service.now() + timedelta(minutes=1))
+    await database.events.update_one({"_id": events[0].id}, {"$set": {"state": EventState.CANCELLED}})
+    calls = []
+    collection_type = type(database.events)
+    bulk_write = collection_type.bulk_write
+
+    async def counting_bulk_write(self, operations, **kwargs):
+        calls.append(len(operations))
+        return await bulk_write(self, operations, **kwargs)
+    monkeypatch.setattr(collection_type, "bulk_write", counting_bulk_write)
+
+    await dispatcher.fire_due(database)
+
+    assert calls == [3]
+    assert sorted(reminder.event_id for reminder in dispatcher.sink.sent) == sorted(str(event.id) for event in events[1:])
+    assert dispatcher.stats["superseded"] == 1
@@ -0,0 +1,55 @@
+"""
+The fast path against what the LLM returns for the same phrases. Titles are
+free text the LLM words differently from run to run, so agreement is on when,
+where and whether the text is a reschedule.
+"""
+from datetime import datetime
+from core.config import settings
+from services import rule_parser
+
+# A Wednesday morning; no phrase below depends on how "next <weekday>" is read
+NOW = datetime(2025, 10, 15, 9, 0)
+
+# (text, the LLM's start, end, location and reschedule flag), or None where only the LLM should answer
+CORPUS = [
+    ("Soccer practice Tuesday 5pm at Sunset Field", (datetime(2025, 10, 21, 17, 0), datetime(2025, 10, 21, 18, 30), "Sunset Field", False)),
+    ("Dentist appointment Friday at 9am", (datetime(2025, 10, 17, 9, 0), datetime(2025, 10, 17, 10, 0), None, False)),
+    ("Team meeting tomorrow 10:30am", (datetime(2025, 10, 16, 10, 30), datetime(2025, 10, 16, 11, 30), None, False)),
+    ("Piano lesson today 4pm", (datetime(2025, 10, 15, 16, 0), datetime(2025, 10, 15, 17, 0), None, False)),
+    ("Parent teacher conference 11/14 at 6pm", (datetime(2025, 11, 14, 18, 0), datetime(2025, 11, 14, 19, 0), None, False)),
+    ("Birthday party Saturday 2-5pm at the park", (datetime(2025, 10, 18, 14, 0), datetime(2025, 10, 18, 17, 0), "the park", False)),
+    ("Call with Grandma Sunday at noon", (datetime(2025, 10, 19, 12, 0), datetime(2025, 10, 19, 13, 0), None, False)),
+    ("Doctor checkup on 2025-11-03 at 8:15am", (datetime(2025, 11, 3, 8, 15), datetime(2025, 11, 3, 9, 15), None, False)),
+    ("Book club Thursday 7pm @ Library", (datetime(2025, 10, 16, 19, 0), datetime(2025, 10, 16, 20, 0), "Library", False)),
+    ("Reschedule the dentist to Monday 11am", (datetime(2025, 10, 20, 11, 0), datetime(2025, 10, 20, 12, 0), None, True)),
+    ("Swim meet November 7th at 9am", (datetime(2025, 11, 7, 9, 0), datetime(2025, 11, 7, 10, 0), None, False)),
+    ("Flight to Denver tomorrow 6:45am for 3 hours", (datetime(2025, 10, 16, 6, 45), datetime(2025, 10, 16, 9, 45), None, False)),
+    ("Soccer game Saturday 10am", (datetime(2025, 10, 18, 10, 0), datetime(2025, 10, 18, 11, 30), None, False)),
+    ("Team meeting Monday 2pm to 3:30pm", (datetime(2025, 10, 20, 14, 0), datetime(2025, 10, 20, 15, 30), None, False)),
+    ("Move piano lesson to Thursday 5pm", (datetime(2025, 10, 16, 17, 0), datetime(2025, 10, 16, 18, 0), None, True)),
+    ("Pick up the kids after school", None),
+    ("Lunch with Sam sometime next week", None),
+    ("Dinner at 7 with the Johnsons", None),
+    ("Gym every Monday and Wednesday morning", None),
+    ("Coffee with Alex at 3 or 4pm", None),
+    ("Vet appointment for Max in the evening", None),
+]
+
+def test_fast_path_hit_rate_and_agreement_with_llm():
+    accepted, agreed, disagreements = 0, 0, []
+    for text, expected in CORPUS:
+        details, confidence = rule_parser.parse_event(text, now=NOW)
+        if details is None or confidence < settings.FAST_PARSE_MIN_CONFIDENCE:
+            continue
+        accepted += 1
+        answer = (details.start_time, details.end_time, details.location, details.is_reschedule)
+        if answer == expected:
+            agreed += 1
+        else:
+            disagreements.append((text, answer, expected))
+
+    hit_rate, agreement = accepted / len(CORPUS), agreed / max(accepted, 1)
+    print(f"fast path: {accepted}/{len(CORPUS)} taken ({hit_rate:.0%}), {agreement:.0%} agree with the LLM")
+    # Every phrase the fast path takes must get the LLM's answer; the rest fall through unharmed
+    assert not disagreements, disagreements
+    assert hit_rate >= 0.6
@@ -0,0 +1,52 @@
+"""The sweep-line slot search against the per-candidate rescan it replaced."""
+import random
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+from models.event import Event
+from services import calendar_service
+
+def _rescan_slots(start_time: datetime, duration: timedelta, existing_events: List[Event], count: int = 3) -> List[datetime]:
+    # The implementation before the sweep line, kept as the reference
+    suggestions = []
+    sorted_events = sorted(existing_events, key=lambda e: e.start_time)
+    search_time = max(start_time, datetime.now() + timedelta(minutes=30))
+    while len(suggestions) < count:
+        search_time += timedelta(minutes=(15 - search_time.minute % 15))
+        potential_end_time = search_time + duration
+        if not (8 <= search_time.hour < 22):
+            search_time = search_time.replace(hour=8, minute=0, second=0) + timedelta(days=1)
+            continue
+        is_free = True
+        for event in sorted_events:
+            if search_time < event.end_time and potential_end_time > event.start_time:
+                is_free = False
+                search_time = event.end_time
+                break
+        if is_free:
+            suggestions.append(search_time)
+            search_time = potential_end_time
+    return suggestions
+
+def _random_calendar(rng: random.Random, first_day: datetime) -> List[Event]:
+    # Several owners' events mixed together, as a family search passes them
+    owners = [ObjectId() for _ in range(rng.randint(1, 3))]
+    events = []
+    for _ in range(rng.randint(0, 40)):
+        start = first_day + timedelta(minutes=5 * rng.randrange(3 * 24 * 12))
+        events.append(Event(
+            owner_id=rng.choice(owners), title="Busy", start_time=start,
+            end_time=start + timedelta(minutes=5 * rng.randint(1, 48)),
+        ))
+    return events
+
+def test_sweep_line_matches_the_rescan_on_random_calendars():
+    rng = random.Random(2)
+    first_day = (datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(1000):
+        events = _random_calendar(rng, first_day)
+        start_time = first_day + timedelta(minutes=5 * rng.randrange(2 * 24 * 12))
+        duration = timedelta(minutes=15 * rng.randint(1, 12))
+        count = rng.randint(1, 5)
+
+        assert calendar_service.find_next_available_slots(start_time, duration, events, count=count) == _rescan_slots(start_time, duration, events, count)
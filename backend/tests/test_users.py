@@ -0,0 +1,26 @@
+"""Cached users follow writes to their preferences."""
+import pytest
+from tests.support import API
+
+pytestmark = pytest.mark.anyio
+
+async def test_preference_change_is_seen_on_the_next_request(client, user):
+    headers, _ = user
+    before = (await client.get(f"{API}/users/me", headers=headers)).json()
+
+    updated = await client.put(f"{API}/users/me/preferences", headers=headers, json={"default_reminders": {"SPORTS": 30}})
+    after = (await client.get(f"{API}/users/me", headers=headers)).json()
+
+    assert before["preferences"]["default_reminders"]["SPORTS"] == 45
+    assert updated.status_code == 200
+    assert after["preferences"] == {"default_reminders": {"SPORTS": 30}}
+
+async def test_new_reminder_default_applies_to_new_events(client, user):
+    headers, _ = user
+    await client.get(f"{API}/users/me", headers=headers)
+    await client.put(f"{API}/users/me/preferences", headers=headers, json={"default_reminders": {"SPORTS": 30}})
+
+    created = (await client.post(f"{API}/events", headers=headers, json={"text": "Soccer practice"})).json()["created_event"]
+
+    assert created["category"] == "SPORTS"
+    assert [reminder["minutes_before"] for reminder in created["reminders"]] == [30]
@@ -1,3 +1,6 @@
+// Delta sync state for getEvents, reset whenever the user (token) changes
+const eventSync = { token: null, events: new Map(), syncToken: null, etag: null };
+
 export const api = {
   // Base URL for the backend API
   API_URL: "http://127.0.0.1:8000/api/v1",
@@ -34,13 +37,40 @@ export const api = {
     return response.json();
   },
 
-  // Function to get all events for the authenticated user
+  // Function to get all events for the authenticated user.
+  // After the first full fetch only changes are requested (delta sync), and an
+  // unchanged calendar costs a 304 with no body.
   getEvents: async (token) => {
-    const response = await fetch(`${api.API_URL}/events`, {
-      headers: { Authorization: `Bearer ${token}` },
-    });
+    const sync = eventSync.token === token ? eventSync : null;
+    const url = sync
+      ? `${api.API_URL}/events?since=${encodeURIComponent(sync.syncToken)}`
+      : `${api.API_URL}/events`;
+    const headers = { Authorization: `Bearer ${token}` };
+    if (sync && sync.etag) headers["If-None-Match"] = sync.etag;
+
+    const response = await fetch(url, { headers });
+    if (response.status === 304) return Array.from(sync.events.values());
+    if (response.status === 410) {
+      // The sync token is too old to know what was deleted; start over
+      eventSync.token = null;
+      return api.getEvents(token);
+    }
     if (!response.ok) throw new Error("Failed to fetch events");
-    return response.json();
+
+    const data = await response.json();
+    const events = sync ? sync.events : new Map();
+    if (!sync) events.clear();
+    for (const item of data) {
+      if (item.deleted) events.delete(item.id);
+      else events.set(item.id, item);
+    }
+    Object.assign(eventSync, {
+      token,
+      events,
+      syncToken: response.headers.get("X-Sync-Token"),
+      etag: response.headers.get("ETag"),
+    });
+    return Array.from(events.values());
   },
 
   // Function to parse unstructured text and create/update an event
@@ -60,6 +90,15 @@ export const api = {
     return response.json();
   },
 
+  // Function to get the timeline of actions for an event
+  getEventTimeline: async (eventId, token) => {
+    const response = await fetch(`${api.API_URL}/events/${eventId}/timeline`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    if (!response.ok) throw new Error("Failed to fetch timeline");
+    return response.json();
+  },
+
   // Function to add a reminder to an event
   addReminder: async (eventId, reminder, token) => {
     const response = await fetch(`${api.API_URL}/events/${eventId}/reminders`, {
@@ -144,5 +183,19 @@ export const api = {
         throw new Error(error.detail || 'Failed to parse event');
     }
     return response.json();
+  },
+
+  // Calls onChange whenever one of the user's events is created, updated or
+  // deleted, until the returned function is called. EventSource can't send an
+  // Authorization header, so the token goes in the query string; the browser
+  // reconnects on its own after network errors.
+  subscribeToEvents: (token, onChange) => {
+    const source = new EventSource(
+      `${api.API_URL}/notifications?access_token=${encodeURIComponent(token)}`
+    );
+    for (const type of ["created", "updated", "deleted", "resync"]) {
+      source.addEventListener(type, (message) => onChange(JSON.parse(message.data)));
+    }
+    return () => source.close();
   }
 };
@@ -51,6 +51,15 @@ export function CalendarDashboard({ token, onLogout }) {
     fetchEvents();
   }, [fetchEvents]);
 
+  // Changes made elsewhere (another tab, a shared event) arrive as server-sent
+  // events; each one triggers a delta sync, which is cheap when little changed.
+  useEffect(() => {
+    const unsubscribe = api.subscribeToEvents(token, () => {
+      api.getEvents(token).then(setEvents).catch(() => {});
+    });
+    return unsubscribe;
+  }, [token]);
+
   const handleCreateEvent = async () => {
     if (!eventText.trim()) return;
     setIsParsing(true);
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import {
   Box,
   VStack,
@@ -35,10 +35,19 @@ export function EventDetailsModal({ isOpen, onClose, event, onUpdate, onDelete,
     const [shareEmail, setShareEmail] = useState('');
     const [isRescheduling, setIsRescheduling] = useState(false);
     const [rescheduleText, setRescheduleText] = useState('');
+    const [timeline, setTimeline] = useState([]);
     const toast = useToast();
     const { isOpen: isAlertOpen, onOpen: onAlertOpen, onClose: onAlertClose } = useDisclosure();
     const cancelRef = React.useRef();
 
+    // The timeline is served separately from the event; reload it whenever the event changes
+    useEffect(() => {
+        if (!isOpen || !event) return;
+        api.getEventTimeline(event.id, token)
+            .then(setTimeline)
+            .catch(() => setTimeline([]));
+    }, [isOpen, event, token]);
+
     if (!event) return null;
 
     const handleStatusChange = async (newState) => {
@@ -122,7 +131,7 @@ export function EventDetailsModal({ isOpen, onClose, event, onUpdate, onDelete,
                             <Box w="full">
                                 <Heading size="sm" mb={2}>Timeline</Heading>
                                 <VStack align="start" spacing={1} pl={2} borderLeft="2px" borderColor="gray.200">
-                                    {event.timeline.map((item, index) => (
+                                    {timeline.map((item, index) => (
                                         <Box key={index}>
                                             <Text fontSize="sm"><strong>{item.action}</strong> at {format(parseISO(item.timestamp), 'Pp')}</Text>
                                             {item.details && <Text fontSize="xs" color="gray.500">{item.details}</Text>}